@@ -1,12 +1,33 @@
 # backend/app/core/auth.py
+import time
+import hashlib
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Any, Optional
-from jose import jwt
+from app.core.cache import TTLCache
 from app.core.config import settings
 
-ALGORITHM = settings.jwt_algorithm
-SECRET = settings.jwt_secret
-ACCESS_EXPIRE_MINUTES = settings.access_token_expire_minutes
+
+@lru_cache(maxsize=None)
+def signing_key():
+    """
+    jose and the key it signs with, loaded on the first token rather than at
+    import. The key is prepared once: given a plain string, jose re-parses it
+    (and tries it as JSON) on every encode/decode.
+    """
+    from jose import jwk, jwt
+    from jose.exceptions import JWKError
+
+    try:
+        key = jwk.construct(settings.jwt_secret, settings.jwt_algorithm)
+    except JWKError:
+        key = settings.jwt_secret
+    return jwt, key, settings.jwt_algorithm
+
+@lru_cache(maxsize=None)
+def verified_tokens() -> TTLCache:
+    """Verified payloads keyed by sha256(token); each entry expires at the token's exp."""
+    return TTLCache(max_entries=settings.token_cache_max_entries)
 
 def create_access_token(subject: str, data: Optional[dict] = None, expires_delta: Optional[timedelta] = None) -> str:
     to_encode: dict[str, Any] = {}
@@ -14,11 +35,24 @@ def create_access_token(subject: str, data: Optional[dict] = None, expires_delta
         to_encode.update(data)
     to_encode.update({"sub": str(subject)})
 
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_EXPIRE_MINUTES))
+    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.access_token_expire_minutes))
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET, algorithm=ALGORITHM)
+    jwt, key, algorithm = signing_key()
+    encoded_jwt = jwt.encode(to_encode, key, algorithm=algorithm)
     return encoded_jwt
 
 def decode_access_token(token: str) -> dict:
-    payload = jwt.decode(token, SECRET, algorithms=[ALGORITHM])
-    return payload
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = verified_tokens().get(digest)
+    if payload is not None:
+        return dict(payload)
+
+    jwt, key, algorithm = signing_key()
+    payload = jwt.decode(token, key, algorithms=[algorithm])
+    exp = payload.get("exp")
+    if exp is not None:
+        verified_tokens().set(digest, payload, ttl=float(exp) - time.time())
+    return dict(payload)
+
+def token_cache_stats() -> dict:
+    return verified_tokens().stats()
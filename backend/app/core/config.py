@@ -1,5 +1,6 @@
 # backend/app/core/config.py
 import os
+from functools import lru_cache
 from typing import List
 from pydantic_settings import BaseSettings
 
@@ -16,10 +17,84 @@ class Settings(BaseSettings):
     mongodb_uri: str
     mongodb_name: str
 
+    # Mongo connection pool
+    mongodb_max_pool_size: int = 100
+    mongodb_min_pool_size: int = 2
+    mongodb_max_idle_time_ms: int | None = None
+    mongodb_server_selection_timeout_ms: int = 5000
+    # Comma-separated wire compressors, e.g. "zstd,zlib" (zstd/snappy need extra packages)
+    mongodb_compressors: str | None = None
+
     # JWT
     jwt_secret: str
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 60
+    # Single-use refresh tokens from login, exchanged at /auth/refresh
+    refresh_token_expire_days: int = 30
+    # Verified-token cache in decode_access_token (0 disables it)
+    token_cache_max_entries: int = 4096
+
+    # Principal cache used by get_current_admin (0 entries disables it)
+    principal_cache_max_entries: int = 1024
+    principal_cache_ttl_seconds: float = 30.0
+
+    # bcrypt worker pool ("thread" or "process"); 0 workers hashes inline on the event loop
+    password_hash_workers: int = 4
+    password_hash_queue_size: int = 64
+    password_hash_executor: str = "thread"
+
+    # In-process copy of master_organizations kept current by a change stream
+    # (or by re-reading it every poll interval where change streams are unavailable)
+    master_replica_enabled: bool = False
+    master_replica_poll_seconds: float = 5.0
+
+    # Backups only write documents changed since the last backup (new _id or a
+    # newer updated_at); backups before a rename/delete are always full.
+    # Incrementals record no deletions, and miss edits that leave updated_at
+    # alone: restoring a chain brings deleted documents back.
+    incremental_backups: bool = False
+    # Backup store: content-addressed gzip objects, an index, and retention
+    # (0 disables a rule; evicted in the background every interval, 0 = never)
+    backup_dir: str = "backups"
+    backup_compression_level: int = 6
+    backup_keep_last: int = 0
+    backup_max_age_days: float = 0
+    backup_max_bytes: int = 0
+    backup_eviction_interval_seconds: float = 3600.0
+
+    # Rate-limit counters. "memory://" is per process; with several workers use
+    # "sqlite:///ratelimit.db" (one host) or "redis-compat://host:6379/0"
+    rate_limit_storage_uri: str = "memory://"
+    # "fixed-window" or "moving-window" (memory and sqlite only)
+    rate_limit_strategy: str = "fixed-window"
+    # TESTING=1 turns rate limiting off (test suites, CI)
+    testing: bool = False
+
+    # Background jobs for org rename/delete (per-process worker counts per job type)
+    job_update_concurrency: int = 2
+    job_delete_concurrency: int = 2
+    # a running job whose heartbeat stops for this long is picked up again
+    job_lease_seconds: float = 60.0
+    job_poll_seconds: float = 2.0
+    job_max_attempts: int = 3
+    # finished jobs are removed by a TTL index after this many hours
+    job_retention_hours: int = 168
+
+    # Tenants renamed/deleted at once by one /admin/batch-* job
+    org_batch_concurrency: int = 8
+
+    # Where new tenants keep their data: "collection" (one org_<name> collection
+    # each) or "shared" (one collection, documents keyed by tenant_id). Existing
+    # tenants are moved with scripts/migrate_tenant_storage.py
+    tenant_storage: str = "collection"
+
+    # GET /admin/stats: report reused for this long (then refreshed in the
+    # background) and collStats calls in flight at once while building it
+    tenant_stats_ttl_seconds: float = 300.0
+    tenant_stats_concurrency: int = 16
+
+    # Tenant rename: "auto" (renameCollection, copy fallback), "server" or "copy"
+    org_rename_strategy: str = "auto"
 
     # Superadmin demo credentials (optional; set in .env for local demo)
     superadmin_username: str | None = None
@@ -38,4 +113,37 @@ class Settings(BaseSettings):
         # If none provided, default to wildcard for dev; override in production
         return parsed if parsed else ["*"]
 
-settings = Settings()
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Read and validate the environment once, on first use, then reuse it."""
+    return Settings()
+
+
+class Lazy:
+    """
+    Module-level stand-in for an object built on first use by `factory` (an
+    lru_cache'd getter such as get_settings), so importing a module never
+    reads the environment. Attribute reads, writes and deletes (tests,
+    monkeypatch) go to the built object.
+    """
+
+    __slots__ = ("_factory",)
+
+    def __init__(self, factory):
+        object.__setattr__(self, "_factory", factory)
+
+    def __getattr__(self, name):
+        return getattr(self._factory(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._factory(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self._factory(), name)
+
+    def __repr__(self):
+        return repr(self._factory())
+
+
+# kept for existing `from app.core.config import settings` imports
+settings = Lazy(get_settings)
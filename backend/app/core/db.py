@@ -1,13 +1,207 @@
 # backend/app/core/db.py
-import motor.motor_asyncio
+import time
+import asyncio
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+from pymongo import monitoring
+from pymongo.errors import OperationFailure, PyMongoError
+
 from app.core.config import settings
+from app.core.metrics import command_metrics
+
+if TYPE_CHECKING:
+    import motor.motor_asyncio
+
+logger = logging.getLogger(__name__)
 
-client: motor.motor_asyncio.AsyncIOMotorClient | None = None
+client: "motor.motor_asyncio.AsyncIOMotorClient | None" = None
 db = None
+# set once ensure_indexes() has completed against the live server
+indexes_ready = False
+# why the last warm-up failed, for /ready; None once it has succeeded
+bootstrap_error: "str | None" = None
+_bootstrap_task: "asyncio.Task | None" = None
+
+MASTER_COLLECTION = "master_organizations"
+JOBS_COLLECTION = "jobs"
+REFRESH_TOKENS_COLLECTION = "refresh_tokens"
+ORG_COLLECTION_PREFIX = "org_"
+# every tenant's documents when TENANT_STORAGE=shared, keyed by tenant_id
+SHARED_TENANT_COLLECTION = "tenant_data"
+# concurrent createIndexes calls when sweeping org_* collections at startup
+INDEX_SWEEP_CONCURRENCY = 16
+# first delay before retrying a failed warm-up in the background; doubles up to the max
+BOOTSTRAP_RETRY_SECONDS = 1.0
+BOOTSTRAP_RETRY_MAX_SECONDS = 30.0
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """
+    Counts connection pool events so /ready can report pool state.
+    pymongo calls these from its own threads, hence the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.checked_out = 0
+        self.created_total = 0
+        self.check_out_failures = 0
+        self.pool_clears = 0
+
+    def _add(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def connection_created(self, event):
+        self._add(open=1, created_total=1)
+
+    def connection_closed(self, event):
+        self._add(open=-1)
+
+    def connection_checked_out(self, event):
+        self._add(checked_out=1)
+
+    def connection_checked_in(self, event):
+        self._add(checked_out=-1)
+
+    def connection_check_out_failed(self, event):
+        self._add(check_out_failures=1)
+
+    def pool_cleared(self, event):
+        self._add(pool_clears=1)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "open": self.open,
+                "in_use": self.checked_out,
+                "idle": max(self.open - self.checked_out, 0),
+                "created_total": self.created_total,
+                "check_out_failures": self.check_out_failures,
+                "pool_clears": self.pool_clears,
+                "min_pool_size": settings.mongodb_min_pool_size,
+                "max_pool_size": settings.mongodb_max_pool_size,
+            }
+
+
+pool_stats = PoolStats()
+
+
+def client_options() -> dict:
+    """AsyncIOMotorClient keyword arguments built from Settings."""
+    options = {
+        "maxPoolSize": settings.mongodb_max_pool_size,
+        "minPoolSize": settings.mongodb_min_pool_size,
+        "serverSelectionTimeoutMS": settings.mongodb_server_selection_timeout_ms,
+        "event_listeners": [pool_stats, command_metrics],
+    }
+    if settings.mongodb_max_idle_time_ms is not None:
+        options["maxIdleTimeMS"] = settings.mongodb_max_idle_time_ms
+    if settings.mongodb_compressors:
+        options["compressors"] = settings.mongodb_compressors
+    return options
+
+
+async def ping() -> float:
+    """Round trip to the server; returns latency in milliseconds."""
+    started = time.perf_counter()
+    await client.admin.command("ping")
+    return (time.perf_counter() - started) * 1000
+
+
+async def warm_up():
+    """
+    Ping the server and open the minimum pool up front, so the first
+    requests after a deploy do not pay for TCP/TLS/auth handshakes.
+    """
+    global indexes_ready, bootstrap_error
+    try:
+        # concurrent pings each need their own connection
+        await asyncio.gather(*(ping() for _ in range(max(settings.mongodb_min_pool_size, 1))))
+        await ensure_indexes()
+    except PyMongoError as e:
+        bootstrap_error = str(e)
+        raise
+    indexes_ready = True
+    bootstrap_error = None
+
+
+async def retry_bootstrap(delay: float = BOOTSTRAP_RETRY_SECONDS) -> None:
+    """Retry warm_up() with backoff until it succeeds."""
+    while True:
+        await asyncio.sleep(delay)
+        try:
+            await warm_up()
+            logger.info("MongoDB warm-up succeeded on retry")
+            return
+        except PyMongoError as e:
+            delay = min(delay * 2, BOOTSTRAP_RETRY_MAX_SECONDS)
+            logger.error("MongoDB warm-up failed, retrying in %.0fs: %s", delay, e)
+
+
+def start_bootstrap_retry() -> None:
+    """Run retry_bootstrap() in the background, at most once per process."""
+    global _bootstrap_task
+    if _bootstrap_task is None or _bootstrap_task.done():
+        _bootstrap_task = asyncio.ensure_future(retry_bootstrap())
+
+
+async def readiness() -> dict:
+    """
+    Status for /ready: server reachable, indexes in place, pool numbers.
+    Only reports; a failed warm-up is retried by the background bootstrap,
+    never by the probe.
+    """
+    status = {
+        "ready": False,
+        "mongo": {"ok": False},
+        "indexes": {"ready": indexes_ready},
+        "pool": pool_stats.snapshot(),
+    }
+    if client is None or db is None:
+        status["mongo"]["error"] = "not connected"
+        return status
+
+    try:
+        status["mongo"]["latency_ms"] = round(await ping(), 2)
+        status["mongo"]["ok"] = True
+    except PyMongoError as e:
+        status["mongo"]["error"] = str(e)
+        return status
+
+    if not indexes_ready:
+        status["indexes"]["error"] = bootstrap_error or "pending"
+        return status
+
+    status["ready"] = True
+    return status
+
 
 async def connect_to_mongo():
     global client, db
-    client = motor.motor_asyncio.AsyncIOMotorClient(settings.mongodb_uri)
+    # imported here rather than at module load to keep it off the cold-start path
+    import motor.motor_asyncio
+
+    client = motor.motor_asyncio.AsyncIOMotorClient(settings.mongodb_uri, **client_options())
 
     # prefer explicit DB name from settings, otherwise try get_default_database()
     if settings.mongodb_name:
@@ -25,9 +219,88 @@ async def connect_to_mongo():
             ) from e
 
     print("Connected to MongoDB (db):", getattr(db, "name", str(db)))
+    try:
+        await warm_up()
+    except PyMongoError as e:
+        # keep the worker up; /ready answers 503 until a background retry succeeds
+        logger.error("MongoDB warm-up failed: %s", e)
+        start_bootstrap_retry()
+
 
 async def close_mongo():
-    global client
+    global indexes_ready, _bootstrap_task
+    indexes_ready = False
+    if _bootstrap_task is not None:
+        _bootstrap_task.cancel()
+        await asyncio.gather(_bootstrap_task, return_exceptions=True)
+        _bootstrap_task = None
     if client:
         client.close()
         print("MongoDB connection closed")
+
+
+async def ensure_org_indexes(coll_name: str, database=None):
+    """Indexes every org_* collection needs (admin lookup by email on login)."""
+    database = database if database is not None else db
+    await database[coll_name].create_index("email")
+
+
+async def ensure_job_indexes(database=None):
+    database = database if database is not None else db
+    jobs = database[JOBS_COLLECTION]
+    # one active job per tenant; the field is removed when the job finishes
+    await jobs.create_index("active_key", unique=True, sparse=True)
+    await jobs.create_index([("type", 1), ("status", 1), ("created_at", 1)])
+    await jobs.create_index("finished_at", expireAfterSeconds=settings.job_retention_hours * 3600)
+
+
+async def ensure_refresh_token_indexes(database=None):
+    database = database if database is not None else db
+    tokens = database[REFRESH_TOKENS_COLLECTION]
+    await tokens.create_index("token_hash", unique=True)
+    await tokens.create_index("family")
+    await tokens.create_index("organization_name")
+    # removed by the server once expired
+    await tokens.create_index("expires_at", expireAfterSeconds=0)
+
+
+async def ensure_shared_tenant_indexes(database=None):
+    """Compound indexes that scope every shared-collection query to one tenant."""
+    database = database if database is not None else db
+    shared = database[SHARED_TENANT_COLLECTION]
+    await shared.create_index([("tenant_id", 1), ("email", 1)])
+    # per-tenant scans in _id order (backups, migration)
+    await shared.create_index([("tenant_id", 1), ("_id", 1)])
+
+
+async def ensure_indexes(database=None):
+    """
+    Idempotently create the indexes the routes rely on.
+    The unique master indexes are what make org creation race-free.
+    """
+    database = database if database is not None else db
+    master = database[MASTER_COLLECTION]
+    for keys, unique in (("organization_name", True), ("admin_email", True), ("admin_id", False)):
+        try:
+            await master.create_index(keys, unique=unique)
+        except OperationFailure as e:
+            # most likely pre-existing duplicates
+            logger.error("Could not create index %s on %s: %s", keys, MASTER_COLLECTION, e)
+            if unique:
+                # create_org relies on these to reject duplicates; not ready without them
+                raise
+
+    await ensure_job_indexes(database)
+    await ensure_refresh_token_indexes(database)
+
+    if settings.tenant_storage == "shared":
+        await ensure_shared_tenant_indexes(database)
+
+    names = await database.list_collection_names(filter={"name": {"$regex": f"^{ORG_COLLECTION_PREFIX}"}})
+    sem = asyncio.Semaphore(INDEX_SWEEP_CONCURRENCY)
+
+    async def ensure(name):
+        async with sem:
+            await ensure_org_indexes(name, database)
+
+    await asyncio.gather(*(ensure(n) for n in names))
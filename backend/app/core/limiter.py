@@ -1,5 +1,76 @@
 # backend/app/core/limiter.py
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+import functools
 
-limiter = Limiter(key_func=get_remote_address)
+from app.core.config import settings
+
+
+def _build_limiter():
+    from slowapi import Limiter
+    from slowapi.util import get_remote_address
+
+    from app.core import rate_limit_storage  # noqa: F401  registers sqlite:// and redis-compat://
+
+    return Limiter(
+        key_func=get_remote_address,
+        enabled=not settings.testing,
+        storage_uri=settings.rate_limit_storage_uri,
+        strategy=settings.rate_limit_strategy,
+    )
+
+
+class LazyLimiter:
+    """
+    Stands in for slowapi's Limiter so slowapi and limits are imported when a
+    limited route is first called rather than at startup. Attribute reads and
+    writes (e.g. `limiter.enabled = False`) go to the real Limiter.
+    """
+
+    def __init__(self, factory):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_limiter", None)
+
+    def _get(self):
+        if self._limiter is None:
+            object.__setattr__(self, "_limiter", self._factory())
+        return self._limiter
+
+    def limit(self, limit_value, **kwargs):
+        """Like Limiter.limit; slowapi wraps the route on its first call (async routes only)."""
+
+        def decorator(func):
+            limited = None
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kw):
+                nonlocal limited
+                if limited is None:
+                    limited = self._get().limit(limit_value, **kwargs)(func)
+                return await limited(*args, **kw)
+
+            return wrapper
+
+        return decorator
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._get(), name, value)
+
+
+limiter = LazyLimiter(_build_limiter)
+
+
+async def rate_limit_exceeded_handler(request, exc):
+    """
+    Handler for HTTP 429, registered by status code so slowapi is not imported
+    at startup: RateLimitExceeded gets slowapi's response, anything else the
+    default one.
+    """
+    from fastapi.exception_handlers import http_exception_handler
+    from slowapi import _rate_limit_exceeded_handler
+    from slowapi.errors import RateLimitExceeded
+
+    if isinstance(exc, RateLimitExceeded):
+        return _rate_limit_exceeded_handler(request, exc)
+    return await http_exception_handler(request, exc)
@@ -0,0 +1,175 @@
+# backend/app/core/metrics.py
+import time
+import bisect
+import threading
+import contextvars
+from typing import Dict, Optional, Tuple
+
+from pymongo import monitoring
+
+# seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 8, 13, 21, 34)
+# driver housekeeping, not caused by requests
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "saslStart", "saslContinue", "endSessions"}
+UNMATCHED_ROUTE = "unmatched"
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, rendered in Prometheus text format."""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[idx] += 1
+            series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return sum(series[:-1]) if series else 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for labels, series in items:
+            base = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(self.label_names, labels))
+            sep = "," if base else ""
+            cumulative = 0
+            for bound, n in zip(self.buckets, series):
+                cumulative += n
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {cumulative}')
+            cumulative += series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-1]}")
+            lines.append(f"{self.name}_count{{{base}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route and status", ("method", "route", "status"),
+)
+mongo_command_duration = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency by command, collection and route",
+    ("command", "collection", "route", "outcome"),
+)
+mongo_commands_per_request = Histogram(
+    "mongo_commands_per_request", "MongoDB round trips made while serving one request",
+    ("method", "route"), buckets=COUNT_BUCKETS,
+)
+
+REGISTRY = (http_request_duration, mongo_command_duration, mongo_commands_per_request)
+
+
+# The ASGI scope of the request being served. Motor runs pymongo calls in a
+# thread pool with a copy of the caller's context, so the command listener
+# sees the request that issued the command.
+_current_request: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("current_request", default=None)
+
+
+def _route_of(scope: Optional[dict]) -> str:
+    if scope is None:
+        return "background"
+    # newer FastAPI keeps included routes un-prefixed and records the
+    # effective (prefixed) route separately
+    route = (scope.get("fastapi") or {}).get("effective_route_context") or scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every MongoDB command and tags it with the collection and route."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple, Tuple[str, str, Optional[dict]]] = {}
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        target = event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else event.database_name
+        scope = _current_request.get()
+        if scope is not None:
+            state = scope.setdefault("state", {})
+            state["mongo_commands"] = state.get("mongo_commands", 0) + 1
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (collection, _route_of(scope), scope)
+
+    def _finish(self, event, outcome: str):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        collection, route, scope = pending
+        if route == UNMATCHED_ROUTE:
+            # routing had not resolved yet at start; try again now
+            route = _route_of(scope)
+        mongo_command_duration.observe(event.duration_micros / 1e6, event.command_name, collection, route, outcome)
+
+    def succeeded(self, event):
+        self._finish(event, "ok")
+
+    def failed(self, event):
+        self._finish(event, "error")
+
+
+command_metrics = MongoCommandMetrics()
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency per route template and status,
+    plus how many MongoDB commands each request made.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        token = _current_request.set(scope)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_request.reset(token)
+            route = _route_of(scope)
+            http_request_duration.observe(elapsed, scope["method"], route, str(status["code"]))
+            commands = scope.get("state", {}).get("mongo_commands", 0)
+            mongo_commands_per_request.observe(commands, scope["method"], route)
+
+
+def render_metrics() -> str:
+    return "".join(h.render() for h in REGISTRY)
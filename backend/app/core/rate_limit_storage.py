@@ -0,0 +1,232 @@
+# backend/app/core/rate_limit_storage.py
+"""
+Rate-limit storage backends shared between uvicorn workers.
+
+Importing this module registers two extra `limits` storage schemes, so they
+can be used as RATE_LIMIT_STORAGE_URI next to the built-in "memory://":
+
+  sqlite:///path/to/ratelimit.db    counters in one SQLite file (WAL mode),
+                                    shared by every process on the host;
+                                    supports fixed-window and moving-window
+  redis-compat://host:6379/0        any server speaking the Redis protocol
+                                    (Redis, Valkey, KeyDB, Dragonfly);
+                                    fixed-window, pass storage option
+                                    client=<redis-like object> to swap the client
+
+slowapi drives `limits` synchronously, so these calls run inline on the event
+loop. SQLite transactions are a few statements on a WAL file and wait at most
+`timeout` seconds (default 0.1) for another process's write lock.
+"""
+import os
+import time
+import sqlite3
+import threading
+from urllib.parse import urlparse
+
+from limits.storage import MovingWindowSupport, Storage
+
+
+# expired counters and events are deleted at most this often (per process)
+PRUNE_INTERVAL_SECONDS = 60.0
+
+
+class SQLiteStorage(Storage, MovingWindowSupport):
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        # sqlite:///relative.db or sqlite:////absolute/path.db
+        self.path = uri[len("sqlite:///"):] or "ratelimit.db"
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._next_prune = 0.0
+        # longest moving window seen; older events can no longer count
+        self._max_expiry = 0
+        self._conn = sqlite3.connect(
+            self.path, timeout=float(options.get("timeout", 0.1)),
+            isolation_level=None, check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS counters (key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS events (key TEXT NOT NULL, ts REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS events_key_ts ON events (key, ts)")
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _tx(self, fn):
+        # BEGIN IMMEDIATE takes the write lock up front, so read-modify-write
+        # sequences are atomic across processes sharing the file
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def _maybe_prune(self, now: float) -> None:
+        # windows that are never hit again would otherwise stay in the file for good
+        if now < self._next_prune:
+            return
+        self._next_prune = now + PRUNE_INTERVAL_SECONDS
+
+        def op(conn):
+            conn.execute("DELETE FROM counters WHERE expires_at <= ?", (now,))
+            if self._max_expiry:
+                conn.execute("DELETE FROM events WHERE ts <= ?", (now - self._max_expiry,))
+
+        self._tx(op)
+
+    # fixed window -------------------------------------------------------
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+
+        def op(conn):
+            conn.execute(
+                "INSERT INTO counters (key, value, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET "
+                "value = CASE WHEN expires_at <= ? THEN excluded.value ELSE value + excluded.value END, "
+                "expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at ELSE expires_at END",
+                (key, amount, now + expiry, now, now),
+            )
+            return conn.execute("SELECT value FROM counters WHERE key = ?", (key,)).fetchone()[0]
+
+        value = self._tx(op)
+        self._maybe_prune(now)
+        return value
+
+    def get(self, key: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM counters WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        with self._lock:
+            row = self._conn.execute("SELECT expires_at FROM counters WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else time.time()
+
+    def clear(self, key: str) -> None:
+        def op(conn):
+            conn.execute("DELETE FROM counters WHERE key = ?", (key,))
+            conn.execute("DELETE FROM events WHERE key = ?", (key,))
+
+        self._tx(op)
+
+    def check(self) -> bool:
+        try:
+            with self._lock:
+                self._conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int:
+        def op(conn):
+            n = conn.execute("SELECT COUNT(*) FROM counters").fetchone()[0]
+            n += conn.execute("SELECT COUNT(DISTINCT key) FROM events").fetchone()[0]
+            conn.execute("DELETE FROM counters")
+            conn.execute("DELETE FROM events")
+            return n
+
+        return self._tx(op)
+
+    # moving (sliding) window ---------------------------------------------
+
+    def acquire_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        self._max_expiry = max(self._max_expiry, expiry)
+
+        def op(conn):
+            conn.execute("DELETE FROM events WHERE key = ? AND ts <= ?", (key, now - expiry))
+            used = conn.execute("SELECT COUNT(*) FROM events WHERE key = ?", (key,)).fetchone()[0]
+            if used + amount > limit:
+                return False
+            conn.executemany("INSERT INTO events (key, ts) VALUES (?, ?)", [(key, now)] * amount)
+            return True
+
+        acquired = self._tx(op)
+        self._maybe_prune(now)
+        return acquired
+
+    def get_moving_window(self, key: str, limit: int, expiry: int) -> tuple[float, int]:
+        now = time.time()
+        with self._lock:
+            oldest, count = self._conn.execute(
+                "SELECT MIN(ts), COUNT(*) FROM events WHERE key = ? AND ts > ?", (key, now - expiry)
+            ).fetchone()
+        return (oldest, count) if count else (now, 0)
+
+
+class RedisCompatStorage(Storage):
+    """
+    Fixed-window counters on a Redis-protocol server using only SET, INCRBY,
+    GET, PTTL, DEL and PING (plus a MULTI pipeline), so any Redis-compatible
+    server or an in-process stand-in with those methods works.
+    """
+
+    STORAGE_SCHEME = ["redis-compat"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, client=None, key_prefix: str = "ratelimit:", **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        if client is None:
+            import redis  # optional dependency, only needed for this backend
+
+            parsed = urlparse(uri)
+            client = redis.Redis.from_url(parsed._replace(scheme="redis").geturl())
+        self.client = client
+        self.key_prefix = key_prefix
+
+    @property
+    def base_exceptions(self):
+        try:
+            import redis
+
+            return redis.RedisError
+        except ImportError:
+            return ConnectionError
+
+    def _k(self, key: str) -> str:
+        return self.key_prefix + key
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        # the first hit of a window creates the key with its TTL (SET NX EX) in
+        # the same MULTI as the INCRBY, so a counter never exists without one
+        pipe = self.client.pipeline()
+        pipe.set(self._k(key), 0, ex=int(expiry), nx=True)
+        pipe.incrby(self._k(key), amount)
+        _, value = pipe.execute()
+        return int(value)
+
+    def get(self, key: str) -> int:
+        value = self.client.get(self._k(key))
+        return int(value) if value is not None else 0
+
+    def get_expiry(self, key: str) -> float:
+        ttl_ms = self.client.pttl(self._k(key))
+        return time.time() + max(ttl_ms, 0) / 1000.0
+
+    def clear(self, key: str) -> None:
+        self.client.delete(self._k(key))
+
+    def check(self) -> bool:
+        try:
+            return bool(self.client.ping())
+        except Exception:
+            return False
+
+    def reset(self) -> None:
+        # keys are namespaced by key_prefix; bulk deletion is left to the server's tooling
+        return None
@@ -0,0 +1,57 @@
+# backend/app/core/responses.py
+"""
+App-wide JSON response class that encodes MongoDB documents as they come.
+
+ObjectId and Decimal128 become strings, datetimes ISO 8601 strings, so
+handlers can return Motor results without converting them first. Uses orjson
+when installed and the standard library otherwise.
+
+Return BSONJSONResponse(...) directly from a handler to also skip FastAPI's
+jsonable_encoder pass, which walks every value in Python.
+"""
+import datetime
+import json
+import uuid
+from typing import Any
+
+from bson import Decimal128, ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def _default(obj: Any):
+    if isinstance(obj, (ObjectId, Decimal128, uuid.UUID)):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    # orjson encodes these itself; the stdlib fallback needs them spelled out
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+else:
+
+    def dumps(content: Any) -> bytes:
+        return json.dumps(
+            content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+        ).encode("utf-8")
+
+
+class BSONJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,116 @@
+# backend/app/core/tenancy.py
+"""
+Where a tenant's documents live.
+
+A master document either names the tenant's own collection
+({"collection_name": "org_acme"}) or, for tenants in the shared collection,
+carries a tenant_id ({"collection_name": "tenant_data", "tenant_id": <master
+_id>}). tenant_collection(org) hides the difference: both give the Motor
+collection methods the routes use, the shared one scoped to the tenant.
+
+In the shared collection a tenant rename is just a master document update,
+and thousands of tenants cost one collection and two indexes instead of a
+collection and an index each.
+"""
+from typing import Optional
+
+from bson import ObjectId
+
+from app.core import db as core_db
+from app.core.config import settings
+
+STORAGE_MODES = ("collection", "shared")
+
+
+def is_shared(org: dict) -> bool:
+    return org.get("tenant_id") is not None
+
+
+def own_collection_name(org_name: str) -> str:
+    return f"{core_db.ORG_COLLECTION_PREFIX}{org_name}"
+
+
+def storage_fields(org_name: str, master_id: ObjectId, mode: Optional[str] = None) -> dict:
+    """collection_name (and tenant_id) for a new tenant's master document."""
+    mode = mode or settings.tenant_storage
+    if mode not in STORAGE_MODES:
+        raise ValueError(f"Unknown tenant storage mode: {mode}")
+    if mode == "shared":
+        return {"collection_name": core_db.SHARED_TENANT_COLLECTION, "tenant_id": master_id}
+    return {"collection_name": own_collection_name(org_name)}
+
+
+def tenant_ref(org: dict) -> dict:
+    """The fields job params need to find a tenant's documents."""
+    ref = {"organization_name": org["organization_name"], "collection_name": org["collection_name"]}
+    if is_shared(org):
+        ref["tenant_id"] = org["tenant_id"]
+    return ref
+
+
+class TenantCollection:
+    """
+    One tenant's slice of the shared collection. Filters are scoped to the
+    tenant_id and inserted documents are stamped with it; drop() removes the
+    tenant's documents only.
+    """
+
+    def __init__(self, collection, tenant_id):
+        self._coll = collection
+        self.tenant_id = tenant_id
+
+    @property
+    def name(self) -> str:
+        return self._coll.name
+
+    def _scoped(self, filter: Optional[dict]) -> dict:
+        return {**(filter or {}), "tenant_id": self.tenant_id}
+
+    def _stamped(self, doc: dict) -> dict:
+        doc["tenant_id"] = self.tenant_id
+        return doc
+
+    def find(self, filter: Optional[dict] = None, *args, **kwargs):
+        return self._coll.find(self._scoped(filter), *args, **kwargs)
+
+    async def find_one(self, filter: Optional[dict] = None, *args, **kwargs):
+        return await self._coll.find_one(self._scoped(filter), *args, **kwargs)
+
+    async def count_documents(self, filter: Optional[dict] = None, **kwargs) -> int:
+        return await self._coll.count_documents(self._scoped(filter), **kwargs)
+
+    async def insert_one(self, doc: dict, **kwargs):
+        return await self._coll.insert_one(self._stamped(doc), **kwargs)
+
+    async def insert_many(self, docs, **kwargs):
+        return await self._coll.insert_many([self._stamped(d) for d in docs], **kwargs)
+
+    async def update_one(self, filter: dict, update, **kwargs):
+        return await self._coll.update_one(self._scoped(filter), update, **kwargs)
+
+    async def update_many(self, filter: dict, update, **kwargs):
+        return await self._coll.update_many(self._scoped(filter), update, **kwargs)
+
+    async def delete_one(self, filter: dict, **kwargs):
+        return await self._coll.delete_one(self._scoped(filter), **kwargs)
+
+    async def delete_many(self, filter: dict, **kwargs):
+        return await self._coll.delete_many(self._scoped(filter), **kwargs)
+
+    async def drop(self) -> None:
+        await self._coll.delete_many({"tenant_id": self.tenant_id})
+
+
+def tenant_collection(org: dict, database=None):
+    """The collection holding a tenant's documents, given its master document (or tenant_ref)."""
+    database = database if database is not None else core_db.db
+    if is_shared(org):
+        return TenantCollection(database[core_db.SHARED_TENANT_COLLECTION], org["tenant_id"])
+    return database[org["collection_name"]]
+
+
+async def provision_tenant(org: dict, admin_doc: dict, database=None) -> None:
+    """Store a new tenant's admin document (and, for an own collection, its indexes)."""
+    await tenant_collection(org, database).insert_one(admin_doc)
+    if not is_shared(org):
+        await core_db.ensure_org_indexes(org["collection_name"], database)
@@ -1,33 +1,107 @@
 # backend/app/main.py
 
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def create_app() -> FastAPI:
+    """
+    Build the application. Settings are validated here, once; bcrypt, jose,
+    slowapi and motor are only imported when first used (first login, first
+    token, first rate-limited call, startup connect).
+
+        uvicorn --factory app.main:create_app
+    """
+    settings = get_settings()
+
+    from pymongo.errors import PyMongoError
+
+    from app.routes import orgs, auth, jobs
+    from app.core.db import connect_to_mongo, close_mongo, readiness
+    from app.core.limiter import limiter, rate_limit_exceeded_handler
+    from app.core.metrics import MetricsMiddleware, render_metrics
+    from app.core.responses import BSONJSONResponse
+    from app.services.backup_store import store_for
+    from app.services.jobs import job_queue
+    from app.services.master_replica import master_replica
+    from app.services.passwords import password_hasher
+
+    app = FastAPI(title="Org Management Backend", default_response_class=BSONJSONResponse)
+    # slowapi finds the limiter here; a tripped limit answers 429 through its handler
+    app.state.limiter = limiter
+    app.add_exception_handler(429, rate_limit_exceeded_handler)
+
+    # 🔥 REMOVE CORS COMPLETELY — ALLOW EVERYTHING 🔥
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],          
+        allow_credentials=False,      
+        allow_methods=["*"],          
+        allow_headers=["*"],          
+    )
+    # outermost, so the recorded latency covers CORS handling too
+    app.add_middleware(MetricsMiddleware)
+
+    @app.on_event("startup")
+    async def startup_event():
+        await connect_to_mongo()
+        if settings.master_replica_enabled:
+            try:
+                await master_replica.start()
+            except PyMongoError as e:
+                # lookups fall back to MongoDB until the replica is started
+                logger.warning("Master replica not started: %s", e)
+        # picks up jobs queued or interrupted before this process started
+        job_queue.start()
+        # retention for BACKUP_DIR (no-op until a BACKUP_* rule is set)
+        store_for().start()
+
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        await job_queue.stop()
+        await store_for().stop()
+        await master_replica.stop()
+        await close_mongo()
+        password_hasher.shutdown()
+
+    app.include_router(orgs.router, prefix="/org", tags=["org"])
+    app.include_router(auth.router)
+    app.include_router(jobs.router)
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok"}
 
-from app.routes import orgs, auth
-from app.core.db import connect_to_mongo, close_mongo
+    @app.get("/ready")
+    async def ready():
+        """Readiness probe: 200 only when MongoDB answers a ping; 503 otherwise."""
+        status = await readiness()
+        return JSONResponse(status, status_code=200 if status["ready"] else 503)
 
-app = FastAPI(title="Org Management Backend")
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Prometheus text exposition of request and MongoDB command histograms."""
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
-# 🔥 REMOVE CORS COMPLETELY — ALLOW EVERYTHING 🔥
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],          
-    allow_credentials=False,      
-    allow_methods=["*"],          
-    allow_headers=["*"],          
-)
+    return app
 
-@app.on_event("startup")
-async def startup_event():
-    await connect_to_mongo()
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    await close_mongo()
+_app: FastAPI | None = None
 
-app.include_router(orgs.router, prefix="/org", tags=["org"])
-app.include_router(auth.router)
 
-@app.get("/health")
-def health():
-    return {"status": "ok"}
+def __getattr__(name):
+    # `uvicorn app.main:app` and `from app.main import app` keep working; the
+    # app is built on first access instead of at import
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
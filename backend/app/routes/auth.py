@@ -1,19 +1,52 @@
 # backend/app/routes/auth.py
-from fastapi import APIRouter, HTTPException, Depends, Request
-from pydantic import BaseModel, EmailStr
-from passlib.hash import bcrypt_sha256
+
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from functools import lru_cache
+from typing import List, Optional
+
+from pydantic import BaseModel, EmailStr, Field
 from fastapi.security import OAuth2PasswordBearer
 
 from app.core.limiter import limiter
-from slowapi import _rate_limit_exceeded_handler  # keep import if your app registers handler centrally
 
 from app.core import db as core_db
-from app.core.auth import create_access_token, decode_access_token
-from app.core.config import settings
+from app.core.auth import create_access_token, decode_access_token, token_cache_stats
+from app.core.cache import TTLCache
+from app.core.config import Lazy, settings
+from app.core.responses import BSONJSONResponse, dumps
+from app.core.tenancy import tenant_collection, tenant_ref
+from app.routes.jobs import job_accepted, requester_of, submit_job
+from app.services.jobs import JobConflict, job_queue
+from app.services.master_replica import first_match, master_replica
+from app.services.tenant_stats import tenant_stats
+from app.services.passwords import PasswordHasherBusy, verify_password
+from app.services import refresh_tokens
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/admin/login")
 
+@lru_cache(maxsize=None)
+def get_principal_cache() -> TTLCache:
+    """Resolved {"admin", "org"} principals keyed by the token's (admin_id, organization_name)."""
+    return TTLCache(
+        max_entries=settings.principal_cache_max_entries,
+        ttl_seconds=settings.principal_cache_ttl_seconds,
+    )
+
+
+principal_cache = Lazy(get_principal_cache)
+
+
+def invalidate_principals(org_name: str) -> int:
+    """
+    Drop cached principals for an organization. Must be called by every route
+    that renames, re-emails or deletes an org so stale tenants are not served.
+    """
+    return principal_cache.discard_where(
+        lambda key, value: key[1] == org_name or value["org"].get("organization_name") == org_name
+    )
+
 
 # -------------------------
 # Schemas
@@ -26,6 +59,21 @@ class LoginIn(BaseModel):
 class LoginResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    expires_in: int = 0
+    refresh_token: Optional[str] = None
+
+
+class RefreshIn(BaseModel):
+    refresh_token: str
+
+
+def _token_response(access_token: str, refresh_token: Optional[str] = None) -> dict:
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_in": settings.access_token_expire_minutes * 60,
+        "refresh_token": refresh_token,
+    }
 
 
 class SuperLoginIn(BaseModel):
@@ -40,8 +88,7 @@ async def admin_login(request: Request, payload: LoginIn):
     if core_db.db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
 
-    master = core_db.db["master_organizations"]
-    master_doc = await master.find_one({"admin_email": payload.email})
+    master_doc = await master_replica.find_one("admin_email", payload.email)
     if not master_doc:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
@@ -49,12 +96,15 @@ async def admin_login(request: Request, payload: LoginIn):
     if not org_coll_name:
         raise HTTPException(status_code=500, detail="Organization collection missing")
 
-    org_coll = core_db.db[org_coll_name]
-    admin = await org_coll.find_one({"email": payload.email})
+    org_coll = tenant_collection(master_doc)
+    admin = await org_coll.find_one({"email": payload.email}, {"password_hash": 1})
     if not admin or "password_hash" not in admin:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    valid = bcrypt_sha256.verify(payload.password, admin["password_hash"])
+    try:
+        valid = await verify_password(payload.password, admin["password_hash"])
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry")
     if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
@@ -65,7 +115,8 @@ async def admin_login(request: Request, payload: LoginIn):
         "role": "org_admin",
     }
     access_token = create_access_token(subject=str(admin["_id"]), data=token_data)
-    return {"access_token": access_token, "token_type": "bearer"}
+    refresh_token = await refresh_tokens.issue(str(admin["_id"]), token_data)
+    return _token_response(access_token, refresh_token)
 
 
 @router.post("/super/login", response_model=LoginResponse, tags=["auth"])
@@ -87,7 +138,34 @@ async def super_login(payload: SuperLoginIn):
         "username": payload.username,
     }
     access_token = create_access_token(subject=payload.username, data=token_data)
-    return {"access_token": access_token, "token_type": "bearer"}
+    return _token_response(access_token)
+
+
+@router.post("/auth/refresh", response_model=LoginResponse, tags=["auth"])
+async def refresh_access_token(payload: RefreshIn):
+    """
+    Exchange a refresh token from /admin/login for a new access token and a
+    new refresh token (the old one stops working). No password check and no
+    tenant lookups: one findAndModify and one insert.
+    """
+    if core_db.db is None:
+        raise HTTPException(status_code=500, detail="Database not initialized")
+
+    try:
+        subject, claims, refresh_token = await refresh_tokens.rotate(payload.refresh_token)
+    except refresh_tokens.InvalidRefreshToken as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    return _token_response(create_access_token(subject=subject, data=claims), refresh_token)
+
+
+@router.post("/auth/logout", tags=["auth"])
+async def logout(payload: RefreshIn):
+    """Revoke a refresh token and every token rotated from the same login."""
+    if core_db.db is None:
+        raise HTTPException(status_code=500, detail="Database not initialized")
+
+    await refresh_tokens.revoke(payload.refresh_token)
+    return {"ok": True}
 
 
 async def get_current_admin(token: str = Depends(oauth2_scheme)):
@@ -107,50 +185,45 @@ async def get_current_admin(token: str = Depends(oauth2_scheme)):
     if not admin_id and not admin_email:
         raise HTTPException(status_code=401, detail="Invalid token payload")
 
+    cache_key = (admin_id or admin_email, org_name)
+    cached = principal_cache.get(cache_key)
+    if cached is not None:
+        return {"admin": cached["admin"], "org": cached["org"]}
+
     if core_db.db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
 
-    master = core_db.db["master_organizations"]
-    master_doc = None
-
-    # 1) Primary: try exact organization_name
-    if org_name:
-        master_doc = await master.find_one({"organization_name": org_name})
-
-    # 2) Fallback: try admin_email
-    if not master_doc and admin_email:
-        master_doc = await master.find_one({"admin_email": admin_email})
-
-    # 3) Extra fallback: try admin_id stored in master (ObjectId or string)
-    if not master_doc and admin_id:
-        import bson
-        try:
-            master_doc = await master.find_one({"admin_id": bson.ObjectId(admin_id)})
-        except Exception:
-            master_doc = await master.find_one({"admin_id": admin_id})
-
+    # organization_name first, then admin_email, then admin_id (ObjectId or
+    # string), all in one $or query; served from the in-process replica when it is running
+    master_doc = await master_replica.find_first([
+        ("organization_name", org_name),
+        ("admin_email", admin_email),
+        ("admin_id", admin_id),
+    ])
     if not master_doc:
         raise HTTPException(status_code=401, detail="Organization not found")
 
-    # Now resolve admin inside the resolved org collection
-    org_coll = core_db.db[master_doc["collection_name"]]
-    admin = None
+    # Now resolve admin inside the resolved org collection: by _id when the
+    # token has a valid admin_id, else by email, in one query
     import bson
 
-    # Preferred: lookup by ObjectId if we have admin_id
-    if admin_id:
-        try:
-            admin = await org_coll.find_one({"_id": bson.ObjectId(admin_id)})
-        except Exception:
-            admin = None
-
-    # Fallback: lookup by email
-    if not admin and admin_email:
-        admin = await org_coll.find_one({"email": admin_email})
+    org_coll = tenant_collection(master_doc)
+    by_id = {"_id": bson.ObjectId(admin_id)} if admin_id and bson.ObjectId.is_valid(admin_id) else None
+    by_email = {"email": admin_email} if admin_email else None
+    clauses = [c for c in (by_id, by_email) if c]
+    admins = []
+    if clauses:
+        query = clauses[0] if len(clauses) == 1 else {"$or": clauses}
+        # the principal is cached; it has no use for the password hash
+        admins = await org_coll.find(query, {"password_hash": 0}).to_list(length=2)
+    admin = None
+    if admins:
+        admin = next((a for a in admins if by_id and a["_id"] == by_id["_id"]), admins[0])
 
     if not admin:
         raise HTTPException(status_code=401, detail="Admin not found")
 
+    principal_cache.set(cache_key, {"admin": admin, "org": master_doc})
     return {"admin": admin, "org": master_doc}
 
 
@@ -172,26 +245,116 @@ async def get_current_superadmin(token: str = Depends(oauth2_scheme)):
     return payload
 
 
+MASTER_LIST_DEFAULT_LIMIT = 100
+MASTER_LIST_MAX_LIMIT = 1000
+
+
 @router.get("/admin/master-list", tags=["admin"])
-async def get_master_list(current_superadmin = Depends(get_current_superadmin)):
+async def get_master_list(
+    limit: int | None = Query(None, ge=1, le=MASTER_LIST_MAX_LIMIT),
+    cursor: str | None = None,
+    fields: str | None = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    current_superadmin = Depends(get_current_superadmin),
+):
     """
-    Superadmin endpoint to fetch all organizations in the master list.
+    Superadmin endpoint to page through organizations in the master list.
+
+    Keyset-paginated on _id: pass the returned `next_cursor` as `cursor` to get
+    the next page. `fields` is a comma-separated projection (e.g.
+    `organization_name,admin_email`). `format=ndjson` streams one organization
+    per line instead, reading the cursor as it goes (no limit unless given).
     """
     if core_db.db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
-    
-    master = core_db.db["master_organizations"]
-    organizations = await master.find({}).to_list(None)
-    
-    # Convert ObjectId to string for JSON serialization
+
     import bson
-    for org in organizations:
-        if "_id" in org:
-            org["_id"] = str(org["_id"])
-        if "admin_id" in org:
-            org["admin_id"] = str(org["admin_id"])
-    
-    return {"data": organizations}
+
+    query = {}
+    if cursor:
+        try:
+            query["_id"] = {"$gt": bson.ObjectId(cursor)}
+        except bson.errors.InvalidId:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    projection = None
+    if fields:
+        # _id is always returned, it is the pagination key
+        projection = {f.strip(): 1 for f in fields.split(",") if f.strip()}
+
+    master = core_db.db["master_organizations"]
+
+    if format == "ndjson":
+        found = master.find(query, projection).sort("_id", 1)
+        if limit:
+            found = found.limit(limit)
+
+        async def stream():
+            async for org in found:
+                yield dumps(org) + b"\n"
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    page_size = limit or MASTER_LIST_DEFAULT_LIMIT
+    # fetch one extra document to know whether another page exists
+    organizations = await master.find(query, projection).sort("_id", 1).limit(page_size + 1).to_list(None)
+    next_cursor = None
+    if len(organizations) > page_size:
+        organizations = organizations[:page_size]
+        next_cursor = str(organizations[-1]["_id"])
+
+    # ObjectIds/datetimes are encoded by the response class, no per-document pass
+    return BSONJSONResponse({"data": organizations, "next_cursor": next_cursor})
+
+
+@router.get("/admin/cache-stats", tags=["admin"])
+async def get_cache_stats(current_superadmin = Depends(get_current_superadmin)):
+    """
+    Superadmin endpoint exposing hit/miss counters of the in-process caches.
+    """
+    return {
+        "principal_cache": principal_cache.stats(),
+        "token_cache": token_cache_stats(),
+        "master_replica": master_replica.stats(),
+    }
+
+
+@router.get("/admin/stats", tags=["admin"])
+async def get_tenant_stats(
+    limit: int | None = Query(None, ge=1, description="only the N largest tenants (totals still cover all)"),
+    refresh: bool = Query(False, description="wait for a fresh report instead of the cached one"),
+    current_superadmin = Depends(get_current_superadmin),
+):
+    """
+    Superadmin endpoint: document count, data, storage and index size per
+    tenant, largest first. Served from a cache refreshed in the background.
+    """
+    if core_db.db is None:
+        raise HTTPException(status_code=500, detail="Database not initialized")
+
+    report = await tenant_stats.get(refresh=refresh)
+    if limit is not None:
+        report = {**report, "tenants": report["tenants"][:limit]}
+    return BSONJSONResponse(report)
+
+
+@router.get("/admin/backups", tags=["admin"])
+async def list_backups(
+    collection: str | None = Query(None, description="only this collection's backups (org_<name>)"),
+    limit: int = Query(100, ge=1, le=MASTER_LIST_MAX_LIMIT),
+    current_superadmin = Depends(get_current_superadmin),
+):
+    """
+    Superadmin endpoint: backups in BACKUP_DIR, newest first, from the backup
+    index, plus store totals (objects, stored and deduplicated bytes).
+    """
+    from app.services.backup_store import store_for
+
+    store = store_for()
+    return BSONJSONResponse({
+        "stats": await store.stats(),
+        "backups": await store.list(collection, limit=limit),
+    })
 
 
 class SuperadminOrgUpdate(BaseModel):
@@ -207,75 +370,50 @@ async def superadmin_update_org(
 ):
     """
     Superadmin endpoint to update organization details.
-    Requires organization_name in URL path.
+    Requires organization_name in URL path. Validates, then queues an
+    "org.update" job and answers 202; GET /jobs/{id} has the updated org.
     """
     if core_db.db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
 
-    import bson
-    from app.services.backup import backup_collection_async, copy_collection_async
-    
-    master = core_db.db["master_organizations"]
-    org = await master.find_one({"organization_name": org_name})
-    
-    if not org:
-        raise HTTPException(status_code=404, detail="Organization not found")
-
-    old_coll = org["collection_name"]
-    update_fields = {}
-
-    # Handle rename
+    new_name = None
     if payload.new_organization_name:
         new_raw = payload.new_organization_name.strip()
         if not new_raw:
             raise HTTPException(status_code=400, detail="new_organization_name cannot be empty")
-        
+
         from app.routes.orgs import sanitize_name
         new_name = sanitize_name(new_raw)
 
-        if await master.find_one({"organization_name": new_name}):
-            raise HTTPException(status_code=400, detail="New organization name already exists")
-
-        new_coll_name = f"org_{new_name}"
-
-        # Backup old collection
-        backup_path = await backup_collection_async(old_coll)
+    # the org, the new name and the new email in one query
+    lookups = [
+        ("organization_name", org_name),
+        ("organization_name", new_name),
+        ("admin_email", payload.new_admin_email),
+    ]
+    docs = await master_replica.find_any(lookups, {"organization_name": 1, "admin_email": 1})
 
-        # Copy to new collection
-        copied = await copy_collection_async(old_coll, new_coll_name)
-
-        # Verify counts
-        src_count = await core_db.db[old_coll].count_documents({})
-        dest_count = await core_db.db[new_coll_name].count_documents({})
-        if src_count != dest_count:
-            await core_db.db[new_coll_name].drop()
-            raise HTTPException(status_code=500, detail="Failed to migrate collection (count mismatch)")
-
-        # Drop old and update master
-        await core_db.db[old_coll].drop()
-        update_fields["collection_name"] = new_coll_name
-        update_fields["organization_name"] = new_name
+    if not first_match(docs, lookups[:1]):
+        raise HTTPException(status_code=404, detail="Organization not found")
 
-    # Handle admin email change
-    if payload.new_admin_email:
-        if await master.find_one({"admin_email": payload.new_admin_email, "organization_name": {"$ne": org_name}}):
-            raise HTTPException(status_code=400, detail="Email already used by another org")
+    # Validate rename
+    if new_name and first_match(docs, lookups[1:2]):
+        raise HTTPException(status_code=400, detail="New organization name already exists")
 
-        target_coll_name = update_fields.get("collection_name", old_coll)
-        org_coll = core_db.db[target_coll_name]
-        await org_coll.update_many({"email": org.get("admin_email")}, {"$set": {"email": payload.new_admin_email}})
-        update_fields["admin_email"] = payload.new_admin_email
+    # Validate admin email change
+    owner = first_match(docs, lookups[2:])
+    if owner and owner["organization_name"] != org_name:
+        raise HTTPException(status_code=400, detail="Email already used by another org")
 
-    if update_fields:
-        await master.update_one({"organization_name": org_name}, {"$set": update_fields})
-        updated = await master.find_one({"organization_name": update_fields.get("organization_name", org_name)})
-        if "_id" in updated:
-            updated["_id"] = str(updated["_id"])
-        if "admin_id" in updated:
-            updated["admin_id"] = str(updated["admin_id"])
-        return {"updated": True, "organization": updated}
+    if not new_name and not payload.new_admin_email:
+        return {"updated": False, "reason": "no changes provided"}
 
-    return {"updated": False, "reason": "no changes provided"}
+    return await submit_job(
+        "org.update",
+        {"organization_name": org_name, "new_organization_name": new_name, "new_admin_email": payload.new_admin_email},
+        key=org_name,
+        requested_by=requester_of(current_superadmin),
+    )
 
 
 @router.delete("/admin/delete-org/{org_name}", tags=["admin"])
@@ -285,31 +423,157 @@ async def superadmin_delete_org(
 ):
     """
     Superadmin endpoint to delete an organization.
-    Creates a backup before deletion.
+    Queues an "org.delete" job (backup, drop, master removal) and answers 202.
     """
     if core_db.db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
 
-    from app.services.backup import backup_collection_async
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    master = core_db.db["master_organizations"]
-    org = await master.find_one({"organization_name": org_name})
+    org = await master_replica.find_one("organization_name", org_name)
     
     if not org:
         raise HTTPException(status_code=404, detail="Organization not found")
 
-    coll_name = org["collection_name"]
+    return await submit_job(
+        "org.delete",
+        tenant_ref(org),
+        key=org_name,
+        requested_by=requester_of(current_superadmin),
+    )
+
+
+# -------------------------
+# Batch superadmin operations
+# -------------------------
+BATCH_MAX = 500
+
+
+class SuperadminBatchDelete(BaseModel):
+    organizations: List[str] = Field(..., min_length=1, max_length=BATCH_MAX)
+
+
+class SuperadminBatchUpdateItem(SuperadminOrgUpdate):
+    organization_name: str
+
+
+class SuperadminBatchUpdate(BaseModel):
+    organizations: List[SuperadminBatchUpdateItem] = Field(..., min_length=1, max_length=BATCH_MAX)
+
+
+async def _submit_batch(job_type: str, accepted: list, params_of, rejected: list, requested_by: str):
+    """
+    Queue one job for every accepted tenant, holding a lock on each. Tenants
+    another job is working on are moved to `rejected` and the rest queued.
+    Answers 202 with the job, or 200 when no tenant was left to queue.
+    """
+    while accepted:
+        try:
+            job = await job_queue.submit(
+                job_type, params_of(accepted), requested_by=requested_by,
+                keys=[a["organization_name"] for a in accepted],
+            )
+        except JobConflict as e:
+            busy = set(e.keys)
+            if not busy & {a["organization_name"] for a in accepted}:
+                raise HTTPException(status_code=409, detail=str(e))
+            rejected += [{"organization_name": n, "error": "Another operation is already in progress"} for n in sorted(busy)]
+            accepted = [a for a in accepted if a["organization_name"] not in busy]
+            continue
+        return job_accepted(job, {"accepted": [a["organization_name"] for a in accepted], "rejected": rejected})
+    return BSONJSONResponse({"job_id": None, "status": None, "accepted": [], "rejected": rejected})
+
+
+@router.post("/admin/batch-delete-orgs", tags=["admin"])
+async def superadmin_batch_delete_orgs(
+    payload: SuperadminBatchDelete,
+    current_superadmin = Depends(get_current_superadmin),
+):
+    """
+    Superadmin endpoint to delete many organizations with one "org.batch_delete"
+    job: backups and drops run ORG_BATCH_CONCURRENCY at a time and the master
+    documents go in one bulk_write. Unknown or busy orgs are listed under
+    `rejected`; GET /jobs/{id} has a result per accepted org.
+    """
+    if core_db.db is None:
+        raise HTTPException(status_code=500, detail="Database not initialized")
+
+    names = list(dict.fromkeys(payload.organizations))
+    master = core_db.db["master_organizations"]
+    found = {o["organization_name"]: o for o in await master.find({"organization_name": {"$in": names}}).to_list(None)}
+    rejected = [{"organization_name": n, "error": "Organization not found"} for n in names if n not in found]
+    accepted = [tenant_ref(found[n]) for n in names if n in found]
 
-    # Backup first
-    backup_path = await backup_collection_async(coll_name)
-    logger.info("Backup created before superadmin delete: %s", backup_path)
+    return await _submit_batch(
+        "org.batch_delete", accepted, lambda refs: {"tenants": refs}, rejected, requester_of(current_superadmin),
+    )
 
-    # Drop collection
-    await core_db.db[coll_name].drop()
 
-    # Remove master record
-    await master.delete_one({"organization_name": org_name})
+@router.post("/admin/batch-update-orgs", tags=["admin"])
+async def superadmin_batch_update_orgs(
+    payload: SuperadminBatchUpdate,
+    current_superadmin = Depends(get_current_superadmin),
+):
+    """
+    Superadmin endpoint to rename and/or re-email many organizations with one
+    "org.batch_update" job. Every change is validated up front with a single
+    master query (same rules as /admin/update-org); invalid or busy ones are
+    listed under `rejected`, the rest run ORG_BATCH_CONCURRENCY at a time and
+    their master documents are updated with one bulk_write.
+    """
+    if core_db.db is None:
+        raise HTTPException(status_code=500, detail="Database not initialized")
 
-    return {"deleted": True, "organization": org_name, "backup": backup_path}
+    from app.routes.orgs import sanitize_name
+
+    rejected, changes = [], []
+    seen_names, new_names, new_emails = set(), set(), set()
+    for item in payload.organizations:
+        name = item.organization_name
+        new_name = sanitize_name(item.new_organization_name.strip()) if item.new_organization_name else None
+        if name in seen_names:
+            error = "Duplicate organization in request"
+        elif item.new_organization_name is not None and not new_name:
+            error = "new_organization_name cannot be empty"
+        elif not new_name and not item.new_admin_email:
+            error = "no changes provided"
+        elif new_name and new_name in new_names:
+            error = "Duplicate new organization name in request"
+        elif item.new_admin_email and item.new_admin_email in new_emails:
+            error = "Duplicate admin email in request"
+        else:
+            error = None
+        seen_names.add(name)
+        if error:
+            rejected.append({"organization_name": name, "error": error})
+            continue
+        new_names.add(new_name)
+        new_emails.add(item.new_admin_email)
+        changes.append({"organization_name": name, "new_organization_name": new_name, "new_admin_email": item.new_admin_email})
+
+    # one round trip for every org, new name and email the batch refers to
+    master = core_db.db["master_organizations"]
+    existing = await master.find(
+        {"$or": [
+            {"organization_name": {"$in": [c["organization_name"] for c in changes] + [n for n in new_names if n]}},
+            {"admin_email": {"$in": [e for e in new_emails if e]}},
+        ]},
+        {"organization_name": 1, "admin_email": 1},
+    ).to_list(None)
+    names = {o["organization_name"] for o in existing}
+    email_owner = {o["admin_email"]: o["organization_name"] for o in existing}
+
+    accepted = []
+    for c in changes:
+        if c["organization_name"] not in names:
+            error = "Organization not found"
+        elif c["new_organization_name"] and c["new_organization_name"] in names:
+            error = "New organization name already exists"
+        elif c["new_admin_email"] and email_owner.get(c["new_admin_email"], c["organization_name"]) != c["organization_name"]:
+            error = "Email already used by another org"
+        else:
+            accepted.append(c)
+            continue
+        rejected.append({"organization_name": c["organization_name"], "error": error})
+
+    return await _submit_batch(
+        "org.batch_update", accepted, lambda items: {"changes": items}, rejected, requester_of(current_superadmin),
+    )
@@ -0,0 +1,55 @@
+# backend/app/routes/jobs.py
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import OAuth2PasswordBearer
+
+from app.core.auth import decode_access_token
+from app.core.responses import BSONJSONResponse
+from app.services.jobs import JobConflict, job_queue, public_job
+
+router = APIRouter()
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/admin/login")
+
+
+def requester_of(payload: dict) -> str:
+    """Who a job belongs to: the org admin's id, or the superadmin."""
+    if payload.get("role") == "superadmin":
+        return f"superadmin:{payload.get('username') or payload.get('sub')}"
+    return str(payload.get("admin_id") or payload.get("admin_email"))
+
+
+def job_accepted(job: dict, extra: Optional[dict] = None) -> BSONJSONResponse:
+    """202 with where to poll for the job (plus any `extra` fields)."""
+    status_url = f"/jobs/{job['_id']}"
+    return BSONJSONResponse(
+        {"job_id": str(job["_id"]), "status": job["status"], "status_url": status_url, **(extra or {})},
+        status_code=202,
+        headers={"Location": status_url},
+    )
+
+
+async def submit_job(job_type: str, params: dict, key: str, requested_by: str) -> BSONJSONResponse:
+    """Queue a job and answer 202 with where to poll for it."""
+    try:
+        job = await job_queue.submit(job_type, params, key=key, requested_by=requested_by)
+    except JobConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return job_accepted(job)
+
+
+@router.get("/jobs/{job_id}", tags=["jobs"])
+async def get_job(job_id: str, token: str = Depends(oauth2_scheme)):
+    """
+    Status, progress and result of a background job. Org admins see their own
+    jobs, superadmins see every job.
+    """
+    try:
+        payload = decode_access_token(token)
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    job = await job_queue.get(job_id)
+    if job is None or (payload.get("role") != "superadmin" and job.get("requested_by") != requester_of(payload)):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return BSONJSONResponse(public_job(job))
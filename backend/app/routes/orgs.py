@@ -1,14 +1,22 @@
 # backend/app/routes/orgs.py
 import re
+import asyncio
 import logging
 from datetime import datetime
+from typing import List
+from bson import ObjectId
 from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel, EmailStr
-from passlib.hash import bcrypt_sha256
+from pydantic import BaseModel, EmailStr, Field
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 from app.core import db as core_db
-from app.routes.auth import get_current_admin
-from app.services.backup import backup_collection_async, copy_collection_async
+from app.core.responses import BSONJSONResponse
+from app.core.tenancy import provision_tenant, storage_fields, tenant_ref
+from app.routes.auth import get_current_admin, get_current_superadmin
+from app.routes.jobs import submit_job
+from app.services.master_replica import first_match, master_replica
+from app.services.passwords import PasswordHasherBusy, hash_password, password_hasher
+import app.services.tenants  # noqa: F401  (registers the org.update / org.delete job handlers)
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -19,6 +27,14 @@ class OrgCreate(BaseModel):
     admin_email: EmailStr
     admin_password: str
 
+BULK_CREATE_MAX = 1000
+# concurrent org-collection inserts/index builds during bulk provisioning
+BULK_PROVISION_CONCURRENCY = 16
+DUPLICATE_KEY = 11000
+
+class OrgBulkCreate(BaseModel):
+    organizations: List[OrgCreate] = Field(..., min_length=1, max_length=BULK_CREATE_MAX)
+
 class OrgUpdateIn(BaseModel):
     # Provide fields that admin wants to change
     new_organization_name: str | None = None
@@ -39,141 +55,237 @@ async def create_org(payload: OrgCreate):
 
     org_name = sanitize_name(org_name_raw)
     master = core_db.db["master_organizations"]
+    master_id = ObjectId()
+    admin_id = ObjectId()
 
-    # check exists
-    exists = await master.find_one({"organization_name": org_name})
-    if exists:
-        raise HTTPException(status_code=400, detail="Organization already exists")
-
-    # ensure admin email not used across master
-    existing_admin = await master.find_one({"admin_email": payload.admin_email})
-    if existing_admin:
-        raise HTTPException(status_code=400, detail="Admin email already used for another org")
-
-    coll_name = f"org_{org_name}"
-
-    # hash with bcrypt_sha256 for length-safety
-    password_hash = bcrypt_sha256.hash(payload.admin_password)
-
-    org_coll = core_db.db[coll_name]
-    admin_doc = {
-        "email": payload.admin_email,
-        "password_hash": password_hash,
-        "created_at": datetime.utcnow()
-    }
-
-    insert_res = await org_coll.insert_one(admin_doc)
-    admin_id = insert_res.inserted_id
-
+    # Claim the name and email first: the unique master indexes reject
+    # duplicates atomically, so there is no find_one pre-check to race with
     master_doc = {
+        "_id": master_id,
         "organization_name": org_name,
-        "collection_name": coll_name,
+        **storage_fields(org_name, master_id),
         "admin_id": admin_id,
         "admin_email": payload.admin_email,
         "created_at": datetime.utcnow()
     }
-    await master.insert_one(master_doc)
+    try:
+        await master.insert_one(master_doc)
+    except DuplicateKeyError:
+        if await master_replica.find_one("organization_name", org_name):
+            raise HTTPException(status_code=400, detail="Organization already exists")
+        raise HTTPException(status_code=400, detail="Admin email already used for another org")
+
+    try:
+        # hash with bcrypt_sha256 for length-safety
+        password_hash = await hash_password(payload.admin_password)
+
+        admin_doc = {
+            "_id": admin_id,
+            "email": payload.admin_email,
+            "password_hash": password_hash,
+            "created_at": datetime.utcnow()
+        }
+        await provision_tenant(master_doc, admin_doc)
+    except PasswordHasherBusy:
+        await master.delete_one({"_id": master_doc["_id"]})
+        raise HTTPException(status_code=503, detail="Server busy, please retry")
+    except Exception:
+        # release the claimed name/email if the org could not be provisioned
+        await master.delete_one({"_id": master_doc["_id"]})
+        raise
+
+    master_replica.apply(master_doc)
+    return {"ok": True, "organization": org_name, "collection": master_doc["collection_name"], "admin_id": str(admin_id)}
+
+@router.post("/bulk-create", tags=["org"])
+async def bulk_create_orgs(payload: OrgBulkCreate, current_superadmin = Depends(get_current_superadmin)):
+    """
+    Superadmin endpoint to provision many organizations in one call.
+
+    Names and emails are checked against the master with a single query, all
+    master documents go in with one unordered insert_many (the unique indexes
+    still arbitrate races), passwords are hashed in parallel on the hashing
+    pool, and org collections are provisioned concurrently. Returns one
+    result per requested org, in request order.
+    """
+    if core_db.db is None:
+        raise HTTPException(status_code=500, detail="Database not initialized")
+
+    master = core_db.db["master_organizations"]
+    results = []
+    candidates = []  # (result index, OrgCreate, master_doc)
+    seen_names, seen_emails = set(), set()
+
+    for item in payload.organizations:
+        org_name_raw = item.organization_name.strip()
+        result = {"organization_name": item.organization_name, "ok": False}
+        results.append(result)
+        if not org_name_raw:
+            result["error"] = "organization_name is required"
+            continue
+        org_name = sanitize_name(org_name_raw)
+        result["organization"] = org_name
+        if org_name in seen_names:
+            result["error"] = "Duplicate organization in request"
+            continue
+        if item.admin_email in seen_emails:
+            result["error"] = "Duplicate admin email in request"
+            continue
+        seen_names.add(org_name)
+        seen_emails.add(item.admin_email)
+        master_id = ObjectId()
+        candidates.append((len(results) - 1, item, {
+            "_id": master_id,
+            "organization_name": org_name,
+            **storage_fields(org_name, master_id),
+            "admin_id": ObjectId(),
+            "admin_email": item.admin_email,
+            "created_at": datetime.utcnow(),
+        }))
+
+    # one round trip to find every name/email that is already taken
+    taken = await master.find(
+        {"$or": [
+            {"organization_name": {"$in": [doc["organization_name"] for _, _, doc in candidates]}},
+            {"admin_email": {"$in": [doc["admin_email"] for _, _, doc in candidates]}},
+        ]},
+        {"organization_name": 1, "admin_email": 1},
+    ).to_list(None)
+    taken_names = {t.get("organization_name") for t in taken}
+    taken_emails = {t.get("admin_email") for t in taken}
+
+    to_insert = []
+    for idx, item, doc in candidates:
+        if doc["organization_name"] in taken_names:
+            results[idx]["error"] = "Organization already exists"
+        elif doc["admin_email"] in taken_emails:
+            results[idx]["error"] = "Admin email already used for another org"
+        else:
+            to_insert.append((idx, item, doc))
+
+    # claim names/emails in one unordered batch; lost races surface as write errors
+    if to_insert:
+        failed = {}
+        try:
+            await master.insert_many([doc for _, _, doc in to_insert], ordered=False)
+        except BulkWriteError as e:
+            failed = {err["index"]: err for err in e.details.get("writeErrors", [])}
+        for pos, err in sorted(failed.items()):
+            if err.get("code") == DUPLICATE_KEY:
+                results[to_insert[pos][0]]["error"] = "Organization or admin email already exists"
+            else:
+                logger.error("Bulk create of %s rejected: %s", to_insert[pos][2]["organization_name"], err.get("errmsg"))
+                results[to_insert[pos][0]]["error"] = "Failed to create organization"
+        to_insert = [c for pos, c in enumerate(to_insert) if pos not in failed]
+
+    # never queue more hashes than the pool has workers, so bulk jobs do not
+    # trip the hashing queue limit for interactive logins
+    hash_slots = asyncio.Semaphore(max(password_hasher.workers, 1))
+    provision_slots = asyncio.Semaphore(BULK_PROVISION_CONCURRENCY)
+
+    async def provision(idx, item, doc):
+        async with hash_slots:
+            password_hash = await hash_password(item.admin_password)
+        async with provision_slots:
+            await provision_tenant(doc, {
+                "_id": doc["admin_id"],
+                "email": item.admin_email,
+                "password_hash": password_hash,
+                "created_at": datetime.utcnow(),
+            })
+        results[idx].update({
+            "ok": True,
+            "collection": doc["collection_name"],
+            "admin_id": str(doc["admin_id"]),
+        })
+
+    outcomes = await asyncio.gather(*(provision(*c) for c in to_insert), return_exceptions=True)
+    rollback = []
+    for (idx, _, doc), outcome in zip(to_insert, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error("Bulk provisioning of %s failed: %s", doc["organization_name"], outcome)
+            results[idx]["error"] = "Failed to provision organization"
+            rollback.append(doc["_id"])
+        else:
+            master_replica.apply(doc)
+    if rollback:
+        # release claimed names/emails in one round trip
+        await master.delete_many({"_id": {"$in": rollback}})
+
+    created = sum(1 for r in results if r["ok"])
+    return {"created": created, "failed": len(results) - created, "results": results}
 
-    return {"ok": True, "organization": org_name, "collection": coll_name, "admin_id": str(admin_id)}
 
 # GET org details (protected)
 @router.get("/get", tags=["org"])
 async def get_org(current = Depends(get_current_admin)):
     admin = current["admin"]
     org = current["org"]
-    return {
+    return BSONJSONResponse({
         "organization_name": org["organization_name"],
         "admin_email": admin.get("email"),
         "created_at": org.get("created_at")
-    }
+    })
 
-# PUT /org/update - rename org collection and/or update admin email
+# PUT /org/update - rename org (collection) and/or update admin email (background job)
 @router.put("/update", tags=["org"])
 async def update_org(payload: OrgUpdateIn, current = Depends(get_current_admin)):
+    """
+    Validates the change and queues an "org.update" job; answers 202 with the
+    job id. Poll GET /jobs/{id} for progress and the updated organization.
+    """
     if core_db.db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
 
-    master = core_db.db["master_organizations"]
     org = current["org"]
     old_org_name = org["organization_name"]
-    old_coll = org["collection_name"]
+    new_name = None
 
-    update_fields = {}
-
-    # 1) handle rename
+    # 1) validate rename
     if payload.new_organization_name:
         new_raw = payload.new_organization_name.strip()
         if not new_raw:
             raise HTTPException(status_code=400, detail="new_organization_name cannot be empty")
         new_name = sanitize_name(new_raw)
 
-        # ensure not taken already
-        if await master.find_one({"organization_name": new_name}):
-            raise HTTPException(status_code=400, detail="New organization name already exists")
-
-        new_coll_name = f"org_{new_name}"
-
-        # Backup old collection first
-        backup_path = await backup_collection_async(old_coll)
-        logger.info("Backup created before rename: %s", backup_path)
-
-        # Copy docs to new collection
-        copied = await copy_collection_async(old_coll, new_coll_name)
-
-        # verify counts: compare counts in src vs dest
-        src_count = await core_db.db[old_coll].count_documents({})
-        dest_count = await core_db.db[new_coll_name].count_documents({})
-        if src_count != dest_count:
-            # attempt cleanup: drop new coll and abort with error
-            logger.error("Copy count mismatch (src=%s dest=%s). Rolling back.", src_count, dest_count)
-            await core_db.db[new_coll_name].drop()
-            raise HTTPException(status_code=500, detail="Failed to migrate collection (count mismatch). Backup created.")
-
-        # drop old collection only after successful verification
-        await core_db.db[old_coll].drop()
-        # update master fields
-        update_fields["collection_name"] = new_coll_name
-        update_fields["organization_name"] = new_name
-
-    # 2) handle admin email change
-    if payload.new_admin_email:
-        # check email not used by another org
-        if await master.find_one({"admin_email": payload.new_admin_email, "organization_name": {"$ne": old_org_name}}):
-            raise HTTPException(status_code=400, detail="Provided new_admin_email already used by another org")
-
-        # update admin in org collection (old or new coll name)
-        target_coll_name = update_fields.get("collection_name", old_coll)
-        org_coll = core_db.db[target_coll_name]
-        # update all admin docs matching previous admin_email
-        await org_coll.update_many({"email": org.get("admin_email")}, {"$set": {"email": payload.new_admin_email}})
-        update_fields["admin_email"] = payload.new_admin_email
-
-    # apply updates to master document
-    if update_fields:
-        await master.update_one({"organization_name": old_org_name}, {"$set": update_fields})
-        updated = await master.find_one({"organization_name": update_fields.get("organization_name", old_org_name)})
-        return {"updated": True, "organization": updated["organization_name"]}
-
-    return {"updated": False, "reason": "no changes provided"}
-
-# DELETE /org/delete - drop org collection and remove master doc (protected)
+    if not new_name and not payload.new_admin_email:
+        return {"updated": False, "reason": "no changes provided"}
+
+    # whoever holds the new name or email, in one query
+    lookups = [("organization_name", new_name), ("admin_email", payload.new_admin_email)]
+    taken = await master_replica.find_any(lookups, {"organization_name": 1, "admin_email": 1})
+
+    # ensure not taken already
+    if new_name and first_match(taken, lookups[:1]):
+        raise HTTPException(status_code=400, detail="New organization name already exists")
+
+    # 2) validate admin email change: not used by another org
+    owner = first_match(taken, lookups[1:])
+    if owner and owner["organization_name"] != old_org_name:
+        raise HTTPException(status_code=400, detail="Provided new_admin_email already used by another org")
+
+    return await submit_job(
+        "org.update",
+        {
+            "organization_name": old_org_name,
+            "new_organization_name": new_name,
+            "new_admin_email": payload.new_admin_email,
+        },
+        key=old_org_name,
+        requested_by=str(current["admin"]["_id"]),
+    )
+
+# DELETE /org/delete - drop org collection and remove master doc (protected, background job)
 @router.delete("/delete", tags=["org"])
 async def delete_org(current = Depends(get_current_admin)):
+    """Queues an "org.delete" job (final backup, drop, master removal); answers 202."""
     if core_db.db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
 
     org = current["org"]
-    master = core_db.db["master_organizations"]
-    coll_name = org["collection_name"]
-
-    # Backup first
-    backup_path = await backup_collection_async(coll_name)
-    logger.info("Backup created before delete: %s", backup_path)
-
-    # Drop collection
-    await core_db.db[coll_name].drop()
-
-    # Remove master record
-    await master.delete_one({"organization_name": org["organization_name"]})
-
-    return {"deleted": True, "organization": org["organization_name"], "backup": backup_path}
+    return await submit_job(
+        "org.delete",
+        tenant_ref(org),
+        key=org["organization_name"],
+        requested_by=str(current["admin"]["_id"]),
+    )
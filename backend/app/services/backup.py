@@ -1,54 +1,415 @@
 # backend/app/services/backup.py
 import os
+import gzip
 import json
+import time
+import asyncio
+import hashlib
 import datetime
-from typing import List
-from bson import ObjectId
+from typing import List, Optional
+
+import bson
+from bson import ObjectId, json_util
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from pymongo.errors import BulkWriteError
 
 from app.core import db as core_db
+from app.core.config import settings
+from app.services.backup_store import store_for
+
+# 2: documents as relaxed Extended JSON; 1 wrote every non-JSON value as str()
+BACKUP_FORMAT_VERSION = 2
+BACKUP_SUFFIX = ".ndjson.gz"
+# uncompressed bytes buffered before a write is handed to a worker thread
+WRITE_CHUNK_BYTES = 256 * 1024
+
+
+def _encode_doc(doc: dict) -> bytes:
+    # Relaxed Extended JSON ({"$oid": ...}, {"$date": ...}) keeps ObjectIds such
+    # as _id and tenant_id and datetimes typed through a restore; one doc per line
+    return json_util.dumps(doc, json_options=json_util.RELAXED_JSON_OPTIONS, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class BackupWriter:
+    """
+    Streams documents into a gzip-compressed NDJSON backup file.
+
+    Line 1 is a header manifest, the last line a trailer manifest with the
+    document count, uncompressed byte size and sha256 of the document lines:
+
+        {"__backup__": "header", "version": 2, "collection": "org_x", "created_at": "..."}
+        {"_id": {"$oid": "..."}, ...}
+        {"__backup__": "trailer", "count": 2, "bytes": 123, "sha256": "..."}
+
+    Only one chunk of encoded lines is held in memory; compression (at
+    BACKUP_COMPRESSION_LEVEL unless given) and file
+    I/O run in a worker thread so the event loop is never blocked on disk.
+    The file is written under a temporary name and renamed on close, so a
+    path returned by close() always has a trailer.
+    """
+
+    def __init__(
+        self, path: str, collection: str, extra_header: Optional[dict] = None, compresslevel: Optional[int] = None,
+    ):
+        self.path = path
+        self.collection = collection
+        self.extra_header = extra_header or {}
+        self.compresslevel = settings.backup_compression_level if compresslevel is None else compresslevel
+        self.count = 0
+        self.bytes = 0
+        self._sha = hashlib.sha256()
+        self._buf: List[bytes] = []
+        self._buffered = 0
+        self._fh = None
+        self._tmp_path = path + ".part"
+
+    async def open(self) -> "BackupWriter":
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._fh = await asyncio.to_thread(gzip.open, self._tmp_path, "wb", self.compresslevel)
+        header = {
+            "__backup__": "header",
+            "version": BACKUP_FORMAT_VERSION,
+            "collection": self.collection,
+            "created_at": datetime.datetime.utcnow().isoformat() + "Z",
+            **self.extra_header,
+        }
+        self._buf.append(json.dumps(header).encode("utf-8") + b"\n")
+        return self
+
+    async def write(self, doc: dict) -> None:
+        line = _encode_doc(doc)
+        self._sha.update(line)
+        self.count += 1
+        self.bytes += len(line)
+        self._buf.append(line)
+        self._buffered += len(line)
+        if self._buffered >= WRITE_CHUNK_BYTES:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        if not self._buf:
+            return
+        chunk = b"".join(self._buf)
+        self._buf = []
+        self._buffered = 0
+        await asyncio.to_thread(self._fh.write, chunk)
+
+    @property
+    def manifest(self) -> dict:
+        return {"count": self.count, "bytes": self.bytes, "sha256": self._sha.hexdigest()}
+
+    async def close(self) -> str:
+        trailer = {"__backup__": "trailer", **self.manifest}
+        self._buf.append(json.dumps(trailer).encode("utf-8") + b"\n")
+        await self._flush()
+        await asyncio.to_thread(self._fh.close)
+        await asyncio.to_thread(os.replace, self._tmp_path, self.path)
+        return self.path
+
+    async def abort(self) -> None:
+        if self._fh is not None:
+            await asyncio.to_thread(self._fh.close)
+        if os.path.exists(self._tmp_path):
+            await asyncio.to_thread(os.remove, self._tmp_path)
+
+    async def __aenter__(self) -> "BackupWriter":
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.close()
+        else:
+            await self.abort()
+
+
+def backup_path_for(coll_name: str, out_dir: str = "backups", kind: str = "full") -> str:
+    # microseconds keep a full and an incremental taken back to back apart
+    ts = datetime.datetime.utcnow().strftime("%Y%m%dT%H%M%S%fZ")
+    label = "backup" if kind == "full" else "incr"
+    return os.path.join(out_dir, f"{coll_name}_{label}_{ts}{BACKUP_SUFFIX}")
+
+
+# -------------------------
+# Backup chain manifest
+# -------------------------
+# <out_dir>/<coll>.manifest.json records every backup of a collection in order:
+#   {"collection": "org_x", "closed": false, "entries": [
+#       {"file": "...", "kind": "full", "parent": null, "since": null,
+#        "watermark": {"_id": "...", "updated_at": "..."}, "count": .., "bytes": .., "sha256": ..},
+#       {"file": "...", "kind": "incremental", "parent": "<previous file>", "since": {...}, ...}]}
+# A restore replays the last full entry and every incremental after it. The
+# backup taken before the collection is dropped is marked "final": true and
+# closes the chain; a later collection with the same name appends a new chain
+# after it, so the closed one stays restorable (restore_chain(before=...)).
+
+_manifest_locks: dict = {}
+
+
+def manifest_path_for(coll_name: str, out_dir: Optional[str] = None) -> str:
+    return os.path.join(out_dir or settings.backup_dir, f"{coll_name}.manifest.json")
+
+
+def _read_manifest(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_manifest(path: str, manifest: dict) -> None:
+    tmp = path + ".part"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+async def load_manifest(coll_name: str, out_dir: Optional[str] = None) -> Optional[dict]:
+    return await asyncio.to_thread(_read_manifest, manifest_path_for(coll_name, out_dir))
+
+
+async def forget_manifest_entries(coll_name: str, entries: List[dict], out_dir: Optional[str] = None) -> int:
+    """
+    Remove evicted backups (matched on file and created_at) from a manifest;
+    a manifest left without entries is deleted. Returns how many were removed.
+    """
+    manifest_path = manifest_path_for(coll_name, out_dir)
+    gone = {(e["file"], e["created_at"]) for e in entries}
+    lock = _manifest_locks.setdefault(manifest_path, asyncio.Lock())
+    async with lock:
+        manifest = await asyncio.to_thread(_read_manifest, manifest_path)
+        if manifest is None:
+            return 0
+        kept = [e for e in manifest["entries"] if (e["file"], e.get("created_at")) not in gone]
+        removed = len(manifest["entries"]) - len(kept)
+        if not kept:
+            await asyncio.to_thread(os.remove, manifest_path)
+        elif removed:
+            manifest["entries"] = kept
+            await asyncio.to_thread(_write_manifest, manifest_path, manifest)
+    return removed
+
+
+def _created_at(entry: dict) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(entry["created_at"].rstrip("Z"))
+
+
+def restore_chain(manifest: dict, before: Optional[datetime.datetime] = None) -> List[dict]:
+    """
+    Entries needed to rebuild the collection: the last full backup and the
+    incrementals after it. With `before` (naive UTC) only backups taken at or
+    before that time count, e.g. to restore a closed chain of a dropped
+    collection whose name has since been reused.
+    """
+    entries = manifest.get("entries", [])
+    if before is not None:
+        entries = [e for e in entries if _created_at(e) <= before]
+    for i in range(len(entries) - 1, -1, -1):
+        if entries[i]["kind"] == "full":
+            return entries[i:]
+    return []
+
+
+def _watermark_query(watermark: dict) -> dict:
+    clauses = []
+    if watermark.get("_id"):
+        clauses.append({"_id": {"$gt": ObjectId(watermark["_id"])}})
+    if watermark.get("updated_at"):
+        clauses.append({"updated_at": {"$gt": datetime.datetime.fromisoformat(watermark["updated_at"])}})
+    if not clauses:
+        return {}
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+
+class _Watermark:
+    """
+    Where the next incremental starts: the highest ObjectId _id seen and the
+    time this scan started. Using the start time (not the newest updated_at
+    seen) means writes that land while the scan runs are picked up next time;
+    at worst a document appears in two backups, which a restore tolerates.
+    """
+
+    def __init__(self, start: Optional[dict] = None):
+        start = start or {}
+        self.max_id = ObjectId(start["_id"]) if start.get("_id") else None
+        self.started_at = datetime.datetime.utcnow()
+
+    def observe(self, doc: dict) -> None:
+        _id = doc.get("_id")
+        if isinstance(_id, ObjectId) and (self.max_id is None or _id > self.max_id):
+            self.max_id = _id
+
+    def as_dict(self) -> dict:
+        return {
+            "_id": str(self.max_id) if self.max_id else None,
+            "updated_at": self.started_at.isoformat(),
+        }
+
 
 # Async backup function: returns path to backup file
-async def backup_collection_async(coll_name: str, out_dir: str = "backups") -> str:
-    db = core_db.db
+async def backup_collection_async(
+    coll_name: str,
+    out_dir: Optional[str] = None,
+    db=None,
+    incremental: Optional[bool] = None,
+    final: bool = False,
+    query: Optional[dict] = None,
+    name: Optional[str] = None,
+) -> str:
+    """
+    Back up a collection into the backup store under out_dir (BACKUP_DIR by
+    default) and record it in the collection's manifest. Returns the path of
+    the stored object, which is shared with earlier backups of identical
+    content (see services.backup_store).
+
+    query limits the backup to matching documents (one tenant of the shared
+    collection); name then labels the backup files and manifest instead of
+    coll_name.
+
+    With incremental=True (default: settings.incremental_backups) only documents
+    whose _id or updated_at is past the last recorded watermark are written,
+    chained to the previous backup. The first backup of a chain is always full.
+    Incrementals record no tombstones: a document deleted after the full
+    backup, or edited without setting updated_at, comes back (or keeps its
+    old contents) when the chain is restored.
+    final=True takes a full backup whatever `incremental` says (it is the only
+    copy left once the collection is dropped) and closes the chain, so a
+    later collection with the same name starts a new chain with a full
+    backup; the closed chain stays in the manifest.
+    """
+    db = db if db is not None else core_db.db
     if db is None:
         raise RuntimeError("Database not initialized")
+    if incremental is None:
+        incremental = settings.incremental_backups
+    name = name or coll_name
+    store = store_for(out_dir)
+    out_dir = store.root
+
+    manifest_path = manifest_path_for(name, out_dir)
+    lock = _manifest_locks.setdefault(manifest_path, asyncio.Lock())
+    async with lock:
+        manifest = await asyncio.to_thread(_read_manifest, manifest_path)
+        if manifest is None:
+            manifest = {"collection": name, "closed": False, "entries": []}
+
+        # a closed chain is kept; the next backup starts a new one after it
+        previous = manifest["entries"][-1] if manifest["entries"] and not manifest.get("closed") else None
+        kind = "incremental" if incremental and previous and not final else "full"
+        since = previous["watermark"] if kind == "incremental" else None
+        changed = _watermark_query(since) if since else {}
+        if query and changed:
+            changed = {"$and": [query, changed]}
+        else:
+            changed = changed or query or {}
+
+        coll = db[coll_name]
+        watermark = _Watermark(since)
+        header = {"kind": kind, "since": since, "parent": previous["file"] if kind == "incremental" else None}
+        async with BackupWriter(backup_path_for(name, store.staging_dir(), kind), name, header) as writer:
+            async for d in coll.find(changed):
+                watermark.observe(d)
+                await writer.write(d)
+
+        entry = {
+            "kind": kind,
+            "parent": header["parent"],
+            "since": since,
+            "watermark": watermark.as_dict(),
+            "created_at": datetime.datetime.utcnow().isoformat() + "Z",
+            **writer.manifest,
+        }
+        stored = await store.put(writer.path, name, entry, final=final)
+        if final:
+            entry["final"] = True
+        manifest["entries"].append({"file": stored["file"], **entry})
+        manifest["closed"] = final
+        await asyncio.to_thread(_write_manifest, manifest_path, manifest)
+    return store.path(stored["file"])
 
-    coll = db[coll_name]
-    docs = []
-    async for d in coll.find({}):
-        # Serialize ObjectId to string
-        d["_id"] = str(d.get("_id"))
-        docs.append(d)
 
-    os.makedirs(out_dir, exist_ok=True)
-    ts = datetime.datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-    filename = f"{coll_name}_backup_{ts}.json"
-    out_path = os.path.join(out_dir, filename)
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(docs, f, default=str, indent=2)
+COPY_BATCH_SIZE = 500
+DUPLICATE_KEY = 11000
+COPY_MAX_IN_FLIGHT = 4
+RAW_BSON = CodecOptions(document_class=RawBSONDocument)
 
-    return out_path
 
+def _doc_size(doc) -> int:
+    raw = getattr(doc, "raw", None)
+    return len(raw) if raw is not None else len(bson.encode(doc))
 
-async def copy_collection_async(src_coll_name: str, dest_coll_name: str) -> int:
-    db = core_db.db
+
+async def copy_collection_async(
+    src_coll_name: str,
+    dest_coll_name: str,
+    batch_size: int = COPY_BATCH_SIZE,
+    max_in_flight: int = COPY_MAX_IN_FLIGHT,
+    db=None,
+) -> dict:
+    """
+    Copy every document from src to dest, keeping their _id.
+
+    Documents are read as RawBSONDocument so they go back to the server
+    without being decoded and re-encoded. Up to `max_in_flight` unordered
+    insert_many batches run while the cursor keeps reading the next batch.
+    Documents already in dest (same _id, e.g. from an interrupted copy that
+    a job retry runs again) are skipped.
+
+    Returns {"count", "skipped", "bytes", "seconds", "docs_per_s", "mb_per_s"}.
+    count is the documents inserted by this call.
+    """
+    db = db if db is not None else core_db.db
     if db is None:
         raise RuntimeError("Database not initialized")
 
-    src = db[src_coll_name]
+    src = db[src_coll_name].with_options(codec_options=RAW_BSON)
     dest = db[dest_coll_name]
+
+    skipped = 0
+
+    async def insert(docs) -> int:
+        nonlocal skipped
+        try:
+            res = await dest.insert_many(docs, ordered=False)
+            return len(res.inserted_ids)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(err.get("code") != DUPLICATE_KEY for err in errors):
+                raise
+            skipped += len(errors)
+            return e.details.get("nInserted", len(docs) - len(errors))
+
     count = 0
-    # Insert in batches for efficiency
+    nbytes = 0
+    in_flight: set = set()
     batch = []
-    BATCH_SIZE = 500
-    async for doc in src.find({}):
-        doc.pop("_id", None)
-        batch.append(doc)
-        if len(batch) >= BATCH_SIZE:
-            res = await dest.insert_many(batch)
-            count += len(res.inserted_ids)
-            batch = []
-    if batch:
-        res = await dest.insert_many(batch)
-        count += len(res.inserted_ids)
-    return count
+    started = time.perf_counter()
+    try:
+        async for doc in src.find({}, batch_size=batch_size):
+            batch.append(doc)
+            nbytes += _doc_size(doc)
+            if len(batch) >= batch_size:
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    count += sum(t.result() for t in done)
+                in_flight.add(asyncio.ensure_future(insert(batch)))
+                batch = []
+        if batch:
+            in_flight.add(asyncio.ensure_future(insert(batch)))
+        for t in asyncio.as_completed(in_flight):
+            count += await t
+        in_flight = set()
+    finally:
+        # on failure do not leave inserts running against dest
+        for t in in_flight:
+            t.cancel()
+
+    seconds = time.perf_counter() - started
+    return {
+        "count": count,
+        "skipped": skipped,
+        "bytes": nbytes,
+        "seconds": round(seconds, 4),
+        "docs_per_s": round(count / seconds, 1) if seconds else 0.0,
+        "mb_per_s": round(nbytes / 1e6 / seconds, 2) if seconds else 0.0,
+    }
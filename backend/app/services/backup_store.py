@@ -0,0 +1,420 @@
+# backend/app/services/backup_store.py
+"""
+Content-addressed storage, index and retention for backup files.
+
+Layout under the backup directory:
+
+    objects/<sha[:2]>/<sha256>.ndjson.gz   one file per distinct content
+    <collection>.manifest.json             backup chains (see services.backup)
+    index.sqlite3                          every backup, for listing and eviction
+
+A backup is stored under the sha256 of its document lines (the checksum in
+its trailer). Backing up unchanged data again, such as an empty incremental
+or a repeated full backup of an idle tenant, adds an index row that points
+at the existing object. No new file is written. The header of a shared
+object describes the first backup that produced it. Restores only use the
+documents and trailer.
+
+Retention works on backup sets: a full backup and the incrementals chained
+to it, since a set is only restorable whole. A set is evicted when it is
+past the newest BACKUP_KEEP_LAST sets of its collection, or when its newest
+backup is older than BACKUP_MAX_AGE_DAYS. Then, while the stored bytes
+exceed BACKUP_MAX_BYTES, the oldest sets go first, except each collection's
+newest set. An object is deleted once no indexed backup uses it. Eviction
+runs every BACKUP_EVICTION_INTERVAL_SECONDS in the app, or via
+`python -m scripts.backup_collection --evict`.
+
+The index can be rebuilt from the manifests (rebuild_index()) and is
+rebuilt automatically when missing.
+
+Several processes may share a backup directory (the API and
+scripts/backup_collection.py). Storing, deduplicating and deleting objects
+each happen inside one `BEGIN IMMEDIATE` transaction on the index, whose
+write lock serializes them across processes: an object cannot be deleted
+between another process finding it and indexing its backup.
+"""
+import asyncio
+import contextlib
+import datetime
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+OBJECTS_DIR = "objects"
+STAGING_DIR = "staging"
+INDEX_FILE = "index.sqlite3"
+MANIFEST_SUFFIX = ".manifest.json"
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS backups (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        collection TEXT NOT NULL,
+        file TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        bytes INTEGER NOT NULL DEFAULT 0,
+        stored_bytes INTEGER NOT NULL DEFAULT 0,
+        sha256 TEXT,
+        final INTEGER NOT NULL DEFAULT 0
+    )""",
+    "CREATE INDEX IF NOT EXISTS backups_collection ON backups (collection, id)",
+    "CREATE INDEX IF NOT EXISTS backups_file ON backups (file)",
+)
+_COLUMNS = ("id", "collection", "file", "kind", "created_at", "count", "bytes", "stored_bytes", "sha256", "final")
+
+
+def _parse_time(value: str) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(value.rstrip("Z"))
+
+
+def _row(values) -> dict:
+    row = dict(zip(_COLUMNS, values))
+    row["final"] = bool(row["final"])
+    return row
+
+
+@contextlib.contextmanager
+def _immediate(conn: sqlite3.Connection):
+    """A write transaction holding the index's write lock from its first statement."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def backup_sets(rows: List[dict]) -> List[List[dict]]:
+    """Split one collection's backups (oldest first) into sets: a full and its incrementals."""
+    sets: List[List[dict]] = []
+    for row in rows:
+        if row["kind"] == "full" or not sets or sets[-1][-1]["final"]:
+            sets.append([])
+        sets[-1].append(row)
+    return sets
+
+
+class BackupStore:
+    """Objects, index and retention for one backup directory. Blocking work runs in worker threads."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._ready = False
+        self._init_lock = threading.Lock()
+        self._evict_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    # paths ------------------------------------------------------------------
+
+    def object_file(self, sha256: str) -> str:
+        """Path of an object relative to the root (what manifests and the index record)."""
+        return f"{OBJECTS_DIR}/{sha256[:2]}/{sha256}.ndjson.gz"
+
+    def path(self, file: str) -> str:
+        return os.path.join(self.root, file)
+
+    def staging_dir(self) -> str:
+        return os.path.join(self.root, STAGING_DIR)
+
+    # index ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(self.root, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(self.root, INDEX_FILE), timeout=30)
+        if not self._ready:
+            with self._init_lock:
+                if not self._ready:
+                    # readers never hold up a commit, so the write lock is held briefly
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    # one transaction, so two processes cannot both import the manifests
+                    with _immediate(conn):
+                        fresh = conn.execute(
+                            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'backups'"
+                        ).fetchone() is None
+                        for statement in _SCHEMA:
+                            conn.execute(statement)
+                        if fresh:
+                            self._import_manifests(conn)
+                    self._ready = True
+        return conn
+
+    def _import_manifests(self, conn: sqlite3.Connection) -> int:
+        """Index every entry of every manifest (backups written before the index existed); the caller commits."""
+        rows = []
+        for name in sorted(os.listdir(self.root)):
+            if not name.endswith(MANIFEST_SUFFIX):
+                continue
+            with open(os.path.join(self.root, name), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            entries = manifest.get("entries", [])
+            for i, entry in enumerate(entries):
+                path = self.path(entry["file"])
+                rows.append((
+                    manifest["collection"], entry["file"], entry["kind"], entry.get("created_at") or "",
+                    entry.get("count", 0), entry.get("bytes", 0),
+                    os.path.getsize(path) if os.path.exists(path) else 0, entry.get("sha256"),
+                    # manifests written before entries carried "final" only mark the last one
+                    int(entry.get("final", bool(manifest.get("closed")) and i == len(entries) - 1)),
+                ))
+        conn.executemany(
+            "INSERT INTO backups (collection, file, kind, created_at, count, bytes, stored_bytes, sha256, final)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows,
+        )
+        if rows:
+            logger.info("Backup index: imported %s entries from manifests", len(rows))
+        return len(rows)
+
+    def _rebuild(self) -> int:
+        conn = self._connect()
+        try:
+            with _immediate(conn):
+                conn.execute("DELETE FROM backups")
+                return self._import_manifests(conn)
+        finally:
+            conn.close()
+
+    async def rebuild_index(self) -> int:
+        """Drop the index and re-create it from the manifests; returns the number of entries."""
+        return await asyncio.to_thread(self._rebuild)
+
+    def _query(self, sql: str, params=()) -> List[dict]:
+        conn = self._connect()
+        try:
+            return [_row(r) for r in conn.execute(sql, params).fetchall()]
+        finally:
+            conn.close()
+
+    # writes -----------------------------------------------------------------
+
+    def _put(self, staged: str, collection: str, entry: dict, final: bool) -> dict:
+        file = self.object_file(entry["sha256"])
+        target = self.path(file)
+        conn = self._connect()
+        try:
+            # an object found here stays until this backup's row is committed
+            with _immediate(conn):
+                deduped = os.path.exists(target)
+                if deduped:
+                    os.remove(staged)
+                else:
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    os.replace(staged, target)
+                conn.execute(
+                    "INSERT INTO backups (collection, file, kind, created_at, count, bytes, stored_bytes, sha256, final)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (collection, file, entry["kind"], entry["created_at"], entry["count"], entry["bytes"],
+                     os.path.getsize(target), entry["sha256"], int(final)),
+                )
+        finally:
+            conn.close()
+        return {"file": file, "deduplicated": deduped}
+
+    async def put(self, staged: str, collection: str, entry: dict, final: bool = False) -> dict:
+        """
+        Move a finished backup file into the store (or drop it if an object
+        with the same content exists) and index it. `entry` is the manifest
+        entry (kind, created_at, count, bytes, sha256). Returns {"file", "deduplicated"}.
+        """
+        return await asyncio.to_thread(self._put, staged, collection, entry, final)
+
+    # lookups ----------------------------------------------------------------
+
+    async def list(self, collection: Optional[str] = None, limit: Optional[int] = None) -> List[dict]:
+        """Indexed backups, newest first; only `collection`'s when given."""
+        sql, params = "SELECT * FROM backups", []
+        if collection:
+            sql += " WHERE collection = ?"
+            params.append(collection)
+        sql += " ORDER BY id DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return await asyncio.to_thread(self._query, sql, params)
+
+    async def locate(self, collection: str, before: Optional[datetime.datetime] = None) -> Optional[dict]:
+        """
+        The newest backup of `collection` (taken before `before`, if given),
+        with its absolute `path`.
+        """
+        rows = await asyncio.to_thread(
+            self._query, "SELECT * FROM backups WHERE collection = ? ORDER BY id DESC", (collection,),
+        )
+        for row in rows:
+            if before is None or _parse_time(row["created_at"]) < before:
+                return {**row, "path": self.path(row["file"])}
+        return None
+
+    def _stats(self) -> dict:
+        conn = self._connect()
+        try:
+            backups, collections, logical = conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT collection), COALESCE(SUM(bytes), 0) FROM backups"
+            ).fetchone()
+            objects, stored = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM"
+                " (SELECT MAX(stored_bytes) AS size FROM backups GROUP BY file)"
+            ).fetchone()
+        finally:
+            conn.close()
+        return {
+            "backups": backups,
+            "collections": collections,
+            "objects": objects,
+            "bytes": logical,
+            "stored_bytes": stored,
+            "deduplicated": backups - objects,
+        }
+
+    async def stats(self) -> dict:
+        return await asyncio.to_thread(self._stats)
+
+    # retention --------------------------------------------------------------
+
+    def _plan(self, keep_last: int, max_age_days: float, max_bytes: int, now: datetime.datetime) -> list:
+        """Sets to evict, oldest first."""
+        rows = self._query("SELECT * FROM backups ORDER BY id")
+        by_collection: dict = {}
+        for row in rows:
+            by_collection.setdefault(row["collection"], []).append(row)
+
+        evict, kept = [], []  # kept: (newest created_at, set) minus each collection's newest set
+        cutoff = now - datetime.timedelta(days=max_age_days) if max_age_days else None
+        for sets in by_collection.values():
+            sets = backup_sets(sets)
+            for i, backup_set in enumerate(sets):
+                newest = _parse_time(backup_set[-1]["created_at"])
+                if (keep_last and i < len(sets) - keep_last) or (cutoff and newest < cutoff):
+                    evict.append(backup_set)
+                elif i < len(sets) - 1:
+                    kept.append((newest, backup_set))
+
+        if max_bytes:
+            refs: dict = {}
+            sizes: dict = {}
+            for row in rows:
+                refs[row["file"]] = refs.get(row["file"], 0) + 1
+                sizes[row["file"]] = row["stored_bytes"]
+
+            def release(backup_set) -> int:
+                freed = 0
+                for row in backup_set:
+                    refs[row["file"]] -= 1
+                    if refs[row["file"]] == 0:
+                        freed += sizes[row["file"]]
+                return freed
+
+            total = sum(sizes.values())
+            for backup_set in evict:
+                total -= release(backup_set)
+            for _, backup_set in sorted(kept, key=lambda k: k[0]):
+                if total <= max_bytes:
+                    break
+                total -= release(backup_set)
+                evict.append(backup_set)
+        return evict
+
+    def _drop(self, evicted: List[dict]) -> dict:
+        ids = [row["id"] for row in evicted]
+        files = {row["file"] for row in evicted}
+        freed = 0
+        removed = 0
+        conn = self._connect()
+        try:
+            # the refcount check and the unlink happen under the same write lock
+            # as a put's dedupe check, in this process or any other
+            with _immediate(conn):
+                conn.executemany("DELETE FROM backups WHERE id = ?", [(i,) for i in ids])
+                for file in files:
+                    if conn.execute("SELECT 1 FROM backups WHERE file = ? LIMIT 1", (file,)).fetchone():
+                        continue  # deduplicated into a backup that is kept
+                    path = self.path(file)
+                    if os.path.exists(path):
+                        freed += os.path.getsize(path)
+                        os.remove(path)
+                        removed += 1
+        finally:
+            conn.close()
+        return {"objects": removed, "bytes_freed": freed}
+
+    async def evict(
+        self,
+        keep_last: Optional[int] = None,
+        max_age_days: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        now: Optional[datetime.datetime] = None,
+    ) -> dict:
+        """
+        Apply the retention policy (arguments default to the BACKUP_* settings;
+        0 disables a rule). Evicted backups leave their manifests and the
+        index; objects nothing else uses are deleted.
+        """
+        from app.services.backup import forget_manifest_entries
+
+        keep_last = settings.backup_keep_last if keep_last is None else keep_last
+        max_age_days = settings.backup_max_age_days if max_age_days is None else max_age_days
+        max_bytes = settings.backup_max_bytes if max_bytes is None else max_bytes
+        result = {"sets": 0, "backups": 0, "objects": 0, "bytes_freed": 0}
+        if not (keep_last or max_age_days or max_bytes):
+            return result
+
+        async with self._evict_lock:
+            evict = await asyncio.to_thread(self._plan, keep_last, max_age_days, max_bytes, now or datetime.datetime.utcnow())
+            if not evict:
+                return result
+            evicted = [row for backup_set in evict for row in backup_set]
+            by_collection: dict = {}
+            for row in evicted:
+                by_collection.setdefault(row["collection"], []).append(row)
+            # manifests first: a restore must never be pointed at a deleted object
+            for collection, rows in by_collection.items():
+                await forget_manifest_entries(collection, rows, self.root)
+            result.update(await asyncio.to_thread(self._drop, evicted))
+            result.update(sets=len(evict), backups=len(evicted))
+        logger.info("Backup eviction in %s: %s", self.root, result)
+        return result
+
+    # background eviction ----------------------------------------------------
+
+    async def _evict_loop(self, interval: float) -> None:
+        while True:
+            try:
+                await self.evict()
+            except Exception:
+                logger.exception("Backup eviction failed")
+            await asyncio.sleep(interval)
+
+    def start(self, interval: Optional[float] = None) -> None:
+        """Evict in the background every `interval` seconds (BACKUP_EVICTION_INTERVAL_SECONDS)."""
+        interval = settings.backup_eviction_interval_seconds if interval is None else interval
+        if self._task is None and interval > 0:
+            self._task = asyncio.ensure_future(self._evict_loop(interval))
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+_stores: dict = {}
+
+
+def store_for(root: Optional[str] = None) -> BackupStore:
+    """The BackupStore of a backup directory (BACKUP_DIR by default), one per directory."""
+    root = root or settings.backup_dir
+    key = os.path.abspath(root)
+    if key not in _stores:
+        _stores[key] = BackupStore(root)
+    return _stores[key]
@@ -0,0 +1,374 @@
+# backend/app/services/jobs.py
+"""
+Persistent background jobs for slow tenant operations (rename, delete).
+
+Jobs are documents in the `jobs` collection, so they survive restarts and are
+shared by every worker process:
+
+  queued -> running -> succeeded | failed
+
+Workers claim a job atomically with find_one_and_update and hold a lease
+(lease_until) that a heartbeat keeps extending while the handler runs. A job
+whose lease runs out (its process died) is claimed again by the next free
+worker, up to JOB_MAX_ATTEMPTS times. A handler failing on a transient
+MongoDB error (lost connection, failover, timeout) is retried the same way,
+a poll interval later; handlers are written to be safe to re-run. Any other
+error fails the job. A job handed back on shutdown does not use up an attempt. Each job type has its own number of
+worker coroutines per process, which is its concurrency limit.
+
+While a job is queued or running it carries `active_key` (e.g. the org name),
+and a unique sparse index on that field rejects a second job for the same
+tenant until the first one finishes. A job covering several tenants holds one
+lock document per tenant instead (status "lock", same active_key index),
+released when the job finishes.
+"""
+import asyncio
+import logging
+import uuid
+from functools import lru_cache
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import (
+    BulkWriteError,
+    ConnectionFailure,
+    DuplicateKeyError,
+    ExecutionTimeout,
+    PyMongoError,
+    WTimeoutError,
+)
+
+from app.core import db as core_db
+from app.core.config import Lazy, settings
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+LOCK = "lock"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+# handler(params, progress) -> result dict; progress(stage, **details) is awaitable
+Progress = Callable[..., Awaitable[None]]
+Handler = Callable[[dict, Progress], Awaitable[dict]]
+
+
+class JobConflict(RuntimeError):
+    """Raised by submit() when another job holds the same active_key; .keys lists the busy keys."""
+
+    def __init__(self, message: str, keys=()):
+        super().__init__(message)
+        self.keys = list(keys)
+
+
+def is_transient(e: BaseException) -> bool:
+    """MongoDB errors a later attempt can get past: lost connection, failover, timeouts."""
+    if isinstance(e, (ConnectionFailure, ExecutionTimeout, WTimeoutError)):
+        return True
+    return isinstance(e, PyMongoError) and (
+        e.has_error_label("RetryableWriteError") or e.has_error_label("TransientTransactionError")
+    )
+
+
+def public_job(doc: dict) -> dict:
+    """The fields of a job document that GET /jobs/{id} returns."""
+    return {
+        "id": str(doc["_id"]),
+        "type": doc["type"],
+        "status": doc["status"],
+        "progress": doc.get("progress"),
+        "result": doc.get("result"),
+        "error": doc.get("error"),
+        "attempts": doc.get("attempts", 0),
+        "created_at": doc.get("created_at"),
+        "started_at": doc.get("started_at"),
+        "finished_at": doc.get("finished_at"),
+    }
+
+
+class JobQueue:
+    def __init__(
+        self,
+        lease_seconds: float = 60.0,
+        poll_seconds: float = 2.0,
+        max_attempts: int = 3,
+    ):
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = uuid.uuid4().hex
+        self._handlers: Dict[str, Handler] = {}
+        self._concurrency: Dict[str, int] = {}
+        self._wake: Dict[str, asyncio.Event] = {}
+        self._tasks = []
+
+    def register(self, job_type: str, handler: Handler, concurrency: int = 1) -> None:
+        self._handlers[job_type] = handler
+        self._concurrency[job_type] = concurrency
+
+    def _collection(self):
+        if core_db.db is None:
+            raise RuntimeError("Database not initialized")
+        return core_db.db[core_db.JOBS_COLLECTION]
+
+    # API used by routes ---------------------------------------------------------
+
+    async def _lock(self, job_id: ObjectId, keys: List[str], now: datetime) -> None:
+        locks = [{"type": LOCK, "status": LOCK, "job_id": job_id, "active_key": k, "created_at": now} for k in keys]
+        try:
+            await self._collection().insert_many(locks, ordered=False)
+        except BulkWriteError as e:
+            await self._collection().delete_many({"job_id": job_id, "status": LOCK})
+            busy = sorted({locks[err["index"]]["active_key"] for err in e.details.get("writeErrors", [])})
+            raise JobConflict(f"Another operation is already in progress for {', '.join(busy)}", busy)
+
+    async def _clear_stale_locks(self, keys: List[str]) -> int:
+        """
+        Remove locks whose job never got inserted (its submitter died between
+        the two writes) or has already finished. Only locks older than a
+        lease are considered, so a submit in progress is never disturbed.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        held = await self._collection().find(
+            {"status": LOCK, "active_key": {"$in": keys}, "created_at": {"$lt": cutoff}}, {"job_id": 1},
+        ).to_list(None)
+        if not held:
+            return 0
+        live = set(await self._collection().distinct(
+            "_id", {"_id": {"$in": [h["job_id"] for h in held]}, "status": {"$in": list(ACTIVE_STATUSES)}},
+        ))
+        stale = [h["_id"] for h in held if h["job_id"] not in live]
+        if stale:
+            await self._collection().delete_many({"_id": {"$in": stale}})
+        return len(stale)
+
+    async def submit(
+        self,
+        job_type: str,
+        params: dict,
+        key: Optional[str] = None,
+        requested_by: Optional[str] = None,
+        keys: Optional[List[str]] = None,
+    ) -> dict:
+        """
+        Queue a job. key locks one tenant through the job's own active_key;
+        keys locks several through lock documents. Either raises JobConflict
+        if another job holds one of them.
+        """
+        if job_type not in self._handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        now = datetime.utcnow()
+        doc = {
+            "_id": ObjectId(),
+            "type": job_type,
+            "status": QUEUED,
+            "params": params,
+            "requested_by": requested_by,
+            "progress": None,
+            "result": None,
+            "error": None,
+            "attempts": 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        if key is not None:
+            doc["active_key"] = key
+        if keys:
+            doc["locks"] = len(keys)
+            try:
+                await self._lock(doc["_id"], keys, now)
+            except JobConflict as e:
+                if not await self._clear_stale_locks(e.keys):
+                    raise
+                await self._lock(doc["_id"], keys, now)
+        for retry in (False, True):
+            try:
+                await self._collection().insert_one(doc)
+                break
+            except DuplicateKeyError:
+                if retry or not await self._clear_stale_locks([key]):
+                    raise JobConflict(f"Another operation is already in progress for {key}", [key])
+        wake = self._wake.get(job_type)
+        if wake is not None:
+            wake.set()
+        return doc
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        if not ObjectId.is_valid(job_id):
+            return None
+        return await self._collection().find_one({"_id": ObjectId(job_id)})
+
+    # execution --------------------------------------------------------------------
+
+    async def _claim(self, job_type: str) -> Optional[dict]:
+        now = datetime.utcnow()
+        return await self._collection().find_one_and_update(
+            {"type": job_type, "$or": [
+                {"status": QUEUED},
+                # the process running it went away without finishing
+                {"status": RUNNING, "lease_until": {"$lt": now}},
+            ]},
+            {
+                "$set": {
+                    "status": RUNNING,
+                    "worker": self.worker_id,
+                    "lease_until": now + timedelta(seconds=self.lease_seconds),
+                    "started_at": now,
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _finish(self, job: dict, status: str, result=None, error: Optional[str] = None) -> None:
+        now = datetime.utcnow()
+        await self._collection().update_one(
+            {"_id": job["_id"], "worker": self.worker_id},
+            {
+                "$set": {"status": status, "result": result, "error": error, "finished_at": now, "updated_at": now},
+                "$unset": {"active_key": "", "lease_until": ""},
+            },
+        )
+        if job.get("locks"):
+            await self._collection().delete_many({"job_id": job["_id"], "status": LOCK})
+
+    async def _retry_later(self, job: dict, error: Exception) -> None:
+        """Let a transiently failed job be claimed again once a poll interval has passed."""
+        logger.warning(
+            "Job %s (%s): attempt %s of %s hit %s, retrying",
+            job["_id"], job["type"], job["attempts"], self.max_attempts, error,
+        )
+        now = datetime.utcnow()
+        await self._collection().update_one(
+            {"_id": job["_id"], "worker": self.worker_id},
+            {"$set": {
+                "error": str(error) or type(error).__name__,
+                "lease_until": now + timedelta(seconds=self.poll_seconds),
+                "updated_at": now,
+            }},
+        )
+
+    async def _heartbeat(self, job: dict) -> None:
+        # a failed beat is retried soon, well before the lease runs out
+        delay = self.lease_seconds / 3
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self._collection().update_one(
+                    {"_id": job["_id"], "worker": self.worker_id},
+                    {"$set": {"lease_until": datetime.utcnow() + timedelta(seconds=self.lease_seconds)}},
+                )
+                delay = self.lease_seconds / 3
+            except PyMongoError as e:
+                logger.warning("Job %s: heartbeat failed (%s), retrying", job["_id"], e)
+                delay = min(self.lease_seconds / 12, 1.0)
+
+    async def _run(self, job: dict) -> None:
+        if job["attempts"] > self.max_attempts:
+            await self._finish(job, FAILED, error=f"Gave up after {self.max_attempts} attempts")
+            return
+
+        async def progress(stage: str, **details):
+            await self._collection().update_one(
+                {"_id": job["_id"]},
+                {"$set": {"progress": {"stage": stage, **details}, "updated_at": datetime.utcnow()}},
+            )
+
+        handler = self._handlers[job["type"]]
+        heartbeat = asyncio.ensure_future(self._heartbeat(job))
+        try:
+            result = await handler(job["params"], progress)
+        except asyncio.CancelledError:
+            # shutting down: hand the job back instead of waiting for the lease
+            # to lapse, and give back the attempt so restarts cannot fail it
+            await asyncio.shield(self._collection().update_one(
+                {"_id": job["_id"], "worker": self.worker_id},
+                {"$set": {"status": QUEUED}, "$unset": {"lease_until": ""}, "$inc": {"attempts": -1}},
+            ))
+            raise
+        except PyMongoError as e:
+            if not is_transient(e) or job["attempts"] >= self.max_attempts:
+                logger.exception("Job %s (%s) failed", job["_id"], job["type"])
+                await self._finish(job, FAILED, error=str(e) or type(e).__name__)
+            else:
+                await self._retry_later(job, e)
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job["_id"], job["type"])
+            await self._finish(job, FAILED, error=str(e) or type(e).__name__)
+        else:
+            await self._finish(job, SUCCEEDED, result=result)
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+
+    async def run_pending(self, job_type: Optional[str] = None) -> int:
+        """Run claimable jobs in this task until none are left; returns how many ran."""
+        ran = 0
+        for t in [job_type] if job_type else list(self._handlers):
+            while True:
+                job = await self._claim(t)
+                if job is None:
+                    break
+                await self._run(job)
+                ran += 1
+        return ran
+
+    async def _worker(self, job_type: str) -> None:
+        wake = self._wake[job_type]
+        while True:
+            try:
+                job = await self._claim(job_type)
+            except PyMongoError as e:
+                logger.warning("Job queue: claim failed (%s)", e)
+                job = None
+            if job is not None:
+                try:
+                    await self._run(job)
+                except Exception:
+                    # e.g. the final status write failed; the lease lapses and
+                    # the job is claimed again, this worker moves on
+                    logger.exception("Job queue: %s job %s did not finish cleanly", job_type, job["_id"])
+                continue
+            wake.clear()
+            try:
+                # other processes enqueue too, so poll as well as wait to be woken
+                await asyncio.wait_for(wake.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        """Spawn the worker coroutines; jobs left over from a previous run are picked up."""
+        if self._tasks:
+            return
+        for job_type, n in self._concurrency.items():
+            self._wake[job_type] = asyncio.Event()
+            self._tasks += [asyncio.ensure_future(self._worker(job_type)) for _ in range(max(n, 1))]
+        logger.info("Job queue started: %s", self._concurrency)
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._wake.clear()
+
+
+@lru_cache(maxsize=None)
+def get_job_queue() -> JobQueue:
+    queue = JobQueue(
+        lease_seconds=settings.job_lease_seconds,
+        poll_seconds=settings.job_poll_seconds,
+        max_attempts=settings.job_max_attempts,
+    )
+    # imported here: tenants imports this module, and its handlers' worker
+    # counts come from settings too
+    from app.services.tenants import register_jobs
+
+    register_jobs(queue)
+    return queue
+
+
+job_queue = Lazy(get_job_queue)
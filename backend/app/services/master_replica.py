@@ -0,0 +1,238 @@
+# backend/app/services/master_replica.py
+"""
+In-process replica of master_organizations.
+
+The collection is small and read on nearly every request, so with
+MASTER_REPLICA_ENABLED the whole thing is loaded at startup and kept current
+from a change stream. Deployments without change streams (standalone mongod,
+the in-memory test stand-in) fall back to re-reading the collection every
+MASTER_REPLICA_POLL_SECONDS.
+
+Lookups are read-through: a hit never touches the network, a miss (or a
+replica that is not running) falls back to find_one and caches what it
+found. Routes that write master documents also apply the change locally so
+the same process never reads its own write stale.
+"""
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Dict, Optional
+
+from bson import ObjectId
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.core import db as core_db
+from app.core.config import Lazy, settings
+
+logger = logging.getLogger(__name__)
+
+INDEXED_FIELDS = ("organization_name", "admin_email", "admin_id")
+
+
+def _key(field: str, value):
+    # admin_id is stored as ObjectId but tokens carry it as a string
+    return str(value) if field == "admin_id" else value
+
+
+def first_match(docs: list, lookups: list) -> Optional[dict]:
+    """The first of `docs` matching the earliest (field, value) in `lookups`."""
+    for field, value in lookups:
+        if value is None:
+            continue
+        for doc in docs:
+            if doc.get(field) is not None and _key(field, doc[field]) == _key(field, value):
+                return doc
+    return None
+
+
+class MasterReplica:
+    def __init__(self, poll_seconds: float = 5.0):
+        self.poll_seconds = poll_seconds
+        self.ready = False
+        self.mode: Optional[str] = None  # "change_stream" or "polling" while running
+        self._docs: Dict[object, dict] = {}
+        self._index: Dict[str, Dict[object, object]] = {f: {} for f in INDEXED_FIELDS}
+        self._task: Optional[asyncio.Task] = None
+        self._db = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _collection(self):
+        db = self._db if self._db is not None else core_db.db
+        return db[core_db.MASTER_COLLECTION]
+
+    # local state ------------------------------------------------------------
+
+    def apply(self, doc: dict) -> None:
+        """Insert or replace one master document (no-op while the replica is not running)."""
+        if self.ready:
+            self._put(doc)
+
+    def _put(self, doc: dict) -> None:
+        self.remove(doc["_id"])
+        self._docs[doc["_id"]] = dict(doc)
+        for field in INDEXED_FIELDS:
+            if doc.get(field) is not None:
+                self._index[field][_key(field, doc[field])] = doc["_id"]
+
+    def remove(self, _id) -> None:
+        old = self._docs.pop(_id, None)
+        if old is None:
+            return
+        for field in INDEXED_FIELDS:
+            key = _key(field, old.get(field))
+            if self._index[field].get(key) == _id:
+                del self._index[field][key]
+
+    def _replace_all(self, docs) -> None:
+        self._docs = {}
+        self._index = {f: {} for f in INDEXED_FIELDS}
+        for doc in docs:
+            self._put(doc)
+
+    def get(self, field: str, value) -> Optional[dict]:
+        """Local lookup only; returns a copy so callers may mutate it."""
+        _id = self._index[field].get(_key(field, value))
+        doc = self._docs.get(_id) if _id is not None else None
+        return dict(doc) if doc is not None else None
+
+    # lookups ----------------------------------------------------------------
+
+    async def find_one(self, field: str, value) -> Optional[dict]:
+        """find_one({field: value}) on master_organizations, served locally when possible."""
+        if value is None:
+            return None
+        if self.ready:
+            doc = self.get(field, value)
+            if doc is not None:
+                return doc
+        if field == "admin_id" and isinstance(value, str) and ObjectId.is_valid(value):
+            doc = await self._collection().find_one({field: ObjectId(value)})
+            if doc is None:
+                doc = await self._collection().find_one({field: value})
+        else:
+            doc = await self._collection().find_one({field: value})
+        if doc is not None:
+            self.apply(doc)
+        return doc
+
+    async def find_any(self, lookups: list, projection: Optional[dict] = None) -> list:
+        """
+        Master documents matching any of `lookups` ((field, value) pairs; None
+        values are skipped) with one $or query instead of a find_one each.
+        Lookups the replica answers locally are left out of the query. Only
+        full documents (no projection) are cached.
+        """
+        found, clauses = {}, []
+        for field, value in lookups:
+            if value is None:
+                continue
+            doc = self.get(field, value) if self.ready else None
+            if doc is not None:
+                found[doc["_id"]] = doc
+            elif field == "admin_id" and isinstance(value, str) and ObjectId.is_valid(value):
+                clauses.append({field: {"$in": [ObjectId(value), value]}})
+            else:
+                clauses.append({field: value})
+        if clauses:
+            query = clauses[0] if len(clauses) == 1 else {"$or": clauses}
+            for doc in await self._collection().find(query, projection).to_list(length=None):
+                if projection is None:
+                    self.apply(doc)
+                found.setdefault(doc["_id"], doc)
+        return list(found.values())
+
+    async def find_first(self, lookups: list) -> Optional[dict]:
+        """
+        The document matched by the earliest of `lookups` that matches at all
+        (they are in priority order), or None. A replica hit on the first
+        lookup needs no query; otherwise one $or query covers all of them.
+        """
+        lookups = [(field, value) for field, value in lookups if value is not None]
+        if not lookups:
+            return None
+        if self.ready:
+            doc = self.get(*lookups[0])
+            if doc is not None:
+                return doc
+        return first_match(await self.find_any(lookups), lookups)
+
+    # sync -------------------------------------------------------------------
+
+    async def load(self, db=None) -> int:
+        """Read the whole collection and start serving lookups from memory."""
+        if db is not None:
+            self._db = db
+        docs = await self._collection().find({}).to_list(length=None)
+        self._replace_all(docs)
+        self.ready = True
+        return len(docs)
+
+    async def start(self, db=None) -> None:
+        await self.load(db)
+        self._task = asyncio.ensure_future(self._sync())
+        logger.info("Master replica loaded %s organizations", len(self))
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self.ready = False
+        self.mode = None
+
+    async def _sync(self) -> None:
+        while True:
+            try:
+                await self._follow_change_stream()
+            except (OperationFailure, AttributeError, NotImplementedError) as e:
+                # no change streams here (standalone server or stand-in)
+                logger.info("Master replica: change streams unavailable (%s), polling", e)
+                await self._poll()
+                return
+            except PyMongoError as e:
+                logger.warning("Master replica: change stream interrupted (%s), reloading", e)
+                await asyncio.sleep(self.poll_seconds)
+                try:
+                    await self.load()
+                except PyMongoError:
+                    pass
+
+    async def _follow_change_stream(self) -> None:
+        async with self._collection().watch(full_document="updateLookup") as stream:
+            self.mode = "change_stream"
+            # events between load() and opening the stream would be lost
+            await self.load()
+            async for change in stream:
+                op = change["operationType"]
+                if op in ("insert", "update", "replace") and change.get("fullDocument"):
+                    self._put(change["fullDocument"])
+                elif op == "delete" or (op in ("update", "replace") and not change.get("fullDocument")):
+                    self.remove(change["documentKey"]["_id"])
+                elif op in ("drop", "rename", "dropDatabase", "invalidate"):
+                    await self.load()
+                    return
+
+    async def _poll(self) -> None:
+        self.mode = "polling"
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await self.load()
+            except PyMongoError as e:
+                logger.warning("Master replica: poll failed (%s)", e)
+
+    def stats(self) -> dict:
+        return {"enabled": settings.master_replica_enabled, "ready": self.ready, "mode": self.mode, "size": len(self)}
+
+
+@lru_cache(maxsize=None)
+def get_master_replica() -> MasterReplica:
+    return MasterReplica(poll_seconds=settings.master_replica_poll_seconds)
+
+
+master_replica = Lazy(get_master_replica)
@@ -0,0 +1,104 @@
+# backend/app/services/passwords.py
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional
+
+from app.core.config import Lazy, settings
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when the hashing queue is full and the request should be shed."""
+
+
+def _hash(password: str) -> str:
+    # module-level so it can be pickled for the process pool; passlib is
+    # imported on the first hash instead of at startup
+    from passlib.hash import bcrypt_sha256
+
+    return bcrypt_sha256.hash(password)
+
+
+def _verify(password: str, password_hash: str) -> bool:
+    from passlib.hash import bcrypt_sha256
+
+    return bcrypt_sha256.verify(password, password_hash)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt off the event loop in a bounded worker pool.
+
+    At most `workers` hashes run at once and at most `queue_size` more may wait;
+    anything beyond that fails fast with PasswordHasherBusy instead of piling up.
+    With workers=0 hashing runs inline on the loop (useful for benchmarks only).
+    """
+
+    def __init__(self, workers: int = 4, queue_size: int = 64, executor: str = "thread"):
+        if executor not in ("thread", "process"):
+            raise ValueError("executor must be 'thread' or 'process'")
+        self.workers = workers
+        self.queue_size = queue_size
+        self.executor_kind = executor
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+
+    def _ensure_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwhash")
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+
+        executor = self._ensure_executor()
+        if self._pending >= self.workers + self.queue_size:
+            raise PasswordHasherBusy("Password hashing queue is full")
+
+        # the executor runs `workers` jobs at a time and queues the rest;
+        # _pending bounds that queue
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(_verify, password, password_hash)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._executor = None
+
+
+@lru_cache(maxsize=None)
+def get_password_hasher() -> PasswordHasher:
+    return PasswordHasher(
+        workers=settings.password_hash_workers,
+        queue_size=settings.password_hash_queue_size,
+        executor=settings.password_hash_executor,
+    )
+
+
+password_hasher = Lazy(get_password_hasher)
+
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.hash(password)
+
+
+async def verify_password(password: str, password_hash: str) -> bool:
+    return await password_hasher.verify(password, password_hash)
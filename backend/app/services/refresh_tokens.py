@@ -0,0 +1,94 @@
+# backend/app/services/refresh_tokens.py
+"""
+Long-lived, single-use refresh tokens for POST /auth/refresh.
+
+A refresh token is 256 random bits; only its sha256 is stored, next to the
+claims of the access tokens it may mint. Each use replaces it with a new
+token of the same family. Presenting a token that was already used means
+it leaked (or a client kept an old copy), so the whole family is revoked.
+A TTL index on expires_at removes tokens nobody came back for.
+
+Random tokens this long need no slow hash: a sha256 lookup is all a
+refresh costs, instead of the bcrypt verify of a login.
+"""
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pymongo import ReturnDocument
+
+from app.core import db as core_db
+from app.core.config import settings
+
+
+class InvalidRefreshToken(Exception):
+    """Unknown, expired, revoked or already used refresh token."""
+
+
+def _digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _collection():
+    return core_db.db[core_db.REFRESH_TOKENS_COLLECTION]
+
+
+async def issue(subject: str, claims: dict, family: Optional[str] = None) -> str:
+    """Store a new refresh token for `subject` and return it (the only time it is in clear)."""
+    token = secrets.token_urlsafe(32)
+    now = datetime.utcnow()
+    await _collection().insert_one({
+        "token_hash": _digest(token),
+        "family": family or secrets.token_hex(16),
+        "subject": subject,
+        "claims": claims,
+        # copied out of claims so revoke_orgs() can use an index
+        "organization_name": claims.get("organization_name"),
+        "created_at": now,
+        "expires_at": now + timedelta(days=settings.refresh_token_expire_days),
+    })
+    return token
+
+
+async def rotate(token: str) -> tuple:
+    """
+    Use up `token`; returns (subject, claims, new refresh token). Raises
+    InvalidRefreshToken if it cannot be used, revoking its family on reuse.
+    """
+    coll = _collection()
+    now = datetime.utcnow()
+    digest = _digest(token)
+    # one round trip both checks and consumes the token, so two concurrent
+    # refreshes with the same token cannot both succeed
+    doc = await coll.find_one_and_update(
+        {"token_hash": digest, "used_at": None, "expires_at": {"$gt": now}},
+        {"$set": {"used_at": now}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if doc is None:
+        spent = await coll.find_one({"token_hash": digest}, {"family": 1, "used_at": 1})
+        if spent is not None and spent.get("used_at") is not None:
+            await coll.delete_many({"family": spent["family"]})
+        raise InvalidRefreshToken("Invalid or expired refresh token")
+
+    new_token = await issue(doc["subject"], doc["claims"], family=doc["family"])
+    return doc["subject"], doc["claims"], new_token
+
+
+async def revoke(token: str) -> bool:
+    """Revoke the family `token` belongs to (logout); False if it is unknown."""
+    coll = _collection()
+    doc = await coll.find_one({"token_hash": _digest(token)}, {"family": 1})
+    if doc is None:
+        return False
+    await coll.delete_many({"family": doc["family"]})
+    return True
+
+
+async def revoke_orgs(org_names: list) -> int:
+    """Revoke every refresh token issued to admins of these organizations."""
+    if core_db.db is None or not org_names:
+        return 0
+    result = await _collection().delete_many({"organization_name": {"$in": list(org_names)}})
+    return result.deleted_count
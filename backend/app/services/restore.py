@@ -0,0 +1,355 @@
+# backend/app/services/restore.py
+import os
+import gzip
+import json
+import time
+import asyncio
+import hashlib
+import datetime
+import logging
+from typing import Iterator, List, Optional
+
+from bson import ObjectId, json_util
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+
+from app.core import db as core_db
+from app.core.config import settings
+from app.services.backup import load_manifest, restore_chain
+
+logger = logging.getLogger(__name__)
+
+RESTORE_BATCH_SIZE = 500
+RESTORE_MAX_IN_FLIGHT = 4
+READ_CHUNK_CHARS = 64 * 1024
+DUPLICATE_KEY = 11000
+# version 1 and legacy JSON array backups stored ObjectIds and datetimes as
+# str(); turn these fields back into their types
+OBJECTID_FIELDS = ("_id", "tenant_id")
+DATETIME_FIELDS = ("created_at", "updated_at")
+
+
+class BackupFileError(ValueError):
+    """Raised for a backup file that cannot be parsed or fails its checksum."""
+
+
+def _revive(doc: dict) -> dict:
+    for field in OBJECTID_FIELDS:
+        value = doc.get(field)
+        if isinstance(value, str) and ObjectId.is_valid(value):
+            doc[field] = ObjectId(value)
+    for field in DATETIME_FIELDS:
+        value = doc.get(field)
+        if isinstance(value, str):
+            try:
+                doc[field] = datetime.datetime.fromisoformat(value.rstrip("Z"))
+            except ValueError:
+                pass
+    return doc
+
+
+class BackupReader:
+    """
+    Streams documents out of a backup file without loading it whole.
+
+    Understands the gzip NDJSON files written by BackupWriter (header/trailer
+    lines are consumed and the trailer checksum is verified) as well as the
+    older indented JSON array files, gzip-compressed or not.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.header: Optional[dict] = None
+        self.trailer: Optional[dict] = None
+        self.format: Optional[str] = None
+        self._sha = hashlib.sha256()
+
+    @property
+    def _typed(self) -> bool:
+        # version 2 files carry Extended JSON types and need no reviving
+        return self.header is not None and self.header.get("version", 1) >= 2
+
+    def _open(self):
+        with open(self.path, "rb") as f:
+            magic = f.read(2)
+        if magic == b"\x1f\x8b":
+            return gzip.open(self.path, "rt", encoding="utf-8", newline="")
+        return open(self.path, "r", encoding="utf-8", newline="")
+
+    def __iter__(self) -> Iterator[dict]:
+        with self._open() as f:
+            first = f.read(1)
+            while first and first.isspace():
+                first = f.read(1)
+            if first == "[":
+                self.format = "json"
+                yield from self._iter_json_array(f)
+            elif first:
+                self.format = "ndjson"
+                yield from self._iter_ndjson(f, first)
+
+        if self.trailer is not None and self.trailer.get("sha256") != self._sha.hexdigest():
+            raise BackupFileError(f"{self.path}: checksum mismatch, file is corrupt or truncated")
+
+    def verify(self) -> bool:
+        """
+        Read the whole file once without decoding documents and raise
+        BackupFileError if it is corrupt or truncated: NDJSON lines are hashed
+        against the trailer, a JSON array must be complete. Returns whether a
+        trailer checksum was checked. restore_collection_async() calls this
+        before writing anything.
+        """
+        try:
+            with self._open() as f:
+                first = f.read(1)
+                while first and first.isspace():
+                    first = f.read(1)
+                if first == "[":
+                    # legacy files carry no checksum; parsing to the end finds truncation
+                    for _ in self._iter_json_array(f):
+                        pass
+                    return False
+                if not first:
+                    return False
+                return self._verify_ndjson(first + f.readline(), f)
+        except BackupFileError:
+            raise
+        except (EOFError, OSError, ValueError) as e:
+            # gzip stream or a manifest line cut short
+            raise BackupFileError(f"{self.path}: unreadable, file is corrupt or truncated ({e})") from e
+
+    def _verify_ndjson(self, line: str, f) -> bool:
+        # only the first and last lines can be manifests; they are the only ones decoded
+        header = json_util.loads(line).get("__backup__") == "header"
+        sha = hashlib.sha256()
+        pending = None if header else line
+        for line in f:
+            if not line.strip():
+                continue
+            if pending is not None:
+                sha.update(pending.encode("utf-8"))
+            pending = line
+        trailer = json_util.loads(pending) if pending is not None else {}
+        if trailer.get("__backup__") != "trailer":
+            if header:
+                raise BackupFileError(f"{self.path}: no trailer, file is truncated")
+            return False
+        if trailer.get("sha256") != sha.hexdigest():
+            raise BackupFileError(f"{self.path}: checksum mismatch, file is corrupt or truncated")
+        return True
+
+    def _iter_ndjson(self, f, first: str) -> Iterator[dict]:
+        line = first + f.readline()
+        while line:
+            if line.strip():
+                doc = json_util.loads(line)
+                marker = doc.get("__backup__")
+                if marker == "header":
+                    self.header = doc
+                elif marker == "trailer":
+                    self.trailer = doc
+                else:
+                    self._sha.update(line.encode("utf-8"))
+                    yield doc if self._typed else _revive(doc)
+            line = f.readline()
+
+    def _iter_json_array(self, f) -> Iterator[dict]:
+        decoder = json.JSONDecoder()
+        buf = ""
+        pos = 0
+        eof = False
+        while True:
+            # skip separators between array items
+            while pos < len(buf) and (buf[pos].isspace() or buf[pos] == ","):
+                pos += 1
+            if pos < len(buf) and buf[pos] == "]":
+                return
+            try:
+                if pos >= len(buf):
+                    raise ValueError("need more data")
+                doc, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                if eof:
+                    raise BackupFileError(f"{self.path}: truncated JSON array")
+                chunk = f.read(READ_CHUNK_CHARS)
+                eof = not chunk
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+            pos = end
+            yield _revive(doc)
+
+
+def _checkpoint_path(path: str, coll_name: str) -> str:
+    return f"{path}.{coll_name}.restore.json"
+
+
+def _read_checkpoint(path: str) -> int:
+    if not os.path.exists(path):
+        return 0
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("applied", 0)
+
+
+def _write_checkpoint(path: str, applied: int) -> None:
+    tmp = path + ".part"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"applied": applied}, f)
+    os.replace(tmp, path)
+
+
+def _next_batch(it: Iterator[dict], size: int) -> List[dict]:
+    batch = []
+    for doc in it:
+        batch.append(doc)
+        if len(batch) >= size:
+            break
+    return batch
+
+
+async def restore_collection_async(
+    path: str,
+    coll_name: str,
+    upsert: bool = False,
+    resume: bool = True,
+    batch_size: int = RESTORE_BATCH_SIZE,
+    max_in_flight: int = RESTORE_MAX_IN_FLIGHT,
+    db=None,
+) -> dict:
+    """
+    Restore a backup file into coll_name.
+
+    The file is verified end to end first (BackupReader.verify), so a corrupt
+    or truncated backup raises BackupFileError before any document is written.
+    Documents are read in a worker thread and written in concurrent unordered
+    batches: insert_many by default, where documents already present
+    (duplicate _id) are skipped, or ReplaceOne upserts with upsert=True, which
+    incremental backups need. Progress is checkpointed next to the backup file,
+    so a crashed restore resumes where it stopped when run again.
+
+    Returns counts and throughput: {"read", "written", "skipped", "resumed_from",
+    "seconds", "docs_per_s", "verified"}.
+    """
+    db = db if db is not None else core_db.db
+    if db is None:
+        raise RuntimeError("Database not initialized")
+
+    await asyncio.to_thread(BackupReader(path).verify)
+
+    coll = db[coll_name]
+    checkpoint = _checkpoint_path(path, coll_name)
+    resumed_from = await asyncio.to_thread(_read_checkpoint, checkpoint) if resume else 0
+
+    reader = BackupReader(path)
+    docs = iter(reader)
+    skipped_on_resume = 0
+    # re-reading the skipped prefix keeps the checksum verification intact
+    while skipped_on_resume < resumed_from:
+        batch = await asyncio.to_thread(_next_batch, docs, min(batch_size, resumed_from - skipped_on_resume))
+        if not batch:
+            break
+        skipped_on_resume += len(batch)
+
+    written = 0
+    skipped = 0
+    read = skipped_on_resume
+    # batches finish out of order; only a contiguous prefix of finished
+    # batches is safe to record in the checkpoint
+    finished: dict = {}
+    applied = skipped_on_resume
+    next_seq = 0
+    batch_sizes: dict = {}
+    # one checkpoint writer at a time: they share the .part file
+    checkpoint_lock = asyncio.Lock()
+
+    async def write(seq: int, batch: List[dict]):
+        nonlocal written, skipped, applied, next_seq
+        if upsert:
+            res = await coll.bulk_write([ReplaceOne({"_id": d["_id"]}, d, upsert=True) for d in batch], ordered=False)
+            written += res.upserted_count + res.matched_count
+        else:
+            try:
+                res = await coll.insert_many(batch, ordered=False)
+                written += len(res.inserted_ids)
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                if any(err.get("code") != DUPLICATE_KEY for err in errors):
+                    raise
+                skipped += len(errors)
+                written += e.details.get("nInserted", len(batch) - len(errors))
+
+        finished[seq] = True
+        while finished.pop(next_seq, False):
+            applied += batch_sizes.pop(next_seq)
+            next_seq += 1
+        async with checkpoint_lock:
+            await asyncio.to_thread(_write_checkpoint, checkpoint, applied)
+
+    in_flight: set = set()
+    started = time.perf_counter()
+    seq = 0
+    try:
+        while True:
+            batch = await asyncio.to_thread(_next_batch, docs, batch_size)
+            if not batch:
+                break
+            read += len(batch)
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    t.result()
+            batch_sizes[seq] = len(batch)
+            in_flight.add(asyncio.ensure_future(write(seq, batch)))
+            seq += 1
+        for t in asyncio.as_completed(in_flight):
+            await t
+        in_flight = set()
+    finally:
+        for t in in_flight:
+            t.cancel()
+
+    if os.path.exists(checkpoint):
+        await asyncio.to_thread(os.remove, checkpoint)
+
+    seconds = time.perf_counter() - started
+    processed = read - skipped_on_resume
+    result = {
+        "read": read,
+        "written": written,
+        "skipped": skipped,
+        "resumed_from": resumed_from,
+        "seconds": round(seconds, 4),
+        "docs_per_s": round(processed / seconds, 1) if seconds else 0.0,
+        "verified": reader.trailer is not None,
+    }
+    logger.info("Restored %s into %s: %s", path, coll_name, result)
+    return result
+
+
+async def restore_chain_async(
+    coll_name: str,
+    out_dir: Optional[str] = None,
+    target: Optional[str] = None,
+    db=None,
+    before: Optional[datetime.datetime] = None,
+) -> List[dict]:
+    """
+    Rebuild a collection from its backup manifest: the last full backup
+    followed by every incremental after it (applied as upserts). before picks
+    an older chain (see backup.restore_chain). Documents deleted after the
+    full backup are not tombstoned by incrementals and come back.
+    """
+    out_dir = out_dir or settings.backup_dir
+    manifest = await load_manifest(coll_name, out_dir)
+    if not manifest:
+        raise FileNotFoundError(f"No backup manifest for {coll_name} in {out_dir}")
+
+    results = []
+    for entry in restore_chain(manifest, before):
+        results.append(await restore_collection_async(
+            os.path.join(out_dir, entry["file"]),
+            target or coll_name,
+            upsert=entry["kind"] == "incremental",
+            db=db,
+        ))
+    return results
@@ -0,0 +1,173 @@
+# backend/app/services/tenant_stats.py
+"""
+Per-tenant size report for GET /admin/stats.
+
+Tenants with their own collection get one collStats each, run concurrently
+but at most TENANT_STATS_CONCURRENCY at a time. Tenants in the shared
+collection cost one collStats on it plus one $group count, and their sizes
+are estimated from the average document size.
+
+The report is cached for TENANT_STATS_TTL_SECONDS. Past that, callers get
+the previous report (marked stale) while one refresh runs in the
+background, so a dashboard polling the endpoint never waits on, or piles
+up, thousands of collStats calls.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+
+from pymongo.errors import PyMongoError
+
+from app.core import db as core_db
+from app.core.config import Lazy, settings
+from app.core.tenancy import is_shared
+
+logger = logging.getLogger(__name__)
+
+
+def _entry(org: dict, storage: str, count: int, size: int, storage_size: int, index_size: int) -> dict:
+    return {
+        "organization_name": org["organization_name"],
+        "collection_name": org["collection_name"],
+        "storage": storage,
+        "count": count,
+        "size": size,
+        "storage_size": storage_size,
+        "index_size": index_size,
+    }
+
+
+class TenantStats:
+    def __init__(self, ttl_seconds: float = 300.0, concurrency: int = 16):
+        self.ttl_seconds = ttl_seconds
+        self.concurrency = concurrency
+        self._report: Optional[dict] = None
+        self._refreshed_at = 0.0
+        self._refresh: Optional[asyncio.Task] = None
+        self.refreshes = 0
+
+    async def _own_collection(self, db, org: dict, slots: asyncio.Semaphore) -> dict:
+        async with slots:
+            stats = await db.command("collStats", org["collection_name"])
+        return _entry(
+            org, "collection", stats.get("count", 0), stats.get("size", 0),
+            stats.get("storageSize", 0), stats.get("totalIndexSize", 0),
+        )
+
+    async def _shared(self, db, orgs: list, slots: asyncio.Semaphore) -> list:
+        shared = db[core_db.SHARED_TENANT_COLLECTION]
+        async with slots:
+            stats = await db.command("collStats", core_db.SHARED_TENANT_COLLECTION)
+            counts = {
+                row["_id"]: row["count"]
+                async for row in shared.aggregate([{"$group": {"_id": "$tenant_id", "count": {"$sum": 1}}}])
+            }
+        total = stats.get("count") or 1
+        entries = []
+        for org in orgs:
+            count = counts.get(org["tenant_id"], 0)
+            share = count / total
+            entry = _entry(
+                org, "shared", count, count * stats.get("avgObjSize", 0),
+                int(stats.get("storageSize", 0) * share), int(stats.get("totalIndexSize", 0) * share),
+            )
+            entry["estimated"] = True
+            entries.append(entry)
+        return entries
+
+    async def collect(self) -> dict:
+        """Build a fresh report (bypasses the cache)."""
+        db = core_db.db
+        if db is None:
+            raise RuntimeError("Database not initialized")
+        started = time.perf_counter()
+        orgs = await db[core_db.MASTER_COLLECTION].find(
+            {}, {"organization_name": 1, "collection_name": 1, "tenant_id": 1},
+        ).to_list(None)
+        own = [o for o in orgs if not is_shared(o)]
+        shared = [o for o in orgs if is_shared(o)]
+
+        slots = asyncio.Semaphore(max(self.concurrency, 1))
+        jobs = [self._own_collection(db, o, slots) for o in own]
+        if shared:
+            jobs.append(self._shared(db, shared, slots))
+        outcomes = await asyncio.gather(*jobs, return_exceptions=True)
+
+        tenants, errors = [], []
+        for org, outcome in zip(own + [None], outcomes):
+            if isinstance(outcome, Exception):
+                name = org["organization_name"] if org else core_db.SHARED_TENANT_COLLECTION
+                logger.warning("Tenant stats for %s failed: %s", name, outcome)
+                errors.append({"organization_name": name, "error": str(outcome)})
+            elif isinstance(outcome, list):
+                tenants.extend(outcome)
+            else:
+                tenants.append(outcome)
+        tenants.sort(key=lambda t: t["size"], reverse=True)
+
+        return {
+            "generated_at": datetime.utcnow(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "totals": {
+                "tenants": len(tenants),
+                "count": sum(t["count"] for t in tenants),
+                "size": sum(t["size"] for t in tenants),
+                "storage_size": sum(t["storage_size"] for t in tenants),
+                "index_size": sum(t["index_size"] for t in tenants),
+            },
+            "tenants": tenants,
+            "errors": errors,
+        }
+
+    async def _run_refresh(self) -> dict:
+        try:
+            report = await self.collect()
+        except PyMongoError as e:
+            logger.warning("Tenant stats refresh failed: %s", e)
+            raise
+        self._report, self._refreshed_at = report, time.monotonic()
+        self.refreshes += 1
+        return report
+
+    def _refresh_task(self) -> asyncio.Task:
+        task = self._refresh
+        # a task left over from another (finished) event loop can never complete
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = self._refresh = asyncio.ensure_future(self._run_refresh())
+        return task
+
+    async def get(self, refresh: bool = False) -> dict:
+        """
+        The cached report. The first call (or refresh=True) waits for a
+        collection; once the report is older than the TTL it is returned as
+        is, marked stale, and a single background refresh is started.
+        """
+        if self._report is None or refresh:
+            # shield: a client disconnecting must not cancel the shared refresh
+            report = await asyncio.shield(self._refresh_task())
+            return {**report, "stale": False, "age_seconds": 0.0}
+
+        age = time.monotonic() - self._refreshed_at
+        stale = age > self.ttl_seconds
+        if stale:
+            # nobody awaits a background refresh; it logs its own failure
+            self._refresh_task().add_done_callback(lambda t: t.cancelled() or t.exception())
+        return {**self._report, "stale": stale, "age_seconds": round(age, 1)}
+
+    def clear(self) -> None:
+        self._report = None
+        self._refreshed_at = 0.0
+
+
+@lru_cache(maxsize=None)
+def get_tenant_stats() -> TenantStats:
+    return TenantStats(
+        ttl_seconds=settings.tenant_stats_ttl_seconds,
+        concurrency=settings.tenant_stats_concurrency,
+    )
+
+
+tenant_stats = Lazy(get_tenant_stats)
@@ -0,0 +1,470 @@
+# backend/app/services/tenants.py
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+
+from pymongo import DeleteOne, ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
+from app.core import db as core_db
+from app.core.config import settings
+from app.core.tenancy import STORAGE_MODES, TenantCollection, is_shared, own_collection_name, tenant_collection
+from app.services.backup import backup_collection_async, copy_collection_async
+from app.services.master_replica import master_replica
+from app.services.refresh_tokens import revoke_orgs
+
+logger = logging.getLogger(__name__)
+
+# Server error codes meaning "renameCollection is not available to us here"
+# (Unauthorized, IllegalOperation, CommandNotFound, CommandNotSupported)
+RENAME_FALLBACK_CODES = {13, 20, 59, 115}
+NAMESPACE_NOT_FOUND = 26
+
+RENAME_STRATEGIES = ("auto", "server", "copy")
+
+
+class RenameFailed(RuntimeError):
+    """Raised when a tenant collection could not be moved to its new name."""
+
+
+async def rename_tenant_collection(old_coll: str, new_coll: str, strategy: Optional[str] = None) -> dict:
+    """
+    Move a tenant collection to a new name. Shared by /org/update and /admin/update-org.
+
+    "server" uses MongoDB's renameCollection (metadata only, O(1)).
+    "copy" is the old path: backup, copy every document, verify counts, drop the source.
+    "auto" tries the server rename and falls back to copying when the deployment
+    does not allow renameCollection.
+
+    Returns {"strategy": ..., "backup": <path or None>, "copied": <docs copied or None>}.
+    """
+    strategy = strategy or settings.org_rename_strategy
+    if strategy not in RENAME_STRATEGIES:
+        raise ValueError(f"Unknown rename strategy: {strategy}")
+
+    db = core_db.db
+    if db is None:
+        raise RuntimeError("Database not initialized")
+
+    if strategy in ("auto", "server"):
+        try:
+            await db[old_coll].rename(new_coll)
+            logger.info("Renamed %s -> %s with renameCollection", old_coll, new_coll)
+            return {"strategy": "server", "backup": None, "copied": None}
+        except OperationFailure as e:
+            if e.code == NAMESPACE_NOT_FOUND:
+                # nothing was ever written to the source; the new name is simply empty
+                return {"strategy": "server", "backup": None, "copied": 0}
+            if strategy == "server" or e.code not in RENAME_FALLBACK_CODES:
+                raise RenameFailed(f"renameCollection failed: {e}") from e
+            logger.warning("renameCollection not allowed (%s), falling back to copy", e.code)
+
+    # no source: never written to, or a retry after an earlier attempt copied
+    # and dropped it (then the count check below would drop the only copy)
+    if not await db.list_collection_names(filter={"name": old_coll}):
+        await core_db.ensure_org_indexes(new_coll, db)
+        return {"strategy": "copy", "backup": None, "copied": 0}
+
+    # Backup old collection first
+    backup_path = await backup_collection_async(old_coll, final=True)
+    logger.info("Backup created before rename: %s", backup_path)
+
+    # Copy docs to new collection
+    stats = await copy_collection_async(old_coll, new_coll)
+    logger.info(
+        "Copied %s docs (%s docs/s, %s MB/s) %s -> %s",
+        stats["count"], stats["docs_per_s"], stats["mb_per_s"], old_coll, new_coll,
+    )
+
+    # verify counts: compare counts in src vs dest
+    src_count = await db[old_coll].count_documents({})
+    dest_count = await db[new_coll].count_documents({})
+    if src_count != dest_count:
+        # attempt cleanup: drop new coll and abort with error
+        logger.error("Copy count mismatch (src=%s dest=%s). Rolling back.", src_count, dest_count)
+        await db[new_coll].drop()
+        raise RenameFailed("Failed to migrate collection (count mismatch). Backup created.")
+
+    # drop old collection only after successful verification
+    await db[old_coll].drop()
+    # renameCollection keeps indexes, a copy does not
+    await core_db.ensure_org_indexes(new_coll, db)
+    return {"strategy": "copy", "backup": backup_path, "copied": stats["count"] + stats["skipped"]}
+
+
+def _invalidate_principals(org_name: str) -> None:
+    # imported here: the routes import this module
+    from app.routes.auth import invalidate_principals
+
+    invalidate_principals(org_name)
+
+
+async def _noop_progress(stage: str, **details) -> None:
+    pass
+
+
+async def _change_tenant_data(org: dict, new_name: Optional[str], new_email: Optional[str], progress=_noop_progress):
+    """
+    Move a tenant's documents for a rename and re-email its admin; returns
+    (master fields to $set, rename result or None). The master document
+    itself is left to the caller.
+    """
+    update_fields = {}
+    rename = None
+    if new_name and org["organization_name"] != new_name:
+        if is_shared(org):
+            # documents are keyed by tenant_id, not by name: nothing to move
+            rename = {"strategy": "shared", "backup": None, "copied": None}
+        else:
+            new_coll = own_collection_name(new_name)
+            await progress("renaming", source=org["collection_name"], target=new_coll)
+            rename = await rename_tenant_collection(org["collection_name"], new_coll)
+            update_fields["collection_name"] = new_coll
+        update_fields["organization_name"] = new_name
+
+    if new_email:
+        await progress("updating_admin_email")
+        await tenant_collection({**org, **update_fields}).update_many(
+            {"email": org.get("admin_email")},
+            {"$set": {"email": new_email, "updated_at": datetime.utcnow()}},
+        )
+        update_fields["admin_email"] = new_email
+    return update_fields, rename
+
+
+async def _undo_tenant_data(org: dict, fields: dict) -> None:
+    """Put back what _change_tenant_data did, for a tenant whose master update failed."""
+    if "admin_email" in fields:
+        await tenant_collection({**org, **fields}).update_many(
+            {"email": fields["admin_email"]},
+            {"$set": {"email": org.get("admin_email"), "updated_at": datetime.utcnow()}},
+        )
+    if "collection_name" in fields:
+        await rename_tenant_collection(fields["collection_name"], org["collection_name"])
+
+
+async def _backup_tenant(ref: dict) -> str:
+    """Final backup of a tenant about to be deleted (only its documents, for the shared collection)."""
+    if is_shared(ref):
+        return await backup_collection_async(
+            ref["collection_name"], final=True, query={"tenant_id": ref["tenant_id"]},
+            name=own_collection_name(ref["organization_name"]),
+        )
+    return await backup_collection_async(ref["collection_name"], final=True)
+
+
+def _ensure_free(org: dict, found: list, new_name: Optional[str], new_email: Optional[str]) -> None:
+    """
+    Raise if a master document other than org (among found, read from the
+    collection itself) holds new_name or new_email. The route checked the
+    replica, which can lag.
+    """
+    for other in found:
+        if other["_id"] == org["_id"]:
+            continue
+        if new_name and other["organization_name"] == new_name:
+            raise RuntimeError("New organization name already exists")
+        if new_email and other.get("admin_email") == new_email:
+            raise RuntimeError("Provided new_admin_email already used by another org")
+
+
+async def update_tenant(params: dict, progress) -> dict:
+    """
+    Job handler for "org.update": rename the tenant collection and/or change
+    the admin email, then update the master document.
+
+    params: {"organization_name", "new_organization_name" (sanitized) or None,
+    "new_admin_email" or None}. Safe to run again after a crash part-way.
+    """
+    db = core_db.db
+    master = db[core_db.MASTER_COLLECTION]
+    old_name = params["organization_name"]
+    new_name = params.get("new_organization_name")
+    new_email = params.get("new_admin_email")
+
+    # an earlier attempt may already have moved the master document to new_name;
+    # the same query finds whoever else holds the new email
+    names = [old_name, new_name] if new_name else [old_name]
+    query = {"organization_name": {"$in": names}}
+    if new_email:
+        query = {"$or": [query, {"admin_email": new_email}]}
+    orgs = await master.find(query).to_list(None)
+    org = next((o for name in names for o in orgs if o["organization_name"] == name), None)
+    if org is None:
+        raise RuntimeError(f"Organization {old_name} not found")
+
+    _ensure_free(org, orgs, new_name, new_email)
+    update_fields, rename = await _change_tenant_data(org, new_name, new_email, progress)
+
+    updated = org
+    if update_fields:
+        await progress("updating_master")
+        try:
+            updated = await master.find_one_and_update(
+                {"_id": org["_id"]}, {"$set": update_fields}, return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # taken after _ensure_free: the admin must keep an email that logs in
+            await _undo_tenant_data(org, update_fields)
+            raise
+        # refresh tokens carry the old name/email in their claims
+        await revoke_orgs([old_name])
+    _invalidate_principals(old_name)
+    master_replica.apply(updated)
+    return {"organization": updated, "rename": rename}
+
+
+async def delete_tenant(params: dict, progress) -> dict:
+    """
+    Job handler for "org.delete": final backup, drop the tenant collection,
+    remove the master document.
+
+    params: tenant_ref() of the master document; for a tenant in the shared
+    collection only its documents are backed up and removed.
+    """
+    db = core_db.db
+    master = db[core_db.MASTER_COLLECTION]
+    org_name = params["organization_name"]
+    coll_name = params["collection_name"]
+
+    await progress("backup", collection=coll_name)
+    backup_path = await _backup_tenant(params)
+    logger.info("Backup created before delete: %s", backup_path)
+
+    await progress("dropping", collection=coll_name)
+    await tenant_collection(params).drop()
+
+    await progress("removing_master")
+    org = await master.find_one_and_delete({"organization_name": org_name})
+    if org is not None:
+        master_replica.remove(org["_id"])
+    await revoke_orgs([org_name])
+    _invalidate_principals(org_name)
+    return {"organization": org_name, "backup": backup_path}
+
+
+async def _bounded(items: list, work, progress) -> list:
+    """
+    Run work(item) for every item, at most ORG_BATCH_CONCURRENCY at a time;
+    returns each outcome (result or exception) in item order.
+    """
+    slots = asyncio.Semaphore(max(settings.org_batch_concurrency, 1))
+    done = failed = 0
+    # about twenty progress writes per batch, not one per tenant
+    report_every = max(len(items) // 20, 1)
+
+    async def run(item):
+        nonlocal done, failed
+        async with slots:
+            try:
+                return await work(item)
+            except Exception as e:
+                failed += 1
+                logger.error("Batch step for %s failed: %s", item.get("organization_name"), e)
+                return e
+            finally:
+                done += 1
+                if done % report_every == 0 or done == len(items):
+                    await progress("tenants", done=done, failed=failed, total=len(items))
+
+    return await asyncio.gather(*(run(item) for item in items))
+
+
+async def update_tenants(params: dict, progress) -> dict:
+    """
+    Job handler for "org.batch_update": update_tenant for many tenants. The
+    collection renames and email changes run concurrently (bounded); the
+    master documents are then updated with one bulk_write. A tenant whose
+    master write is rejected (e.g. a name taken meanwhile) gets its
+    collection and admin email put back and is reported as failed.
+
+    params: {"changes": [update_tenant params, ...]}. Returns one result per
+    change, in order.
+    """
+    db = core_db.db
+    master = db[core_db.MASTER_COLLECTION]
+    changes = params["changes"]
+    names = [c["organization_name"] for c in changes] + [c["new_organization_name"] for c in changes if c.get("new_organization_name")]
+    orgs = {o["organization_name"]: o for o in await master.find({"organization_name": {"$in": names}}).to_list(None)}
+
+    async def change(c):
+        # an earlier attempt may already have moved the master document
+        org = orgs.get(c["organization_name"]) or orgs.get(c.get("new_organization_name"))
+        if org is None:
+            raise RuntimeError(f"Organization {c['organization_name']} not found")
+        fields, rename = await _change_tenant_data(org, c.get("new_organization_name"), c.get("new_admin_email"))
+        return org, fields, rename
+
+    outcomes = await _bounded(changes, change, progress)
+    changed = [(i, o) for i, o in enumerate(outcomes) if not isinstance(o, Exception) and o[1]]
+    if changed:
+        await progress("updating_master", count=len(changed))
+        writes = [UpdateOne({"_id": org["_id"]}, {"$set": fields}) for _, (org, fields, _) in changed]
+        rejected = []
+        try:
+            await master.bulk_write(writes, ordered=False)
+        except BulkWriteError as e:
+            # any other error fails the job; its retry finishes the tenants off
+            rejected = e.details.get("writeErrors", [])
+        for err in rejected:
+            i, (org, fields, _) = changed[err["index"]]
+            logger.error("Master update of %s failed, rolling back: %s", org["organization_name"], err.get("errmsg"))
+            try:
+                await _undo_tenant_data(org, fields)
+                outcomes[i] = RuntimeError(f"Master update failed: {err.get('errmsg')}")
+            except Exception as undo_error:
+                logger.exception("Could not roll back tenant data of %s", org["organization_name"])
+                outcomes[i] = RuntimeError(f"Master update failed and rollback failed: {undo_error}")
+        rejected_at = {changed[err["index"]][0] for err in rejected}
+        await revoke_orgs([org["organization_name"] for i, (org, _, _) in changed if i not in rejected_at])
+
+    succeeded = [o for o in outcomes if not isinstance(o, Exception)]
+    ids = [org["_id"] for org, _, _ in succeeded]
+    updated = {o["_id"]: o for o in await master.find({"_id": {"$in": ids}}).to_list(None)}
+    results = []
+    for c, outcome in zip(changes, outcomes):
+        _invalidate_principals(c["organization_name"])
+        if isinstance(outcome, Exception):
+            results.append({"organization_name": c["organization_name"], "ok": False, "error": str(outcome) or type(outcome).__name__})
+            continue
+        org, _, rename = outcome
+        doc = updated.get(org["_id"])
+        if doc is not None:
+            master_replica.apply(doc)
+        results.append({"organization_name": c["organization_name"], "ok": True, "organization": doc, "rename": rename})
+    return {"updated": sum(r["ok"] for r in results), "failed": sum(not r["ok"] for r in results), "results": results}
+
+
+async def delete_tenants(params: dict, progress) -> dict:
+    """
+    Job handler for "org.batch_delete": delete_tenant for many tenants. Final
+    backups and drops run concurrently (bounded); the master documents of the
+    tenants that were dropped are removed with one bulk_write.
+
+    params: {"tenants": [tenant_ref, ...]}. Returns one result per tenant, in order.
+    """
+    db = core_db.db
+    master = db[core_db.MASTER_COLLECTION]
+    refs = params["tenants"]
+
+    async def delete(ref):
+        backup_path = await _backup_tenant(ref)
+        logger.info("Backup created before delete: %s", backup_path)
+        await tenant_collection(ref).drop()
+        return backup_path
+
+    outcomes = await _bounded(refs, delete, progress)
+    dropped = [ref["organization_name"] for ref, o in zip(refs, outcomes) if not isinstance(o, Exception)]
+    orgs = await master.find({"organization_name": {"$in": dropped}}, {"_id": 1}).to_list(None)
+    if orgs:
+        await progress("removing_master", count=len(orgs))
+        await master.bulk_write([DeleteOne({"_id": o["_id"]}) for o in orgs], ordered=False)
+    for o in orgs:
+        master_replica.remove(o["_id"])
+    await revoke_orgs(dropped)
+
+    results = []
+    for ref, outcome in zip(refs, outcomes):
+        _invalidate_principals(ref["organization_name"])
+        if isinstance(outcome, Exception):
+            results.append({"organization_name": ref["organization_name"], "ok": False, "error": str(outcome) or type(outcome).__name__})
+        else:
+            results.append({"organization_name": ref["organization_name"], "ok": True, "backup": outcome})
+    return {"deleted": sum(r["ok"] for r in results), "failed": sum(not r["ok"] for r in results), "results": results}
+
+
+MIGRATE_BATCH_SIZE = 500
+
+
+async def _copy_documents(source, dest, transform) -> int:
+    """Upsert every document of source into dest by _id, so a rerun overwrites instead of duplicating."""
+    copied, batch = 0, []
+    async for doc in source.find({}):
+        doc = transform(doc)
+        batch.append(ReplaceOne({"_id": doc["_id"]}, doc, upsert=True))
+        if len(batch) >= MIGRATE_BATCH_SIZE:
+            await dest.bulk_write(batch, ordered=False)
+            copied, batch = copied + len(batch), []
+    if batch:
+        await dest.bulk_write(batch, ordered=False)
+        copied += len(batch)
+    return copied
+
+
+async def migrate_tenant(params: dict, progress) -> dict:
+    """
+    Job handler for "org.migrate_storage": move a tenant's documents between its
+    own org_<name> collection and the shared collection.
+
+    params: {"organization_name", "to": "shared" or "collection"}. Copy, verify
+    the count, point the master document at the new place, then remove the
+    old copy. The tenant_id is the master _id and copies are upserts, so a
+    rerun after a crash finishes the job instead of duplicating documents.
+    """
+    to = params["to"]
+    if to not in STORAGE_MODES:
+        raise ValueError(f"Unknown tenant storage mode: {to}")
+    db = core_db.db
+    master = db[core_db.MASTER_COLLECTION]
+    org_name = params["organization_name"]
+    org = await master.find_one({"organization_name": org_name})
+    if org is None:
+        raise RuntimeError(f"Organization {org_name} not found")
+
+    shared = db[core_db.SHARED_TENANT_COLLECTION]
+    tenant_id = org["_id"]
+    copied = 0
+    if to == "shared" and not is_shared(org):
+        source, dest = db[org["collection_name"]], shared
+        leftover = source
+
+        def transform(doc):
+            doc["tenant_id"] = tenant_id
+            return doc
+
+        update = {"$set": {"collection_name": core_db.SHARED_TENANT_COLLECTION, "tenant_id": tenant_id}}
+    elif to == "collection" and is_shared(org):
+        source, dest = TenantCollection(shared, tenant_id), db[own_collection_name(org_name)]
+        leftover = source
+
+        def transform(doc):
+            doc.pop("tenant_id", None)
+            return doc
+
+        update = {"$set": {"collection_name": own_collection_name(org_name)}, "$unset": {"tenant_id": ""}}
+    else:
+        # already there; an earlier attempt may have stopped before removing the old copy
+        source = update = None
+        leftover = db[own_collection_name(org_name)] if to == "shared" else TenantCollection(shared, tenant_id)
+
+    if source is not None:
+        await progress("copying", source=source.name, target=dest.name)
+        copied = await _copy_documents(source, dest, transform)
+
+        await progress("verifying", copied=copied)
+        src_count = await source.count_documents({})
+        dest_count = await (TenantCollection(dest, tenant_id) if to == "shared" else dest).count_documents({})
+        if src_count != dest_count:
+            raise RuntimeError(f"Copy count mismatch for {org_name} (src={src_count} dest={dest_count})")
+        if to == "collection":
+            await core_db.ensure_org_indexes(dest.name, db)
+
+        await progress("updating_master")
+        updated = await master.find_one_and_update({"_id": org["_id"]}, update, return_document=ReturnDocument.AFTER)
+        _invalidate_principals(org_name)
+        master_replica.apply(updated)
+
+    await progress("removing_old_copy", collection=leftover.name)
+    await leftover.drop()
+    return {"organization": org_name, "storage": to, "copied": copied}
+
+
+def register_jobs(queue) -> None:
+    """Register the tenant job handlers; called when the job queue is first built."""
+    queue.register("org.update", update_tenant, concurrency=settings.job_update_concurrency)
+    queue.register("org.delete", delete_tenant, concurrency=settings.job_delete_concurrency)
+    queue.register("org.migrate_storage", migrate_tenant, concurrency=1)
+    # each batch job already runs ORG_BATCH_CONCURRENCY tenants at once
+    queue.register("org.batch_update", update_tenants, concurrency=1)
+    queue.register("org.batch_delete", delete_tenants, concurrency=1)
@@ -0,0 +1,76 @@
+# backend/benchmarks/bench_bulk_create.py
+"""
+Provisioning throughput: N orgs through POST /org/create one at a time (the
+old onboarding loop) versus one POST /org/bulk-create call.
+
+bcrypt dominates both paths. Its cost is the same per org, so bulk-create
+can only win on bcrypt by hashing on several cores at once (--workers, at
+most one per core) and on the database by batching round trips
+(--latency-ms simulates the server round trip). The speed-up is therefore
+capped at roughly
+
+    (bcrypt + 4 round trips) / (bcrypt / min(workers, cores) + ~1 round trip)
+
+per org: about min(workers, cores)x on a fast network, more as latency grows.
+
+    python -m benchmarks.bench_bulk_create --orgs 64 --workers 4 --latency-ms 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from benchmarks.common import install_mock_db
+
+
+async def _run(orgs: int, workers: int, executor: str, latency_ms: float) -> dict:
+    import httpx
+    from app.main import app
+    from app.core.limiter import limiter
+    from app.services.passwords import password_hasher
+    from testsupport.auth import superadmin_headers
+
+    limiter.enabled = False
+    password_hasher.shutdown()
+    password_hasher.workers = workers
+    password_hasher.executor_kind = executor
+    result = {"orgs": orgs, "workers": workers, "executor": executor, "latency_ms": latency_ms, "cores": os.cpu_count()}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for mode in ("single", "bulk"):
+            install_mock_db(f"bulkbench_{mode}", latency=latency_ms / 1000.0)
+            items = [
+                {"organization_name": f"{mode}{i}", "admin_email": f"admin{i}@{mode}.io", "admin_password": "BenchPass123!"}
+                for i in range(orgs)
+            ]
+            start = time.perf_counter()
+            if mode == "single":
+                for item in items:
+                    assert (await client.post("/org/create", json=item)).status_code == 200
+            else:
+                resp = await client.post("/org/bulk-create", json={"organizations": items}, headers=superadmin_headers())
+                assert resp.json()["created"] == orgs, resp.text
+            seconds = time.perf_counter() - start
+            result[f"{mode}_orgs_per_s"] = round(orgs / seconds, 1)
+
+    password_hasher.shutdown()
+    result["speedup"] = round(result["bulk_orgs_per_s"] / result["single_orgs_per_s"], 2)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orgs", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--executor", choices=("thread", "process"), default="thread")
+    parser.add_argument("--latency-ms", type=float, nargs="+", default=[0.0, 2.0])
+    args = parser.parse_args()
+
+    for latency_ms in args.latency_ms:
+        print(json.dumps(asyncio.run(_run(args.orgs, args.workers, args.executor, latency_ms))))
+
+
+if __name__ == "__main__":
+    main()
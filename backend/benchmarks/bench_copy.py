@@ -0,0 +1,95 @@
+# backend/benchmarks/bench_copy.py
+"""
+Compare the legacy one-batch-at-a-time copier with the pipelined raw-BSON
+copy_collection_async. Needs a real MongoDB (pipelining is about overlapping
+network round trips, which an in-memory stand-in cannot show):
+
+    MONGODB_URI=mongodb://localhost:27017 python -m benchmarks.bench_copy --sizes 10000 100000 1000000
+
+Collections are created in a scratch database and dropped afterwards.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from benchmarks import common  # noqa: F401  (sets env defaults / sys.path)
+
+
+async def legacy_copy(db, src_coll_name: str, dest_coll_name: str) -> int:
+    # the pre-pipelining implementation, kept here for comparison
+    src = db[src_coll_name]
+    dest = db[dest_coll_name]
+    count = 0
+    batch = []
+    async for doc in src.find({}):
+        doc.pop("_id", None)
+        batch.append(doc)
+        if len(batch) >= 500:
+            res = await dest.insert_many(batch)
+            count += len(res.inserted_ids)
+            batch = []
+    if batch:
+        res = await dest.insert_many(batch)
+        count += len(res.inserted_ids)
+    return count
+
+
+async def seed(coll, size: int, doc_bytes: int):
+    pad = "x" * doc_bytes
+    batch = []
+    for i in range(size):
+        batch.append({"email": f"user{i}@bench.io", "n": i, "pad": pad, "tags": ["a", "b", "c"]})
+        if len(batch) == 10_000:
+            await coll.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await coll.insert_many(batch, ordered=False)
+
+
+async def run(uri: str, sizes, doc_bytes: int, batch_size: int, in_flight: int):
+    import motor.motor_asyncio
+    from app.services.backup import copy_collection_async
+
+    client = motor.motor_asyncio.AsyncIOMotorClient(uri)
+    db = client["bench_copy"]
+    try:
+        for size in sizes:
+            await db.drop_collection("src")
+            await seed(db["src"], size, doc_bytes)
+
+            await db.drop_collection("dest_legacy")
+            start = time.perf_counter()
+            copied = await legacy_copy(db, "src", "dest_legacy")
+            legacy_s = time.perf_counter() - start
+
+            await db.drop_collection("dest_pipelined")
+            stats = await copy_collection_async(
+                "src", "dest_pipelined", batch_size=batch_size, max_in_flight=in_flight, db=db
+            )
+
+            print(json.dumps({
+                "docs": size,
+                "legacy": {"count": copied, "seconds": round(legacy_s, 3), "docs_per_s": round(copied / legacy_s, 1)},
+                "pipelined": stats,
+                "speedup": round(legacy_s / stats["seconds"], 2) if stats["seconds"] else None,
+            }))
+    finally:
+        await client.drop_database("bench_copy")
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default=os.environ.get("MONGODB_URI"))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--doc-bytes", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--in-flight", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run(args.uri, args.sizes, args.doc_bytes, args.batch_size, args.in_flight))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# backend/benchmarks/bench_limiter.py
+"""
+Per-request overhead of a rate-limit check for each storage backend.
+
+    python -m benchmarks.bench_limiter --n 20000
+
+redis-compat is measured against an in-process stand-in client, so it shows
+client-side cost only; add a real server with --redis-url to include the
+network round trips.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks import common  # noqa: F401  (sets env defaults / sys.path)
+
+
+def _bench(limiter, item, n: int) -> dict:
+    keys = [f"10.0.{i // 256}.{i % 256}" for i in range(256)]
+    samples = []
+    for i in range(n):
+        start = time.perf_counter()
+        limiter.hit(item, "admin_login", keys[i % len(keys)])
+        samples.append(time.perf_counter() - start)
+    us = sorted(s * 1e6 for s in samples)
+    return {
+        "mean_us": round(sum(us) / len(us), 2),
+        "p50_us": round(us[len(us) // 2], 2),
+        "p99_us": round(us[int(len(us) * 0.99) - 1], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=20_000)
+    parser.add_argument("--redis-url", help="e.g. redis-compat://localhost:6379/0")
+    args = parser.parse_args()
+
+    from limits import parse
+    from limits.storage import storage_from_string
+    from limits.strategies import FixedWindowRateLimiter, MovingWindowRateLimiter
+    from app.core import rate_limit_storage  # noqa: F401  registers schemes
+    from testsupport.fake_redis import FakeRedis
+
+    item = parse("1000000/minute")  # never actually limit, measure the check itself
+    tmp = tempfile.mkdtemp()
+    backends = [
+        ("memory fixed-window", FixedWindowRateLimiter, "memory://", {}),
+        ("memory moving-window", MovingWindowRateLimiter, "memory://", {}),
+        ("sqlite fixed-window", FixedWindowRateLimiter, f"sqlite:///{os.path.join(tmp, 'f.db')}", {}),
+        ("sqlite moving-window", MovingWindowRateLimiter, f"sqlite:///{os.path.join(tmp, 'm.db')}", {}),
+        ("redis-compat (stand-in)", FixedWindowRateLimiter, "redis-compat://localhost/0", {"client": FakeRedis()}),
+    ]
+    if args.redis_url:
+        backends.append(("redis-compat (server)", FixedWindowRateLimiter, args.redis_url, {}))
+
+    for name, strategy, uri, options in backends:
+        limiter = strategy(storage_from_string(uri, **options))
+        print(json.dumps({"backend": name, **_bench(limiter, item, args.n)}))
+
+
+if __name__ == "__main__":
+    main()
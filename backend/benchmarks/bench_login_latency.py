@@ -0,0 +1,90 @@
+# backend/benchmarks/bench_login_latency.py
+"""
+p99 latency of /health and /org/get while bcrypt logins run concurrently.
+
+Compares hashing inline on the event loop (workers=0, the old behaviour)
+with the bounded worker pool from app.services.passwords.
+
+    python -m benchmarks.bench_login_latency --duration 5 --login-concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import install_mock_db, summarize
+
+
+async def _run_mode(workers: int, duration: float, login_concurrency: int) -> dict:
+    import httpx
+    from app.main import app
+    from app.core.limiter import limiter
+    from app.services.passwords import password_hasher
+
+    install_mock_db()
+    limiter.enabled = False
+    password_hasher.shutdown()
+    password_hasher.workers = workers
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        creds = {"email": "bench@example.com", "password": "BenchPass123!"}
+        await client.post("/org/create", json={
+            "organization_name": "benchorg",
+            "admin_email": creds["email"],
+            "admin_password": creds["password"],
+        })
+        token = (await client.post("/admin/login", json=creds)).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        deadline = time.perf_counter() + duration
+        logins = 0
+
+        async def login_loop():
+            nonlocal logins
+            while time.perf_counter() < deadline:
+                resp = await client.post("/admin/login", json=creds)
+                if resp.status_code == 200:
+                    logins += 1
+
+        async def probe(path, samples, **kwargs):
+            # always take at least one sample: with inline hashing the loop may
+            # not get back to the probes until the deadline has already passed
+            while True:
+                start = time.perf_counter()
+                await client.get(path, **kwargs)
+                samples.append(time.perf_counter() - start)
+                if time.perf_counter() >= deadline:
+                    break
+                await asyncio.sleep(0.005)
+
+        health, org_get = [], []
+        await asyncio.gather(
+            probe("/health", health),
+            probe("/org/get", org_get, headers=headers),
+            *(login_loop() for _ in range(login_concurrency)),
+        )
+
+    password_hasher.shutdown()
+    return {
+        "mode": "inline" if workers <= 0 else f"pool({workers})",
+        "logins_per_s": round(logins / duration, 1),
+        "health": summarize(health),
+        "org_get": summarize(org_get),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--login-concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    for workers in (0, args.workers):
+        result = asyncio.run(_run_mode(workers, args.duration, args.login_concurrency))
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
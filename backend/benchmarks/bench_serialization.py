@@ -0,0 +1,87 @@
+# backend/benchmarks/bench_serialization.py
+"""
+Cost of turning a page of master documents into a response body.
+
+  before      _id/admin_id str() loop + jsonable_encoder + stdlib JSONResponse
+              (the old get_master_list path)
+  stdlib      BSONJSONResponse without orjson (json.dumps with a BSON default)
+  after       BSONJSONResponse with orjson, documents passed through as-is
+
+    python -m benchmarks.bench_serialization --orgs 10000 --rounds 20
+"""
+import argparse
+import datetime
+import json
+import time
+
+from benchmarks import common  # noqa: F401  (sets env defaults / sys.path)
+
+
+def _master_docs(n: int) -> list:
+    from bson import ObjectId
+
+    now = datetime.datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "organization_name": f"tenant{i:05d}",
+            "collection_name": f"org_tenant{i:05d}",
+            "admin_id": ObjectId(),
+            "admin_email": f"admin@tenant{i:05d}.example.com",
+            "created_at": now,
+        }
+        for i in range(n)
+    ]
+
+
+def _old_path(docs: list) -> bytes:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    page = []
+    for org in docs:
+        org = dict(org)  # Motor hands out fresh dicts on every request
+        org["_id"] = str(org["_id"])
+        org["admin_id"] = str(org["admin_id"])
+        page.append(org)
+    return JSONResponse(jsonable_encoder({"data": page, "next_cursor": None})).body
+
+
+def _time(fn, docs: list, rounds: int) -> dict:
+    body = fn(docs)  # warm-up
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn(docs)
+        samples.append(time.perf_counter() - start)
+    return {"bytes": len(body), **common.summarize(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orgs", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    from app.core import responses
+
+    docs = _master_docs(args.orgs)
+
+    def stdlib(d):
+        return json.dumps(
+            {"data": d, "next_cursor": None}, default=responses._default,
+            ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+        ).encode("utf-8")
+
+    results = {"orgs": args.orgs, "before": _time(_old_path, docs, args.rounds), "stdlib": _time(stdlib, docs, args.rounds)}
+    if responses.orjson is not None:
+        results["after"] = _time(
+            lambda d: responses.BSONJSONResponse({"data": d, "next_cursor": None}).body, docs, args.rounds
+        )
+    else:
+        results["after"] = "orjson not installed"
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# backend/benchmarks/bench_tenant_storage.py
+"""
+Per-collection vs shared-collection tenant storage at scale, against the
+in-memory Motor stand-in:
+
+  footprint    collections and indexes on the server (each is a WiredTiger
+               file with its own cache and handle overhead)
+  startup      ensure_indexes() at process start: time and round trips
+  rename       round trips of the org.update job for a tenant rename
+  lookup       round trips of the login-path admin lookup
+
+    python -m benchmarks.bench_tenant_storage --tenants 10000 --renames 200
+
+mongomock scans collections without using indexes, so per-operation times
+against the shared collection would measure the stand-in, not MongoDB; only
+round trips are reported for rename and lookup.
+
+The request paths under load are covered by
+`python -m benchmarks.run_suite --storage shared` (and the default collection mode).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import install_mock_db
+
+
+async def _bench_mode(storage: str, args) -> dict:
+    from app.core import db as core_db
+    from app.core.config import settings
+    from app.core.tenancy import tenant_collection
+    from app.services import tenants
+    from benchmarks.run_suite import _seed
+
+    db = install_mock_db(latency=args.latency_ms / 1000.0)
+    settings.tenant_storage = storage
+    rng = random.Random(args.seed)
+    masters = _seed(db, args.tenants, args.docs_per_tenant, rng, storage)
+
+    db.reset_commands()
+    start = time.perf_counter()
+    await core_db.ensure_indexes()
+    startup = {"seconds": round(time.perf_counter() - start, 3), "round_trips": db.command_count}
+
+    raw = db._db
+    names = raw.list_collection_names()
+    footprint = {
+        "collections": len(names),
+        "indexes": sum(len(raw[n].index_information()) for n in names),
+    }
+
+    picks = rng.sample(masters, min(args.renames, len(masters)))
+    db.reset_commands()
+    for m in picks:
+        await tenant_collection(m).find_one({"email": m["admin_email"]})
+    lookup = {"round_trips_per_op": round(db.command_count / len(picks), 2), "commands": dict(db.commands)}
+
+    async def progress(stage, **details):
+        pass
+
+    db.reset_commands()
+    for m in picks:
+        await tenants.update_tenant(
+            {"organization_name": m["organization_name"], "new_organization_name": m["organization_name"] + "x"},
+            progress,
+        )
+    rename = {"round_trips_per_op": round(db.command_count / len(picks), 2), "commands": dict(db.commands)}
+    return {"footprint": footprint, "startup": startup, "lookup": lookup, "rename": rename}
+
+
+async def run(args) -> dict:
+    results = {}
+    for storage in args.modes:
+        results[storage] = await _bench_mode(storage, args)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=10_000)
+    parser.add_argument("--docs-per-tenant", type=int, default=5)
+    parser.add_argument("--renames", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated round trip per MongoDB command (affects startup)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--modes", nargs="+", choices=["collection", "shared"], default=["collection", "shared"])
+    args = parser.parse_args()
+
+    # a copy-based rename writes backups under ./backups; keep them out of the tree
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            results = asyncio.run(run(args))
+        finally:
+            os.chdir(cwd)
+    print(json.dumps({"config": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
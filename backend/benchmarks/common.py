@@ -0,0 +1,47 @@
+# backend/benchmarks/common.py
+"""
+Shared helpers for the offline benchmarks. Run them from the backend folder, e.g.
+
+    python -m benchmarks.bench_login_latency
+"""
+import os
+import statistics
+import sys
+
+BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+# Settings() needs these at import time; benchmarks never talk to a real server
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_NAME", "benchdb")
+os.environ.setdefault("JWT_SECRET", "benchsecret")
+
+
+def install_mock_db(name: str = "benchdb", latency: float = 0.0):
+    """Point app.core.db at a fresh in-memory database (see testsupport.mongo_async_mock)."""
+    from app.core import db as core_db
+    from testsupport.mongo_async_mock import AsyncMockDB
+
+    core_db.db = AsyncMockDB.create(name, latency=latency)
+    return core_db.db
+
+
+def percentile(samples, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def summarize(samples) -> dict:
+    """Latency summary in milliseconds for a list of durations in seconds."""
+    ms = [s * 1000 for s in samples]
+    return {
+        "n": len(ms),
+        "p50_ms": round(percentile(ms, 50), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+        "max_ms": round(max(ms), 2) if ms else 0.0,
+        "mean_ms": round(statistics.fmean(ms), 2) if ms else 0.0,
+    }
@@ -0,0 +1,297 @@
+# backend/benchmarks/run_suite.py
+"""
+End-to-end load suite against the in-memory Motor stand-in.
+
+Seeds --tenants organizations with --docs-per-tenant documents each, then
+drives every scenario through the ASGI app and reports req/s and latency
+percentiles per scenario:
+
+  login        POST /admin/login (bcrypt verify on the hashing pool)
+  org_get      GET  /org/get with a valid token
+  master_list  GET  /admin/master-list, walking every page
+  create       POST /org/create
+  rename       PUT  /org/update (each tenant is renamed once)
+  delete       DELETE /org/delete (final backup + drop, each tenant once)
+
+rename and delete run as background jobs; their latency is measured until
+GET /jobs/{id} reports the job finished. --storage shared seeds (and creates)
+every tenant in the shared collection instead of its own org_<name> one.
+
+    python -m benchmarks.run_suite --tenants 200 --docs-per-tenant 500 --out before.json
+    python -m benchmarks.run_suite --tenants 200 --docs-per-tenant 500 --compare before.json
+    python -m benchmarks.run_suite --tenants 10000 --docs-per-tenant 10 --storage shared
+
+Data, request order and tokens are derived from --seed, and the output
+records the git commit and settings, so two runs with the same arguments on
+different commits are directly comparable. --latency-ms adds a simulated
+server round trip to every MongoDB command.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import BACKEND_ROOT, install_mock_db, summarize
+
+SCENARIOS = ("login", "org_get", "master_list", "create", "rename", "delete")
+PASSWORD = "BenchPass123!"
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _seed(db, tenants: int, docs_per_tenant: int, rng: random.Random, storage: str = "collection") -> list:
+    """Insert tenants straight into the in-memory store; returns their master docs."""
+    from bson import ObjectId
+    from app.core.tenancy import storage_fields
+    from app.services.passwords import _hash
+
+    raw = db._db
+    password_hash = _hash(PASSWORD)  # one bcrypt hash shared by every seeded admin
+    now = datetime.datetime.utcnow()
+    masters = []
+    for i in range(tenants):
+        name = f"tenant{i:05d}"
+        admin_id, master_id = ObjectId(), ObjectId()
+        master = {
+            "_id": master_id,
+            "organization_name": name,
+            **storage_fields(name, master_id, storage),
+            "admin_id": admin_id,
+            "admin_email": f"admin@{name}.example.com",
+            "created_at": now,
+        }
+        masters.append(master)
+        docs = [{"_id": admin_id, "email": master["admin_email"], "password_hash": password_hash, "created_at": now}]
+        docs += [
+            {"email": f"user{j}@{name}.example.com", "n": j, "note": "x" * rng.randint(16, 256), "created_at": now}
+            for j in range(docs_per_tenant - 1)
+        ]
+        if "tenant_id" in master:
+            for d in docs:
+                d["tenant_id"] = master_id
+        raw[master["collection_name"]].insert_many(docs)
+    raw["master_organizations"].insert_many(masters)
+    return masters
+
+
+def _admin_headers(master: dict) -> dict:
+    from app.core.auth import create_access_token
+
+    token = create_access_token(subject=str(master["admin_id"]), data={
+        "admin_id": str(master["admin_id"]),
+        "organization_name": master["organization_name"],
+        "admin_email": master["admin_email"],
+        "role": "org_admin",
+    })
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def _drive(make_request, n: int, concurrency: int) -> dict:
+    """Issue n requests from `concurrency` workers; make_request(i) returns a response."""
+    samples, errors = [], 0
+    counter = iter(range(n))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            resp = await make_request(i)
+            samples.append(time.perf_counter() - start)
+            if resp.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    return {"req_per_s": round(len(samples) / wall, 1) if wall else 0.0, "errors": errors, **summarize(samples)}
+
+
+async def run(args) -> dict:
+    import httpx
+    from app.main import app
+    from app.core import db as core_db
+    from app.core.auth import create_access_token
+    from app.core.config import settings
+    from app.core.limiter import limiter
+    from app.services.jobs import job_queue
+    from app.services.passwords import password_hasher
+
+    rng = random.Random(args.seed)
+    db = install_mock_db(latency=args.latency_ms / 1000.0)
+    settings.tenant_storage = args.storage
+    await core_db.ensure_indexes()
+    limiter.enabled = False
+    job_queue.poll_seconds = 0.05
+    job_queue.start()
+
+    seed_start = time.perf_counter()
+    masters = _seed(db, args.tenants, args.docs_per_tenant, rng, args.storage)
+    seed_seconds = time.perf_counter() - seed_start
+
+    # rename and delete consume tenants, so they get disjoint halves
+    order = list(range(len(masters)))
+    rng.shuffle(order)
+    half = len(order) // 2
+    rename_pool, delete_pool = order[:half], order[half:]
+    headers = [_admin_headers(m) for m in masters]
+    super_headers = {"Authorization": "Bearer " + create_access_token(
+        subject="bench", data={"role": "superadmin", "username": "bench"},
+    )}
+    picks = [rng.randrange(len(masters)) for _ in range(args.requests)]
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def login(i):
+            m = masters[picks[i]]
+            return await client.post("/admin/login", json={"email": m["admin_email"], "password": PASSWORD})
+
+        async def org_get(i):
+            return await client.get("/org/get", headers=headers[picks[i]])
+
+        async def master_list(i):
+            cursor = None
+            while True:
+                params = {"limit": args.page_size}
+                if cursor:
+                    params["cursor"] = cursor
+                resp = await client.get("/admin/master-list", params=params, headers=super_headers)
+                cursor = resp.json().get("next_cursor") if resp.status_code == 200 else None
+                if not cursor:
+                    return resp
+
+        async def create(i):
+            return await client.post("/org/create", json={
+                "organization_name": f"bench new {i}",
+                "admin_email": f"admin{i}@new.example.com",
+                "admin_password": PASSWORD,
+            })
+
+        async def until_done(resp, job_headers):
+            if resp.status_code != 202:
+                return resp
+            while True:
+                job = await client.get(resp.headers["location"], headers=job_headers)
+                if job.status_code != 200 or job.json()["status"] == "succeeded":
+                    return job
+                if job.json()["status"] == "failed":
+                    return httpx.Response(500)  # counted as an error
+                await asyncio.sleep(0.002)
+
+        async def rename(i):
+            idx = rename_pool[i]
+            new_name = masters[idx]["organization_name"] + "renamed"
+            resp = await client.put("/org/update", json={"new_organization_name": new_name}, headers=headers[idx])
+            return await until_done(resp, headers[idx])
+
+        async def delete(i):
+            idx = delete_pool[i]
+            return await until_done(await client.delete("/org/delete", headers=headers[idx]), headers[idx])
+
+        plans = {
+            "login": (login, args.requests),
+            "org_get": (org_get, args.requests),
+            "master_list": (master_list, max(1, args.requests // 20)),
+            "create": (create, args.requests),
+            "rename": (rename, min(args.requests, len(rename_pool))),
+            "delete": (delete, min(args.requests, len(delete_pool))),
+        }
+        for name in SCENARIOS:
+            if name not in args.scenarios:
+                continue
+            fn, n = plans[name]
+            if n == 0:
+                continue
+            db.reset_commands()
+            result = await _drive(fn, n, args.concurrency)
+            result["mongo_commands_per_req"] = round(db.command_count / n, 2)
+            results[name] = result
+
+    await job_queue.stop()
+    password_hasher.shutdown()
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "started_at": datetime.datetime.utcnow().isoformat() + "Z",
+            "seed_seconds": round(seed_seconds, 2),
+            "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict) -> dict:
+    """Per-scenario change in req/s and p99 relative to a previous run (percent)."""
+    def workload(report):
+        config = dict(report["meta"].get("config") or {})
+        config.pop("scenarios", None)
+        return config
+
+    if workload(baseline) != workload(current):
+        print("warning: baseline was run with different arguments; numbers are not comparable", file=sys.stderr)
+    deltas = {}
+    for name, now in current["results"].items():
+        then = baseline["results"].get(name)
+        if not then:
+            continue
+
+        def pct(key):
+            return round((now[key] - then[key]) / then[key] * 100, 1) if then[key] else None
+
+        deltas[name] = {"req_per_s_pct": pct("req_per_s"), "p50_ms_pct": pct("p50_ms"), "p99_ms_pct": pct("p99_ms")}
+    return {"baseline_commit": baseline["meta"].get("commit"), "deltas": deltas}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=100)
+    parser.add_argument("--docs-per-tenant", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--page-size", type=int, default=100, help="master-list page size")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated round trip per MongoDB command")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--storage", choices=["collection", "shared"], default="collection", help="tenant storage mode")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--out", help="write the JSON report here as well")
+    parser.add_argument("--compare", help="previous JSON report to diff against")
+    args = parser.parse_args()
+
+    # delete writes final backups under ./backups; keep them out of the tree
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            report = asyncio.run(run(args))
+        finally:
+            os.chdir(cwd)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            report["comparison"] = compare(report, json.load(f))
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,55 @@
 # backup_collection.py
-import os, json, asyncio
-import datetime
-import motor.motor_asyncio
+import argparse
+import asyncio
+import json
 from app.core.config import settings
+from app.services.backup import backup_collection_async
+from app.services.backup_store import store_for
+
+async def backup_collections(coll_names, out_dir=None, incremental=False, all_orgs=False):
+    import motor.motor_asyncio
 
-async def backup_collection(coll_name, out_dir="backups"):
     client = motor.motor_asyncio.AsyncIOMotorClient(settings.mongodb_uri)
-    db = client[settings.mongodb_name]
-    coll = db[coll_name]
-    docs = []
-    async for d in coll.find({}):
-        d["_id"] = str(d["_id"])
-        docs.append(d)
-    client.close()
+    try:
+        db = client[settings.mongodb_name]
+        if all_orgs:
+            coll_names = await db.list_collection_names(filter={"name": {"$regex": "^org_"}})
+        for coll_name in coll_names:
+            out_file = await backup_collection_async(coll_name, out_dir, db=db, incremental=incremental)
+            print("Backed up", coll_name, "->", out_file)
+    finally:
+        client.close()
 
-    os.makedirs(out_dir, exist_ok=True)
-    ts = datetime.datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-    out_file = os.path.join(out_dir, f"{coll_name}_backup_{ts}.json")
-    with open(out_file, "w", encoding="utf-8") as f:
-        json.dump(docs, f, default=str, indent=2)
-    print("Backed up", coll_name, "->", out_file)
+async def manage_store(args):
+    store = store_for(args.out_dir)
+    if args.rebuild_index:
+        print("Indexed", await store.rebuild_index(), "backups from manifests")
+    if args.evict:
+        print(json.dumps(await store.evict(args.keep_last, args.max_age_days, args.max_bytes)))
+    if args.list is not None:
+        for row in await store.list(args.list or None):
+            print(f"{row['created_at']}  {row['collection']:<30} {row['kind']:<11} {row['count']:>8} docs  {store.path(row['file'])}")
+        print(json.dumps(await store.stats()))
 
 if __name__ == "__main__":
-    import sys
-    if len(sys.argv) < 2:
-        print("Usage: python backup_collection.py <collection_name>")
-        sys.exit(1)
-    asyncio.run(backup_collection(sys.argv[1]))
+    parser = argparse.ArgumentParser(description="Back up collections as gzip NDJSON, list backups, apply retention")
+    parser.add_argument("collections", nargs="*", help="collection names")
+    parser.add_argument("--all", action="store_true", help="back up every org_* collection")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only documents changed since the last backup in --out-dir")
+    parser.add_argument("--out-dir", default=None, help="backup directory (default: BACKUP_DIR)")
+    parser.add_argument("--list", nargs="?", const="", metavar="COLLECTION",
+                        help="list indexed backups, newest first (of COLLECTION only, if given)")
+    parser.add_argument("--evict", action="store_true", help="apply the retention policy now")
+    parser.add_argument("--keep-last", type=int, default=None, help="backup sets kept per collection (default: BACKUP_KEEP_LAST)")
+    parser.add_argument("--max-age-days", type=float, default=None, help="default: BACKUP_MAX_AGE_DAYS")
+    parser.add_argument("--max-bytes", type=int, default=None, help="default: BACKUP_MAX_BYTES")
+    parser.add_argument("--rebuild-index", action="store_true", help="re-create the backup index from the manifests")
+    args = parser.parse_args()
+    managing = args.evict or args.rebuild_index or args.list is not None
+    if not args.collections and not args.all and not managing:
+        parser.error("give collection names, --all, --list, --evict or --rebuild-index")
+    if args.collections or args.all:
+        asyncio.run(backup_collections(args.collections, args.out_dir, args.incremental, args.all))
+    if managing:
+        asyncio.run(manage_store(args))
@@ -0,0 +1,75 @@
+# migrate_tenant_storage.py
+"""
+Move tenants between their own org_<name> collections and the shared
+collection, in either direction:
+
+    python -m scripts.migrate_tenant_storage --to shared --all
+    python -m scripts.migrate_tenant_storage --to collection acme globex
+
+Each tenant is moved by an "org.migrate_storage" job, so a migration never
+overlaps a rename or delete of the same tenant and can be followed under
+GET /jobs/{id}. If this script dies part-way, run it again (or let a running
+API process pick the job up once its lease lapses).
+"""
+import argparse
+import asyncio
+import motor.motor_asyncio
+from app.core import db as core_db
+from app.core.config import settings
+from app.services.jobs import JobConflict, job_queue
+import app.services.tenants  # noqa: F401  (registers the org.migrate_storage handler)
+
+JOB_TYPE = "org.migrate_storage"
+
+
+async def migrate(to, org_names=None, concurrency=4):
+    """Queue a job per tenant not yet stored as `to`, run them here, return the finished jobs."""
+    await core_db.ensure_job_indexes()
+    if to == "shared":
+        await core_db.ensure_shared_tenant_indexes()
+
+    query = {"tenant_id": {"$exists": to != "shared"}}
+    if org_names:
+        query["organization_name"] = {"$in": list(org_names)}
+    names = await core_db.db[core_db.MASTER_COLLECTION].distinct("organization_name", query)
+
+    job_ids = []
+    for name in sorted(names):
+        try:
+            job = await job_queue.submit(
+                JOB_TYPE, {"organization_name": name, "to": to}, key=name, requested_by="migrate_tenant_storage",
+            )
+        except JobConflict as e:
+            print("skipped", name, "-", e)
+            continue
+        job_ids.append(job["_id"])
+
+    await asyncio.gather(*(job_queue.run_pending(JOB_TYPE) for _ in range(max(concurrency, 1))))
+    return [await job_queue.get(str(job_id)) for job_id in job_ids]
+
+
+async def main(args):
+    client = motor.motor_asyncio.AsyncIOMotorClient(settings.mongodb_uri)
+    core_db.db = client[settings.mongodb_name]
+    try:
+        jobs = await migrate(args.to, None if args.all else args.orgs, args.concurrency)
+    finally:
+        client.close()
+    for job in jobs:
+        name = job["params"]["organization_name"]
+        if job["status"] == "succeeded":
+            print("moved", name, "->", args.to, f"({job['result']['copied']} documents)")
+        else:
+            print("FAILED", name, job["status"], job.get("error"))
+    print(f"{sum(j['status'] == 'succeeded' for j in jobs)}/{len(jobs)} tenants moved")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move tenants between org_<name> collections and the shared collection")
+    parser.add_argument("orgs", nargs="*", help="organization names")
+    parser.add_argument("--to", required=True, choices=["shared", "collection"])
+    parser.add_argument("--all", action="store_true", help="every tenant not already stored that way")
+    parser.add_argument("--concurrency", type=int, default=4, help="tenants moved at once")
+    args = parser.parse_args()
+    if not args.orgs and not args.all:
+        parser.error("give organization names or --all")
+    asyncio.run(main(args))
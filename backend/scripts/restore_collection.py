@@ -0,0 +1,54 @@
+# restore_collection.py
+import argparse
+import asyncio
+import datetime
+import motor.motor_asyncio
+from app.core.config import settings
+from app.services.restore import restore_chain_async, restore_collection_async
+
+async def restore(args):
+    client = motor.motor_asyncio.AsyncIOMotorClient(settings.mongodb_uri)
+    try:
+        db = client[settings.mongodb_name]
+        if args.chain:
+            results = await restore_chain_async(args.chain, args.out_dir, target=args.target, db=db, before=args.before)
+        else:
+            results = [await restore_collection_async(
+                args.backup_file,
+                args.target,
+                upsert=args.upsert,
+                resume=not args.no_resume,
+                batch_size=args.batch_size,
+                max_in_flight=args.in_flight,
+                db=db,
+            )]
+    finally:
+        client.close()
+    for r in results:
+        print(
+            f"read={r['read']} written={r['written']} skipped={r['skipped']} "
+            f"resumed_from={r['resumed_from']} {r['docs_per_s']} docs/s in {r['seconds']}s "
+            f"verified={r['verified']}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Restore a backup file (NDJSON or legacy JSON array) into a collection",
+    )
+    parser.add_argument("backup_file", nargs="?", help="backup file to restore")
+    parser.add_argument("target", nargs="?", help="collection to restore into")
+    parser.add_argument("--chain", metavar="COLLECTION",
+                        help="replay COLLECTION's manifest (last full + incrementals) instead of one file")
+    parser.add_argument("--out-dir", default=None,
+                        help="where manifests/backups live (with --chain; default: BACKUP_DIR)")
+    parser.add_argument("--before", type=datetime.datetime.fromisoformat, default=None,
+                        help="with --chain: the last chain taken at or before this UTC time "
+                             "(e.g. a dropped org's final backup after its name was reused)")
+    parser.add_argument("--upsert", action="store_true", help="replace existing documents by _id")
+    parser.add_argument("--no-resume", action="store_true", help="ignore a previous run's checkpoint")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--in-flight", type=int, default=4)
+    args = parser.parse_args()
+    if not args.chain and not (args.backup_file and args.target):
+        parser.error("give <backup_file> <target> or --chain <collection>")
+    asyncio.run(restore(args))
@@ -1,8 +1,8 @@
 # backend/tests/conftest.py
 import sys
 import os
+import asyncio
 import pytest
-import mongomock
 from fastapi.testclient import TestClient
 
 
@@ -12,39 +12,13 @@ if BACKEND_ROOT not in sys.path:
 
 from app.main import app
 from app.core import db as core_db
-
-
-class AsyncMockCollection:
-    def __init__(self, collection):
-        self.collection = collection
-
-    async def find_one(self, *args, **kwargs):
-        return self.collection.find_one(*args, **kwargs)
-
-    async def insert_one(self, doc):
-        return self.collection.insert_one(doc)
-
-    async def delete_one(self, query):
-        return self.collection.delete_one(query)
-
-    async def update_one(self, query, update):
-        return self.collection.update_one(query, update)
-
-
-class AsyncMockDB:
-    def __init__(self, db):
-        self.db = db
-
-    def __getitem__(self, name):
-        return AsyncMockCollection(self.db[name])
+from testsupport.mongo_async_mock import AsyncMockDB
 
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_db():
-    mock_client = mongomock.MongoClient()
-    mock_db = mock_client["testdb"]
-
-    core_db.db = AsyncMockDB(mock_db)
+    core_db.db = AsyncMockDB.create("testdb")
+    asyncio.run(core_db.ensure_indexes())
     yield
     core_db.db = None
 
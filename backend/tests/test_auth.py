@@ -1,4 +1,7 @@
 # backend/tests/test_auth.py
+from testsupport.auth import superadmin_headers
+
+
 def test_admin_login_and_protected_route(client):
     # First create an org
     payload = {
@@ -29,3 +32,158 @@ def test_admin_login_and_protected_route(client):
     data = protected.json()
     assert data["organization_name"] == "loginorg"
     assert data["admin_email"] == "admin@login.com"
+
+
+def test_principal_cache_hits_and_invalidation(client):
+    from app.routes.auth import principal_cache, invalidate_principals
+
+    payload = {
+        "organization_name": "cacheOrg",
+        "admin_email": "admin@cache.com",
+        "admin_password": "StrongPass123!"
+    }
+    assert client.post("/org/create", json=payload).status_code == 200
+    token = client.post(
+        "/admin/login",
+        json={"email": "admin@cache.com", "password": "StrongPass123!"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/org/get", headers=headers).status_code == 200
+    hits_before = principal_cache.hits
+    assert client.get("/org/get", headers=headers).status_code == 200
+    assert principal_cache.hits == hits_before + 1
+
+    assert invalidate_principals("cacheorg") == 1
+    misses_before = principal_cache.misses
+    assert client.get("/org/get", headers=headers).status_code == 200
+    assert principal_cache.misses == misses_before + 1
+
+
+def test_cache_stats_requires_superadmin(client):
+    assert client.get("/admin/cache-stats").status_code == 401
+
+    resp = client.get("/admin/cache-stats", headers=superadmin_headers())
+    assert resp.status_code == 200
+    stats = resp.json()["principal_cache"]
+    assert {"hits", "misses", "size", "max_entries"} <= set(stats)
+
+
+def test_master_list_pages_with_cursor_and_projection(client):
+    for i in range(5):
+        client.post("/org/create", json={
+            "organization_name": f"pageOrg{i}",
+            "admin_email": f"page{i}@example.com",
+            "admin_password": "PagePass123!",
+        })
+
+    headers = superadmin_headers()
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, "fields": "organization_name"}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/admin/master-list", params=params, headers=headers).json()
+        assert len(body["data"]) <= 2
+        assert all(set(org) == {"_id", "organization_name"} for org in body["data"])
+        seen.extend(org["organization_name"] for org in body["data"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == len(set(seen))
+    assert {f"pageorg{i}" for i in range(5)} <= set(seen)
+
+
+def test_master_list_ndjson_stream(client):
+    import json
+
+    client.post("/org/create", json={
+        "organization_name": "streamOrg",
+        "admin_email": "stream@example.com",
+        "admin_password": "StreamPass123!",
+    })
+    resp = client.get("/admin/master-list", params={"format": "ndjson"}, headers=superadmin_headers())
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert "streamorg" in {r["organization_name"] for r in rows}
+    assert all(isinstance(r["admin_id"], str) for r in rows)
+
+
+def test_master_list_rejects_bad_cursor(client):
+    resp = client.get("/admin/master-list", params={"cursor": "nope"}, headers=superadmin_headers())
+    assert resp.status_code == 400
+
+
+def test_decode_access_token_uses_verified_cache():
+    from app.core import auth as core_auth
+
+    token = core_auth.create_access_token(subject="cache-me", data={"role": "org_admin"})
+    stats = core_auth.token_cache_stats()
+    first = core_auth.decode_access_token(token)
+    second = core_auth.decode_access_token(token)
+    assert first == second
+    assert first["sub"] == "cache-me"
+    after = core_auth.token_cache_stats()
+    assert after["hits"] == stats["hits"] + 1
+
+    # callers get copies, not the cached payload
+    second["role"] = "superadmin"
+    assert core_auth.decode_access_token(token)["role"] == "org_admin"
+
+
+def test_decode_access_token_rejects_expired_and_tampered():
+    from datetime import timedelta
+    import pytest
+    from jose import JWTError
+    from app.core import auth as core_auth
+
+    expired = core_auth.create_access_token(subject="old", expires_delta=timedelta(seconds=-5))
+    with pytest.raises(JWTError):
+        core_auth.decode_access_token(expired)
+
+    token = core_auth.create_access_token(subject="orig")
+    core_auth.decode_access_token(token)
+    header, body, sig = token.split(".")
+    with pytest.raises(JWTError):
+        core_auth.decode_access_token(f"{header}.{body}.{sig[:-2]}AA")
+
+
+def test_refresh_token_rotates_and_detects_reuse(client):
+    import asyncio
+    from app.core import db as core_db
+    from app.services.jobs import job_queue
+
+    assert client.post("/org/create", json={
+        "organization_name": "refreshOrg",
+        "admin_email": "admin@refresh.com",
+        "admin_password": "StrongPass123!",
+    }).status_code == 200
+    login = client.post("/admin/login", json={"email": "admin@refresh.com", "password": "StrongPass123!"}).json()
+    first = login["refresh_token"]
+    assert first and login["expires_in"] > 0
+    stored = core_db.db._db["refresh_tokens"].find_one({"organization_name": "refreshorg"})
+    assert first not in str(stored)  # only the hash is kept
+
+    core_db.db.reset_commands()
+    resp = client.post("/auth/refresh", json={"refresh_token": first})
+    assert resp.status_code == 200, resp.text
+    assert dict(core_db.db.commands) == {"findAndModify": 1, "insert": 1}
+    second = resp.json()["refresh_token"]
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    assert client.get("/org/get", headers=headers).json()["organization_name"] == "refreshorg"
+
+    # replaying a used token revokes the whole family, including its successor
+    assert client.post("/auth/refresh", json={"refresh_token": first}).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": second}).status_code == 401
+
+    # logout revokes; a rename revokes every session of the org
+    third = client.post("/admin/login", json={"email": "admin@refresh.com", "password": "StrongPass123!"}).json()["refresh_token"]
+    assert client.post("/auth/logout", json={"refresh_token": third}).status_code == 200
+    assert client.post("/auth/refresh", json={"refresh_token": third}).status_code == 401
+    login = client.post("/admin/login", json={"email": "admin@refresh.com", "password": "StrongPass123!"}).json()
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    assert client.put("/org/update", json={"new_organization_name": "refreshMoved"}, headers=headers).status_code == 202
+    asyncio.run(job_queue.run_pending())
+    assert client.post("/auth/refresh", json={"refresh_token": login["refresh_token"]}).status_code == 401
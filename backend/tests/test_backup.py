@@ -0,0 +1,172 @@
+# backend/tests/test_backup.py
+import asyncio
+import datetime
+import gzip
+import hashlib
+import json
+import os
+
+import mongomock
+import pytest
+from bson import ObjectId, json_util
+
+from app.services import backup
+from testsupport.mongo_async_mock import AsyncMockDB
+
+
+def _read_lines(path):
+    with gzip.open(path, "rb") as f:
+        return f.read().splitlines(keepends=True)
+
+
+def test_backup_writes_ndjson_with_manifest(tmp_path, monkeypatch):
+    db = AsyncMockDB(mongomock.MongoClient()["backupdb"])
+    ids = db._db["org_acme"].insert_many([{"email": f"u{i}@acme.io", "n": i} for i in range(25)]).inserted_ids
+
+    # force several chunked writes
+    monkeypatch.setattr(backup, "WRITE_CHUNK_BYTES", 64)
+    path = asyncio.run(backup.backup_collection_async("org_acme", str(tmp_path), db=db))
+
+    assert path.endswith(".ndjson.gz")
+    lines = _read_lines(path)
+    header, docs, trailer = json.loads(lines[0]), lines[1:-1], json.loads(lines[-1])
+
+    assert header["__backup__"] == "header"
+    assert header["collection"] == "org_acme"
+    assert trailer["__backup__"] == "trailer"
+    assert trailer["count"] == 25
+    assert trailer["bytes"] == sum(len(line) for line in docs)
+    assert trailer["sha256"] == hashlib.sha256(b"".join(docs)).hexdigest()
+    assert json_util.loads(docs[0])["_id"] == ids[0]
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_aborted_backup_leaves_no_file(tmp_path):
+    async def run():
+        async with backup.BackupWriter(str(tmp_path / "x.ndjson.gz"), "org_x") as writer:
+            await writer.write({"_id": ObjectId()})
+            raise RuntimeError("cursor died")
+
+    with pytest.raises(RuntimeError, match="cursor died"):
+        asyncio.run(run())
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_copy_collection_keeps_ids_and_reports_throughput():
+    db = AsyncMockDB(mongomock.MongoClient()["copydb"])
+    ids = db._db["org_src"].insert_many([{"n": i, "pad": "x" * 50} for i in range(1037)]).inserted_ids
+
+    stats = asyncio.run(backup.copy_collection_async("org_src", "org_dest", batch_size=100, max_in_flight=3, db=db))
+
+    assert stats["count"] == 1037
+    assert stats["bytes"] > 1037 * 50
+    assert {"seconds", "docs_per_s", "mb_per_s"} <= set(stats)
+    assert sorted(d["_id"] for d in db._db["org_dest"].find({})) == sorted(ids)
+
+
+def test_incremental_backup_chains_to_full(tmp_path):
+
+    db = AsyncMockDB(mongomock.MongoClient()["incrdb"])
+    coll = db._db["org_inc"]
+    coll.insert_many([{"n": i} for i in range(10)])
+    out = str(tmp_path)
+
+    full = asyncio.run(backup.backup_collection_async("org_inc", out, db=db, incremental=True))
+    # nothing changed: the incremental is empty but still chained
+    empty = asyncio.run(backup.backup_collection_async("org_inc", out, db=db, incremental=True))
+
+    coll.insert_one({"n": 10})
+    coll.update_one({"n": 3}, {"$set": {"n": 33, "updated_at": datetime.datetime.utcnow()}})
+    incr = asyncio.run(backup.backup_collection_async("org_inc", out, db=db, incremental=True))
+
+    manifest = asyncio.run(backup.load_manifest("org_inc", out))
+    kinds = [e["kind"] for e in manifest["entries"]]
+    assert kinds == ["full", "incremental", "incremental"]
+    assert [e["count"] for e in manifest["entries"]] == [10, 0, 2]
+    assert manifest["entries"][2]["parent"] == manifest["entries"][1]["file"]
+    # manifests record objects relative to the backup directory
+    assert [e["file"] for e in backup.restore_chain(manifest)] == [
+        os.path.relpath(p, out) for p in (full, empty, incr)
+    ]
+
+    header = json.loads(_read_lines(incr)[0])
+    assert header["kind"] == "incremental"
+    assert header["since"] == manifest["entries"][1]["watermark"]
+
+
+def test_final_backup_closes_chain_and_keeps_it(tmp_path):
+    from app.services import restore
+
+    db = AsyncMockDB(mongomock.MongoClient()["finaldb"])
+    db._db["org_gone"].insert_one({"n": 1})
+    out = str(tmp_path)
+
+    asyncio.run(backup.backup_collection_async("org_gone", out, db=db, incremental=True, final=True))
+    # the org is dropped and a new one reuses the name
+    db._db["org_gone"].drop()
+    db._db["org_gone"].insert_one({"n": 2})
+    asyncio.run(backup.backup_collection_async("org_gone", out, db=db, incremental=True))
+
+    manifest = asyncio.run(backup.load_manifest("org_gone", out))
+    assert [e["kind"] for e in manifest["entries"]] == ["full", "full"]
+    assert [e.get("final", False) for e in manifest["entries"]] == [True, False]
+    assert manifest["closed"] is False
+    assert backup.restore_chain(manifest) == manifest["entries"][1:]
+
+    # the dropped org's last backup is still restorable
+    before = datetime.datetime.fromisoformat(manifest["entries"][0]["created_at"].rstrip("Z"))
+    asyncio.run(restore.restore_chain_async("org_gone", out, target="org_gone_old", db=db, before=before))
+    assert [d["n"] for d in db._db["org_gone_old"].find({})] == [1]
+
+
+def test_backup_before_delete_is_full_even_with_incrementals_on(client, tmp_path, monkeypatch):
+    from app.core import db as core_db
+    from app.core.config import settings
+    from app.services.jobs import job_queue
+    from tests.test_orgs import _login
+
+    monkeypatch.setattr(settings, "incremental_backups", True)
+    monkeypatch.setattr(settings, "backup_dir", str(tmp_path))
+    headers = _login(client, "finalFull", "finalfull@example.com")
+    notes = core_db.db._db["org_finalfull"]
+    note_id = notes.insert_one({"kind": "note", "text": "draft"}).inserted_id
+    asyncio.run(backup.backup_collection_async("org_finalfull"))
+
+    # an in-place edit: no new _id and no updated_at, invisible to an incremental
+    notes.update_one({"_id": note_id}, {"$set": {"text": "final"}})
+    assert client.delete("/org/delete", headers=headers).status_code == 202
+    asyncio.run(job_queue.run_pending())
+
+    manifest = asyncio.run(backup.load_manifest("org_finalfull", str(tmp_path)))
+    assert [e["kind"] for e in manifest["entries"]] == ["full", "full"]
+    assert manifest["closed"] is True
+    lines = _read_lines(os.path.join(str(tmp_path), manifest["entries"][-1]["file"]))
+    docs = {d["_id"]: d for d in map(json_util.loads, lines[1:-1])}
+    assert docs[note_id]["text"] == "final"
+
+
+def test_copy_retry_skips_documents_already_copied():
+    db = AsyncMockDB(mongomock.MongoClient()["recopydb"])
+    db._db["org_src"].insert_many([{"n": i} for i in range(250)])
+    # an interrupted earlier attempt got part of the way
+    db._db["org_dest"].insert_many(list(db._db["org_src"].find({}).limit(120)))
+
+    stats = asyncio.run(backup.copy_collection_async("org_src", "org_dest", batch_size=100, db=db))
+
+    assert stats["count"] == 130 and stats["skipped"] == 120
+    assert db._db["org_dest"].count_documents({}) == 250
+
+
+def test_copy_rename_retry_after_source_dropped_keeps_the_copy(monkeypatch):
+    from app.core import db as core_db
+    from app.services import tenants
+
+    db = AsyncMockDB(mongomock.MongoClient()["renameretrydb"])
+    monkeypatch.setattr(core_db, "db", db)
+    # the first attempt copied and dropped the source, then died before the master update
+    db._db["org_moved"].insert_many([{"n": i} for i in range(5)])
+
+    result = asyncio.run(tenants.rename_tenant_collection("org_gone", "org_moved", strategy="copy"))
+
+    assert result["strategy"] == "copy"
+    assert db._db["org_moved"].count_documents({}) == 5
@@ -0,0 +1,153 @@
+# backend/tests/test_backup_store.py
+import asyncio
+import datetime
+import os
+
+import mongomock
+
+from app.services import backup, restore
+from app.services.backup_store import BackupStore, store_for
+from testsupport.mongo_async_mock import AsyncMockDB
+
+
+def _db(name):
+    return AsyncMockDB(mongomock.MongoClient()[name])
+
+
+def test_unchanged_backups_are_deduplicated_and_indexed(tmp_path):
+    db = _db("dedupedb")
+    db._db["org_same"].insert_many([{"n": i} for i in range(20)])
+    out = str(tmp_path)
+
+    first = asyncio.run(backup.backup_collection_async("org_same", out, db=db, incremental=False))
+    second = asyncio.run(backup.backup_collection_async("org_same", out, db=db, incremental=False))
+    assert first == second and first.startswith(os.path.join(out, "objects"))
+    assert not os.listdir(os.path.join(out, "staging"))
+
+    store = store_for(out)
+    stats = asyncio.run(store.stats())
+    assert stats["backups"] == 2 and stats["objects"] == 1 and stats["deduplicated"] == 1
+    assert stats["stored_bytes"] == os.path.getsize(first)
+
+    latest = asyncio.run(store.locate("org_same"))
+    assert latest["path"] == first and latest["count"] == 20
+    assert asyncio.run(store.locate("org_same", before=datetime.datetime(2000, 1, 1))) is None
+    assert [r["collection"] for r in asyncio.run(store.list("org_same"))] == ["org_same", "org_same"]
+
+    # a lost index is rebuilt from the manifests
+    os.remove(os.path.join(out, "index.sqlite3"))
+    assert asyncio.run(BackupStore(out).stats())["backups"] == 2
+
+
+def test_eviction_keeps_whole_sets_and_collects_unused_objects(tmp_path):
+    db = _db("evictdb")
+    coll = db._db["org_ret"]
+    out = str(tmp_path)
+
+    # three backup sets: full + incremental, full + incremental, full
+    for i in range(3):
+        coll.insert_one({"n": i, "pad": "x" * 500})
+        asyncio.run(backup.backup_collection_async("org_ret", out, db=db, incremental=False))
+        if i < 2:
+            coll.insert_one({"n": 10 + i})
+            asyncio.run(backup.backup_collection_async("org_ret", out, db=db, incremental=True))
+    store = store_for(out)
+    assert asyncio.run(store.stats())["backups"] == 5
+
+    result = asyncio.run(store.evict(keep_last=2, max_age_days=0, max_bytes=0))
+    assert result["sets"] == 1 and result["backups"] == 2 and result["objects"] == 2
+    manifest = asyncio.run(backup.load_manifest("org_ret", out))
+    assert [e["kind"] for e in manifest["entries"]] == ["full", "incremental", "full"]
+    assert all(os.path.exists(os.path.join(out, e["file"])) for e in manifest["entries"])
+
+    # over the byte budget the oldest sets go, never the newest one
+    result = asyncio.run(store.evict(keep_last=0, max_age_days=0, max_bytes=1))
+    assert result["sets"] == 1
+    manifest = asyncio.run(backup.load_manifest("org_ret", out))
+    assert [e["kind"] for e in manifest["entries"]] == ["full"]
+    restored = asyncio.run(restore.restore_chain_async("org_ret", out, target="org_back", db=db))
+    assert restored[0]["written"] == coll.count_documents({})
+
+    # past the maximum age everything goes, manifest included
+    later = datetime.datetime.utcnow() + datetime.timedelta(days=2)
+    result = asyncio.run(store.evict(keep_last=0, max_age_days=1, max_bytes=0, now=later))
+    assert result["backups"] == 1
+    assert asyncio.run(backup.load_manifest("org_ret", out)) is None
+    assert asyncio.run(store.stats())["objects"] == 0
+    assert not [f for _, _, files in os.walk(os.path.join(out, "objects")) for f in files]
+
+
+def test_eviction_runs_in_the_background(tmp_path, monkeypatch):
+    from app.core.config import settings
+
+    db = _db("bgdb")
+    db._db["org_bg"].insert_one({"n": 1})
+    out = str(tmp_path)
+    asyncio.run(backup.backup_collection_async("org_bg", out, db=db, incremental=False, final=True))
+    db._db["org_bg"].insert_one({"n": 2})
+    asyncio.run(backup.backup_collection_async("org_bg", out, db=db, incremental=False))
+    monkeypatch.setattr(settings, "backup_keep_last", 1)
+
+    store = BackupStore(out)
+
+    async def scenario():
+        store.start(interval=0.01)
+        await asyncio.sleep(0.1)
+        await store.stop()
+
+    asyncio.run(scenario())
+    assert [r["count"] for r in asyncio.run(store.list())] == [2]
+
+
+def test_admin_backups_lists_the_index(client, tmp_path, monkeypatch):
+    from app.core.config import settings
+    from testsupport.auth import superadmin_headers
+
+    monkeypatch.setattr(settings, "backup_dir", str(tmp_path))
+    db = _db("routedb")
+    db._db["org_listed"].insert_one({"n": 1})
+    asyncio.run(backup.backup_collection_async("org_listed", db=db))
+
+    assert client.get("/admin/backups").status_code == 401
+    resp = client.get("/admin/backups", params={"collection": "org_listed"}, headers=superadmin_headers())
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["stats"]["backups"] == 1
+    assert body["backups"][0]["file"].startswith("objects/") and body["backups"][0]["count"] == 1
+
+
+def test_dedupe_waits_for_an_eviction_in_another_process(tmp_path):
+    import shutil
+    import sqlite3
+    import threading
+    import time
+
+    db = _db("lockdb")
+    db._db["org_lock"].insert_one({"n": 1})
+    out = str(tmp_path)
+    path = asyncio.run(backup.backup_collection_async("org_lock", out, db=db, incremental=False))
+    row = asyncio.run(BackupStore(out).list("org_lock"))[0]
+
+    # a second store object stands in for the CLI process sharing the directory
+    other = BackupStore(out)
+    os.makedirs(other.staging_dir(), exist_ok=True)
+    staged = os.path.join(other.staging_dir(), "same.ndjson.gz")
+    shutil.copy(path, staged)
+
+    # the first process is mid-eviction: it holds the index write lock
+    evicting = sqlite3.connect(os.path.join(out, "index.sqlite3"), isolation_level=None)
+    evicting.execute("BEGIN IMMEDIATE")
+    result = {}
+    put = threading.Thread(target=lambda: result.update(other._put(staged, "org_lock", row, False)))
+    put.start()
+    time.sleep(0.2)
+    # the put has not looked for the object yet, so it cannot dedupe against it
+    assert os.path.exists(staged)
+    evicting.execute("DELETE FROM backups")
+    os.remove(path)
+    evicting.execute("COMMIT")
+    put.join(timeout=10)
+
+    assert result["deduplicated"] is False
+    assert os.path.exists(path)
+    assert [r["file"] for r in asyncio.run(other.list("org_lock"))] == [row["file"]]
@@ -0,0 +1,119 @@
+# backend/tests/test_batch_orgs.py
+import asyncio
+
+from testsupport.auth import superadmin_headers
+from tests.test_orgs import _login
+
+
+def test_batch_update_renames_in_one_master_write(client):
+    from app.core import db as core_db
+    from app.services.jobs import job_queue
+
+    raw = core_db.db._db
+    for i in range(3):
+        _login(client, f"batchRen{i}", f"admin{i}@batchren.io")
+    raw["org_batchren0"].insert_many([{"n": i} for i in range(5)])
+
+    resp = client.post("/admin/batch-update-orgs", json={"organizations": [
+        {"organization_name": "batchren0", "new_organization_name": "batchMoved0"},
+        {"organization_name": "batchren1", "new_admin_email": "new1@batchren.io"},
+        {"organization_name": "batchren2", "new_admin_email": "admin0@batchren.io"},
+        {"organization_name": "batchmissing", "new_organization_name": "whatever"},
+        {"organization_name": "batchren1", "new_organization_name": "again"},
+    ]}, headers=superadmin_headers())
+    assert resp.status_code == 202, resp.text
+    body = resp.json()
+    assert body["accepted"] == ["batchren0", "batchren1"]
+    assert {r["organization_name"]: r["error"] for r in body["rejected"]} == {
+        "batchren1": "Duplicate organization in request",
+        "batchren2": "Email already used by another org",
+        "batchmissing": "Organization not found",
+    }
+
+    core_db.db.reset_commands()
+    asyncio.run(job_queue.run_pending())
+    assert core_db.db.commands["bulkWrite"] == 1  # one master write for the whole batch
+    job = client.get(body["status_url"], headers=superadmin_headers()).json()
+    assert job["status"] == "succeeded" and job["result"]["updated"] == 2
+    assert [r["ok"] for r in job["result"]["results"]] == [True, True]
+
+    assert raw["org_batchmoved0"].count_documents({}) == 6
+    assert raw["master_organizations"].find_one({"organization_name": "batchren1"})["admin_email"] == "new1@batchren.io"
+    assert client.post("/admin/login", json={"email": "new1@batchren.io", "password": "RenamePass123!"}).status_code == 200
+    # locks went with the job
+    assert raw["jobs"].count_documents({"type": "lock"}) == 0
+
+
+def test_batch_delete_skips_busy_and_unknown_orgs(client, monkeypatch, tmp_path):
+    from app.core import db as core_db
+    from app.services import tenants
+    from app.services.jobs import job_queue
+
+    async def backup_to_tmp(coll_name, **kwargs):
+        return str(tmp_path / f"{coll_name}.ndjson.gz")
+
+    monkeypatch.setattr(tenants, "backup_collection_async", backup_to_tmp)
+    raw = core_db.db._db
+    busy_headers = _login(client, "batchBusy", "busy@batchdel.io")
+    _login(client, "batchGone", "gone@batchdel.io")
+    # a pending rename holds batchbusy
+    assert client.put("/org/update", json={"new_admin_email": "x@batchdel.io"}, headers=busy_headers).status_code == 202
+
+    resp = client.post("/admin/batch-delete-orgs", json={
+        "organizations": ["batchgone", "batchbusy", "batchnope", "batchgone"],
+    }, headers=superadmin_headers())
+    assert resp.status_code == 202, resp.text
+    body = resp.json()
+    assert body["accepted"] == ["batchgone"]
+    assert {r["organization_name"]: r["error"] for r in body["rejected"]} == {
+        "batchnope": "Organization not found",
+        "batchbusy": "Another operation is already in progress",
+    }
+    # while the batch is queued its tenants are locked against single-org jobs too
+    gone_headers = {"Authorization": "Bearer " + client.post(
+        "/admin/login", json={"email": "gone@batchdel.io", "password": "RenamePass123!"},
+    ).json()["access_token"]}
+    assert client.delete("/org/delete", headers=gone_headers).status_code == 409
+
+    asyncio.run(job_queue.run_pending())
+    job = client.get(body["status_url"], headers=superadmin_headers()).json()
+    assert job["result"]["deleted"] == 1 and job["result"]["results"][0]["backup"].endswith("org_batchgone.ndjson.gz")
+    assert raw["master_organizations"].find_one({"organization_name": "batchgone"}) is None
+    assert "org_batchgone" not in raw.list_collection_names()
+    assert raw["jobs"].count_documents({"type": "lock"}) == 0
+
+    # nothing left to queue
+    resp = client.post("/admin/batch-delete-orgs", json={"organizations": ["batchgone"]}, headers=superadmin_headers())
+    assert resp.status_code == 200 and resp.json()["job_id"] is None
+
+
+def test_batch_update_rolls_back_tenants_whose_master_write_fails(client):
+    from app.core import db as core_db
+    from app.services.jobs import job_queue
+
+    raw = core_db.db._db
+    _login(client, "batchRbA", "a@batchrb.io")
+    _login(client, "batchRbB", "b@batchrb.io")
+    raw["org_batchrba"].insert_many([{"n": i} for i in range(3)])
+
+    resp = client.post("/admin/batch-update-orgs", json={"organizations": [
+        {"organization_name": "batchrba", "new_organization_name": "batchRbTaken", "new_admin_email": "a2@batchrb.io"},
+        {"organization_name": "batchrbb", "new_admin_email": "b2@batchrb.io"},
+    ]}, headers=superadmin_headers())
+    assert resp.status_code == 202, resp.text
+    # another org takes the name after the request was validated
+    raw["master_organizations"].insert_one({"organization_name": "batchrbtaken", "admin_email": "t@batchrb.io"})
+
+    asyncio.run(job_queue.run_pending())
+    job = client.get(resp.json()["status_url"], headers=superadmin_headers()).json()
+    assert job["status"] == "succeeded"
+    assert job["result"]["updated"] == 1 and job["result"]["failed"] == 1
+    failed = job["result"]["results"][0]
+    assert not failed["ok"] and "Master update failed" in failed["error"]
+
+    # the collection and admin email of the rejected tenant are back in place
+    assert raw["org_batchrba"].count_documents({}) == 4
+    assert "org_batchrbtaken" not in raw.list_collection_names()
+    assert client.post("/admin/login", json={"email": "a@batchrb.io", "password": "RenamePass123!"}).status_code == 200
+    assert client.post("/admin/login", json={"email": "b2@batchrb.io", "password": "RenamePass123!"}).status_code == 200
+    raw["master_organizations"].delete_one({"organization_name": "batchrbtaken"})
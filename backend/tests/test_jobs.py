@@ -0,0 +1,189 @@
+# backend/tests/test_jobs.py
+import asyncio
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from testsupport.auth import superadmin_headers
+from tests.test_orgs import _login
+
+
+def test_delete_runs_as_background_job(client, monkeypatch, tmp_path):
+    from app.core import db as core_db
+    from app.services import tenants
+    from app.services.jobs import job_queue
+
+    async def backup_to_tmp(coll_name, **kwargs):
+        return str(tmp_path / f"{coll_name}.ndjson.gz")
+
+    monkeypatch.setattr(tenants, "backup_collection_async", backup_to_tmp)
+    headers = _login(client, "jobDelete", "jobdelete@example.com")
+    other = _login(client, "jobOther", "jobother@example.com")
+
+    resp = client.delete("/org/delete", headers=headers)
+    assert resp.status_code == 202, resp.text
+    job_id = resp.json()["job_id"]
+
+    # one operation per tenant at a time
+    assert client.delete("/admin/delete-org/jobdelete", headers=superadmin_headers()).status_code == 409
+    # other tenants cannot see the job
+    assert client.get(f"/jobs/{job_id}", headers=other).status_code == 404
+
+    assert asyncio.run(job_queue.run_pending()) == 1
+    job = client.get(f"/jobs/{job_id}", headers=superadmin_headers()).json()
+    assert job["status"] == "succeeded", job
+    assert job["progress"]["stage"] == "removing_master"
+    assert job["result"]["backup"].endswith("org_jobdelete.ndjson.gz")
+    assert core_db.db._db["master_organizations"].find_one({"organization_name": "jobdelete"}) is None
+
+
+def test_interrupted_job_is_resumed_and_failures_release_the_tenant(client):
+    from app.core import db as core_db
+    from app.services.jobs import job_queue
+
+    _login(client, "jobResume", "jobresume@example.com")
+    jobs = core_db.db._db["jobs"]
+    # left "running" by a process that died mid-way
+    stale_id = jobs.insert_one({
+        "type": "org.update",
+        "status": "running",
+        "params": {"organization_name": "jobresume", "new_organization_name": None, "new_admin_email": "new@jobresume.io"},
+        "active_key": "jobresume",
+        "attempts": 1,
+        "worker": "gone",
+        "lease_until": datetime.utcnow() - timedelta(seconds=1),
+        "created_at": datetime.utcnow(),
+    }).inserted_id
+    failing = asyncio.run(job_queue.submit("org.delete", {"organization_name": "nosuchorg", "collection_name": "org_x"}, key="nosuchorg"))
+    jobs.update_one({"_id": failing["_id"]}, {"$set": {"type": "org.update"}})
+
+    asyncio.run(job_queue.run_pending("org.update"))
+
+    resumed = jobs.find_one({"_id": stale_id})
+    assert resumed["status"] == "succeeded" and resumed["attempts"] == 2
+    assert "active_key" not in resumed
+    assert core_db.db._db["master_organizations"].find_one({"organization_name": "jobresume"})["admin_email"] == "new@jobresume.io"
+
+    failed = jobs.find_one({"_id": failing["_id"]})
+    assert failed["status"] == "failed" and "not found" in failed["error"]
+    # the key is free again
+    asyncio.run(job_queue.submit("org.delete", {"organization_name": "nosuchorg", "collection_name": "org_x"}, key="nosuchorg"))
+    jobs.delete_many({"active_key": "nosuchorg"})
+    assert client.get(f"/jobs/{ObjectId()}", headers=superadmin_headers()).status_code == 404
+
+
+def test_worker_survives_a_failed_finish():
+    from pymongo.errors import AutoReconnect
+
+    from app.core import db as core_db
+    from app.services.jobs import JobQueue
+
+    queue = JobQueue(poll_seconds=0.01)
+    ran = []
+
+    async def handler(params, progress):
+        ran.append(params["n"])
+        return {"n": params["n"]}
+
+    queue.register("test.finish", handler)
+    real_finish = queue._finish
+    calls = 0
+
+    async def flaky_finish(job, status, **kwargs):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise AutoReconnect("primary stepped down")
+        await real_finish(job, status, **kwargs)
+
+    queue._finish = flaky_finish
+
+    async def run():
+        queue.start()
+        try:
+            await queue.submit("test.finish", {"n": 1})
+            second = await queue.submit("test.finish", {"n": 2})
+            for _ in range(200):
+                job = await queue.get(str(second["_id"]))
+                if job["status"] == "succeeded":
+                    return job
+                await asyncio.sleep(0.01)
+        finally:
+            await queue.stop()
+
+    job = asyncio.run(run())
+    assert job is not None and job["result"] == {"n": 2}
+    assert ran == [1, 2]
+    core_db.db._db["jobs"].delete_many({"type": "test.finish"})
+
+
+def test_transient_errors_are_retried_up_to_max_attempts():
+    import time
+
+    from pymongo.errors import AutoReconnect, OperationFailure
+
+    from app.core import db as core_db
+    from app.services.jobs import JobQueue
+
+    queue = JobQueue(poll_seconds=0.01, max_attempts=3)
+    calls = {"flaky": 0, "down": 0, "bad": 0}
+
+    async def flaky(params, progress):
+        calls["flaky"] += 1
+        if calls["flaky"] == 1:
+            raise AutoReconnect("primary stepped down")
+        return {"ok": True}
+
+    async def down(params, progress):
+        calls["down"] += 1
+        raise AutoReconnect("no primary")
+
+    async def bad(params, progress):
+        calls["bad"] += 1
+        raise OperationFailure("not transient", code=2)
+
+    for name, handler in (("test.flaky", flaky), ("test.down", down), ("test.bad", bad)):
+        queue.register(name, handler)
+
+    async def run():
+        jobs = [await queue.submit(name, {}) for name in ("test.flaky", "test.down", "test.bad")]
+        for _ in range(6):
+            await queue.run_pending()
+            # a retried job is claimable again once a poll interval has passed
+            time.sleep(0.02)
+        return [await queue.get(str(j["_id"])) for j in jobs]
+
+    flaky_job, down_job, bad_job = asyncio.run(run())
+    assert flaky_job["status"] == "succeeded" and flaky_job["attempts"] == 2 and flaky_job["error"] is None
+    assert down_job["status"] == "failed" and down_job["attempts"] == 3 and calls["down"] == 3
+    assert bad_job["status"] == "failed" and calls["bad"] == 1
+    core_db.db._db["jobs"].delete_many({"type": {"$in": ["test.flaky", "test.down", "test.bad"]}})
+
+
+def test_shutdown_hands_the_job_back_without_using_an_attempt():
+    from app.core import db as core_db
+    from app.services.jobs import JobQueue
+
+    queue = JobQueue(poll_seconds=0.01, max_attempts=1)
+    started = []
+
+    async def slow(params, progress):
+        started.append(True)
+        await asyncio.sleep(60)
+
+    queue.register("test.slow", slow)
+
+    async def run():
+        job = await queue.submit("test.slow", {})
+        # several graceful restarts in a row
+        for _ in range(3):
+            queue.start()
+            while len(started) < 1:
+                await asyncio.sleep(0.01)
+            started.clear()
+            await queue.stop()
+        return await queue.get(str(job["_id"]))
+
+    job = asyncio.run(run())
+    assert job["status"] == "queued" and job["attempts"] == 0
+    core_db.db._db["jobs"].delete_many({"type": "test.slow"})
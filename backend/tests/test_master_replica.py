@@ -0,0 +1,109 @@
+# backend/tests/test_master_replica.py
+import asyncio
+
+from bson import ObjectId
+
+from app.services.master_replica import MasterReplica
+from testsupport.mongo_async_mock import AsyncMockDB
+
+
+def test_replica_polls_when_change_streams_are_unavailable():
+    db = AsyncMockDB.create("replicadb")
+    raw = db._db["master_organizations"]
+    admin_id = ObjectId()
+    raw.insert_one({"organization_name": "one", "admin_email": "a@one.io", "admin_id": admin_id, "collection_name": "org_one"})
+
+    async def scenario():
+        replica = MasterReplica(poll_seconds=0.01)
+        await replica.start(db)
+        try:
+            assert replica.get("admin_id", str(admin_id))["organization_name"] == "one"
+
+            # writes by another process show up on the next poll
+            raw.insert_one({"organization_name": "two", "admin_email": "b@two.io", "collection_name": "org_two"})
+            raw.update_one({"organization_name": "one"}, {"$set": {"organization_name": "uno"}})
+            await asyncio.sleep(0.05)
+            assert replica.mode == "polling"
+            assert replica.get("organization_name", "two")["admin_email"] == "b@two.io"
+            assert replica.get("organization_name", "one") is None
+            assert replica.get("admin_email", "a@one.io")["organization_name"] == "uno"
+        finally:
+            await replica.stop()
+
+        # without the poller running, so round trips can be counted exactly
+        loaded = MasterReplica()
+        await loaded.load(db)
+        db.reset_commands()
+        assert (await loaded.find_one("organization_name", "uno"))["collection_name"] == "org_one"
+        assert db.commands["find"] == 0
+        # misses read through to the collection
+        assert await loaded.find_one("organization_name", "missing") is None
+        assert db.commands["find"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_get_current_admin_resolves_tenant_from_replica(client, monkeypatch):
+    from app.core import db as core_db
+    from app.routes.auth import principal_cache
+    from app.services.jobs import job_queue
+    from app.services import master_replica as replica_module
+
+    creds = {"email": "replica@example.com", "password": "StrongPass123!"}
+    resp = client.post("/org/create", json={
+        "organization_name": "replicaorg", "admin_email": creds["email"], "admin_password": creds["password"],
+    })
+    assert resp.status_code == 200
+    headers = {"Authorization": f"Bearer {client.post('/admin/login', json=creds).json()['access_token']}"}
+
+    replica = MasterReplica()
+    asyncio.run(replica.load(core_db.db))
+    monkeypatch.setattr(replica_module, "master_replica", replica)
+    monkeypatch.setattr("app.routes.auth.master_replica", replica)
+    monkeypatch.setattr("app.routes.orgs.master_replica", replica)
+    monkeypatch.setattr("app.services.tenants.master_replica", replica)
+
+    principal_cache.clear()
+    core_db.db.reset_commands()
+    resp = client.get("/org/get", headers=headers)
+    assert resp.status_code == 200
+    assert resp.json()["organization_name"] == "replicaorg"
+    # only the admin document is fetched; the tenant came from memory
+    assert core_db.db.commands["find"] == 1
+
+    # a rename through the API is visible to the replica as soon as its job ends
+    resp = client.put("/org/update", json={"new_organization_name": "replicaorg2"}, headers=headers)
+    assert resp.status_code == 202
+    asyncio.run(job_queue.run_pending())
+    assert replica.get("organization_name", "replicaorg2")["collection_name"] == "org_replicaorg2"
+    assert replica.get("organization_name", "replicaorg") is None
+
+
+def test_update_job_rechecks_the_live_master(client, monkeypatch):
+    from app.services import tenants
+    from app.services.jobs import job_queue
+    from tests.test_orgs import _login
+
+    _login(client, "staleCheck", "stale@check.io")
+    _login(client, "staleOther", "other@check.io")
+
+    def update_email(email):
+        # queued directly, as if the route had checked a replica that missed the owner
+        job = asyncio.run(job_queue.submit("org.update", {
+            "organization_name": "stalecheck", "new_organization_name": None, "new_admin_email": email,
+        }, key="stalecheck"))
+        asyncio.run(job_queue.run_pending("org.update"))
+        return asyncio.run(job_queue.get(str(job["_id"])))
+
+    job = update_email("other@check.io")
+    assert job["status"] == "failed" and "already used" in job["error"]
+    assert client.post("/admin/login", json={"email": "stale@check.io", "password": "RenamePass123!"}).status_code == 200
+
+    # the email is taken between the check and the master write: the tenant email is put back
+    def no_check(*args):
+        return None
+
+    monkeypatch.setattr(tenants, "_ensure_free", no_check)
+    job = update_email("other@check.io")
+    assert job["status"] == "failed"
+    assert client.post("/admin/login", json={"email": "stale@check.io", "password": "RenamePass123!"}).status_code == 200
@@ -0,0 +1,45 @@
+# backend/tests/test_metrics.py
+from types import SimpleNamespace
+
+from app.core import metrics
+
+
+def test_metrics_endpoint_reports_route_templates(client):
+    resp = client.get("/health")
+    assert resp.status_code == 200
+    client.get("/org/get")  # 401/403 without a token, still recorded
+
+    body = client.get("/metrics").text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in body
+    assert 'route="/org/get"' in body
+    assert "mongo_commands_per_request_bucket" in body
+
+    client.get("/no/such/path")
+    assert metrics.http_request_duration.count("GET", "unmatched", "404") >= 1
+
+
+def test_command_listener_tags_collection_and_route():
+    listener = metrics.MongoCommandMetrics()
+    scope = {"route": SimpleNamespace(path="/org/get")}
+    token = metrics._current_request.set(scope)
+    try:
+        for request_id in (1, 2):
+            listener.started(SimpleNamespace(
+                command_name="find", command={"find": "master_organizations"},
+                database_name="testdb", connection_id=("localhost", 27017), request_id=request_id,
+            ))
+        listener.started(SimpleNamespace(
+            command_name="hello", command={"hello": 1},
+            database_name="admin", connection_id=("localhost", 27017), request_id=3,
+        ))
+    finally:
+        metrics._current_request.reset(token)
+
+    for request_id in (1, 2):
+        listener.succeeded(SimpleNamespace(
+            command_name="find", connection_id=("localhost", 27017), request_id=request_id, duration_micros=1500,
+        ))
+
+    assert scope["state"]["mongo_commands"] == 2
+    assert metrics.mongo_command_duration.count("find", "master_organizations", "/org/get", "ok") >= 2
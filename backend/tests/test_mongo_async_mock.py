@@ -0,0 +1,48 @@
+# backend/tests/test_mongo_async_mock.py
+import asyncio
+
+import pytest
+from pymongo import DeleteOne, InsertOne, ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+
+from testsupport.mongo_async_mock import AsyncMockDB
+
+
+def test_stand_in_counts_round_trips_and_supports_bulk_paths():
+    db = AsyncMockDB.create("mockdb")
+    coll = db["org_x"]
+
+    async def scenario():
+        await coll.insert_many([{"_id": i, "n": i} for i in range(10)])
+        assert await coll.count_documents({"n": {"$gte": 5}}) == 5
+        page = await coll.find({}, {"n": 1}).sort("_id", -1).skip(2).limit(3).to_list(length=None)
+        assert [d["_id"] for d in page] == [7, 6, 5]
+
+        res = await coll.bulk_write([
+            ReplaceOne({"_id": 1}, {"n": 100}),
+            UpdateOne({"_id": 2}, {"$set": {"n": 200}}),
+            ReplaceOne({"_id": 42}, {"n": 42}, upsert=True),
+            DeleteOne({"_id": 3}),
+        ], ordered=False)
+        assert (res.matched_count, res.upserted_count, res.deleted_count) == (2, 1, 1)
+
+        with pytest.raises(BulkWriteError) as exc:
+            await coll.bulk_write([InsertOne({"_id": 4}), InsertOne({"_id": 99})], ordered=False)
+        assert exc.value.details["writeErrors"][0]["index"] == 0
+        assert exc.value.details["nInserted"] == 1
+
+        doc = await coll.find_one_and_update({"_id": 5}, {"$inc": {"n": 1}}, return_document=ReturnDocument.AFTER)
+        assert doc["n"] == 6
+
+        stats = await db.command("collStats", "org_x")
+        assert stats["count"] == 11 and stats["size"] > 0
+        with pytest.raises(OperationFailure):
+            await db.command("replSetGetStatus")
+
+        await coll.rename("org_y")
+        assert await db.list_collection_names() == ["org_y"]
+
+    asyncio.run(scenario())
+    assert db.commands["find"] == 1
+    assert db.commands["bulkWrite"] == 2
+    assert db.command_count == 10
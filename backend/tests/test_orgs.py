@@ -34,3 +34,287 @@ def test_create_org_duplicate(client):
     resp2 = client.post("/org/create", json=payload)
     assert resp2.status_code == 400
     assert resp2.json()["detail"] == "Organization already exists"
+
+
+def _login(client, org_name, email, password="RenamePass123!"):
+    resp = client.post("/org/create", json={
+        "organization_name": org_name,
+        "admin_email": email,
+        "admin_password": password,
+    })
+    assert resp.status_code == 200, resp.text
+    token = client.post("/admin/login", json={"email": email, "password": password}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_update_org_renames_collection_server_side(client):
+    import asyncio
+    from app.core import db as core_db
+    from app.services.jobs import job_queue
+
+    headers = _login(client, "renameFrom", "rename@example.com")
+    core_db.db["org_renamefrom"]._coll.insert_one({"kind": "note"})
+
+    resp = client.put("/org/update", json={"new_organization_name": "renameTo"}, headers=headers)
+    assert resp.status_code == 202, resp.text
+    job_url = resp.headers["location"]
+    assert client.get(job_url, headers=headers).json()["status"] == "queued"
+
+    asyncio.run(job_queue.run_pending())
+    job = client.get(job_url, headers=headers).json()
+    assert job["status"] == "succeeded", job
+    assert job["result"]["organization"]["organization_name"] == "renameto"
+    assert job["result"]["rename"]["strategy"] == "server"
+
+    raw_db = core_db.db._db
+    assert raw_db["org_renamefrom"].count_documents({}) == 0
+    assert raw_db["org_renameto"].count_documents({}) == 2
+    assert raw_db["master_organizations"].find_one({"organization_name": "renameto"})["collection_name"] == "org_renameto"
+
+
+def test_rename_falls_back_to_copy_when_server_rename_is_refused(client, monkeypatch, tmp_path):
+    import asyncio
+    from pymongo.errors import OperationFailure
+    from app.core import db as core_db
+    from app.services import tenants
+
+    _login(client, "copyFrom", "copy@example.com")
+
+    async def refuse(self, new_name):
+        raise OperationFailure("not authorized", code=13)
+
+    async def backup_to_tmp(coll_name, **kwargs):
+        return str(tmp_path / f"{coll_name}.json")
+
+    monkeypatch.setattr(type(core_db.db["org_copyfrom"]), "rename", refuse)
+    monkeypatch.setattr(tenants, "backup_collection_async", backup_to_tmp)
+
+    result = asyncio.run(tenants.rename_tenant_collection("org_copyfrom", "org_copyto"))
+    assert result["strategy"] == "copy"
+    assert result["copied"] == 1
+    assert core_db.db._db["org_copyfrom"].count_documents({}) == 0
+    assert core_db.db._db["org_copyto"].count_documents({}) == 1
+
+
+def test_create_org_duplicate_email_rejected_by_unique_index(client):
+    from app.core import db as core_db
+
+    first = {"organization_name": "emailOne", "admin_email": "shared@example.com", "admin_password": "TestPass!"}
+    assert client.post("/org/create", json=first).status_code == 200
+
+    second = dict(first, organization_name="emailTwo")
+    resp = client.post("/org/create", json=second)
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Admin email already used for another org"
+
+    raw_db = core_db.db._db
+    assert raw_db["master_organizations"].find_one({"organization_name": "emailtwo"}) is None
+    assert "email_1" in raw_db["org_emailone"].index_information()
+
+
+def test_created_admin_id_matches_org_document(client):
+    from bson import ObjectId
+    from app.core import db as core_db
+
+    payload = {"organization_name": "idOrg", "admin_email": "id@example.com", "admin_password": "TestPass!"}
+    admin_id = client.post("/org/create", json=payload).json()["admin_id"]
+
+    raw_db = core_db.db._db
+    assert raw_db["org_idorg"].find_one({"_id": ObjectId(admin_id)})["email"] == "id@example.com"
+    assert raw_db["master_organizations"].find_one({"organization_name": "idorg"})["admin_id"] == ObjectId(admin_id)
+
+
+def test_ready_reports_unavailable_without_mongo_client(client):
+    resp = client.get("/ready")
+    assert resp.status_code == 503
+    body = resp.json()
+    assert body["ready"] is False
+    assert body["mongo"]["error"] == "not connected"
+    assert {"open", "in_use", "max_pool_size"} <= set(body["pool"])
+
+
+def test_ready_when_server_answers_ping(client, monkeypatch):
+    from app.core import db as core_db
+
+    class FakeAdmin:
+        async def command(self, name):
+            assert name == "ping"
+            return {"ok": 1}
+
+    class FakeClient:
+        admin = FakeAdmin()
+
+    monkeypatch.setattr(core_db, "client", FakeClient())
+    monkeypatch.setattr(core_db, "indexes_ready", True)
+    resp = client.get("/ready")
+    assert resp.status_code == 200
+    assert resp.json()["mongo"]["ok"] is True
+
+
+def test_duplicate_masters_keep_startup_and_ready_failing(client, monkeypatch):
+    import asyncio
+
+    import pytest
+    from pymongo.errors import OperationFailure
+
+    from app.core import db as core_db
+    from testsupport.mongo_async_mock import AsyncMockDB
+
+    class FakeAdmin:
+        async def command(self, name):
+            return {"ok": 1}
+
+    class FakeClient:
+        admin = FakeAdmin()
+
+    dup_db = AsyncMockDB.create("dupdb")
+    dup_db._db["master_organizations"].insert_many([
+        {"organization_name": "twin", "admin_email": "a@twin.io"},
+        {"organization_name": "twin", "admin_email": "b@twin.io"},
+    ])
+    monkeypatch.setattr(core_db, "client", FakeClient())
+    monkeypatch.setattr(core_db, "db", dup_db)
+    monkeypatch.setattr(core_db, "indexes_ready", False)
+    monkeypatch.setattr(core_db, "bootstrap_error", None)
+
+    with pytest.raises(OperationFailure):
+        asyncio.run(core_db.warm_up())
+    assert core_db.indexes_ready is False
+
+    resp = client.get("/ready")
+    assert resp.status_code == 503
+    assert resp.json()["indexes"] == {"ready": False, "error": core_db.bootstrap_error}
+    assert "duplicate" in core_db.bootstrap_error.lower()
+
+
+def test_ready_only_reports_and_the_bootstrap_retries_in_background(client, monkeypatch):
+    import asyncio
+
+    from app.core import db as core_db
+    from testsupport.mongo_async_mock import AsyncMockDB
+
+    class FakeAdmin:
+        async def command(self, name):
+            return {"ok": 1}
+
+    class FakeClient:
+        admin = FakeAdmin()
+
+    dup_db = AsyncMockDB.create("retrydb")
+    masters = dup_db._db["master_organizations"]
+    masters.insert_many([{"organization_name": "twin"}, {"organization_name": "twin"}])
+    monkeypatch.setattr(core_db, "client", FakeClient())
+    monkeypatch.setattr(core_db, "db", dup_db)
+    monkeypatch.setattr(core_db, "indexes_ready", False)
+    monkeypatch.setattr(core_db, "bootstrap_error", "pending")
+
+    sweeps = 0
+    real_ensure = core_db.ensure_indexes
+
+    async def counting_ensure(database=None):
+        nonlocal sweeps
+        sweeps += 1
+        await real_ensure(database)
+
+    monkeypatch.setattr(core_db, "ensure_indexes", counting_ensure)
+
+    # the probe never starts a sweep of its own
+    assert client.get("/ready").status_code == 503
+    assert sweeps == 0
+
+    async def run():
+        task = asyncio.ensure_future(core_db.retry_bootstrap(delay=0.01))
+        while sweeps < 2:
+            await asyncio.sleep(0.01)
+        assert not task.done() and not core_db.indexes_ready
+        masters.delete_one({"organization_name": "twin"})
+        await asyncio.wait_for(task, timeout=5)
+
+    monkeypatch.setattr(core_db, "BOOTSTRAP_RETRY_MAX_SECONDS", 0.02)
+    asyncio.run(run())
+    assert core_db.indexes_ready is True and core_db.bootstrap_error is None
+    assert client.get("/ready").status_code == 200
+
+
+def test_client_options_from_settings(monkeypatch):
+    from app.core import db as core_db
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "mongodb_compressors", "zlib")
+    monkeypatch.setattr(settings, "mongodb_max_idle_time_ms", 60000)
+    options = core_db.client_options()
+    assert options["compressors"] == "zlib"
+    assert options["maxIdleTimeMS"] == 60000
+    assert options["minPoolSize"] == settings.mongodb_min_pool_size
+    assert core_db.pool_stats in options["event_listeners"]
+
+
+def test_bulk_create_reports_per_org_results(client):
+    from app.core.auth import create_access_token
+
+    client.post("/org/create", json={
+        "organization_name": "bulkTaken",
+        "admin_email": "taken@bulk.com",
+        "admin_password": "BulkPass123!",
+    })
+    token = create_access_token(subject="root", data={"role": "superadmin", "username": "root"})
+    orgs = [
+        {"organization_name": "bulkOne", "admin_email": "one@bulk.com", "admin_password": "BulkPass123!"},
+        {"organization_name": "bulkTwo", "admin_email": "two@bulk.com", "admin_password": "BulkPass123!"},
+        {"organization_name": "bulkTaken", "admin_email": "new@bulk.com", "admin_password": "BulkPass123!"},
+        {"organization_name": "bulkThree", "admin_email": "taken@bulk.com", "admin_password": "BulkPass123!"},
+        {"organization_name": "BulkOne", "admin_email": "again@bulk.com", "admin_password": "BulkPass123!"},
+    ]
+    resp = client.post(
+        "/org/bulk-create",
+        json={"organizations": orgs},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert (body["created"], body["failed"]) == (2, 3)
+    results = body["results"]
+    assert [r["ok"] for r in results] == [True, True, False, False, False]
+    assert results[2]["error"] == "Organization already exists"
+    assert results[3]["error"] == "Admin email already used for another org"
+    assert results[4]["error"] == "Duplicate organization in request"
+
+    login = client.post("/admin/login", json={"email": "two@bulk.com", "password": "BulkPass123!"})
+    assert login.status_code == 200
+
+
+def test_bulk_create_only_reports_duplicate_keys_as_taken(client, monkeypatch):
+    from pymongo.errors import BulkWriteError
+
+    from app.core.auth import create_access_token
+    from testsupport.mongo_async_mock import AsyncMockCollection
+
+    real_insert_many = AsyncMockCollection.insert_many
+
+    async def insert_many(self, docs, **kwargs):
+        if self.name != "master_organizations":
+            return await real_insert_many(self, docs, **kwargs)
+        # unordered: the first two are rejected, the rest still go in
+        await real_insert_many(self, docs[2:], **kwargs)
+        raise BulkWriteError({"writeErrors": [
+            {"index": 0, "code": 11000, "errmsg": "E11000 duplicate key error"},
+            {"index": 1, "code": 121, "errmsg": "Document failed validation"},
+        ]})
+
+    monkeypatch.setattr(AsyncMockCollection, "insert_many", insert_many)
+    token = create_access_token(subject="root", data={"role": "superadmin", "username": "root"})
+    orgs = [
+        {"organization_name": f"bulkErr{i}", "admin_email": f"e{i}@bulkerr.com", "admin_password": "BulkPass123!"}
+        for i in range(3)
+    ]
+    resp = client.post("/org/bulk-create", json={"organizations": orgs}, headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 200, resp.text
+    results = resp.json()["results"]
+    assert results[0]["error"] == "Organization or admin email already exists"
+    assert results[1]["error"] == "Failed to create organization"
+    assert results[2]["ok"] is True
+
+
+def test_bulk_create_requires_superadmin(client):
+    resp = client.post("/org/bulk-create", json={"organizations": []})
+    assert resp.status_code == 401
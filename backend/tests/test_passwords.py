@@ -0,0 +1,40 @@
+# backend/tests/test_passwords.py
+import asyncio
+
+import pytest
+
+from app.services.passwords import PasswordHasher, PasswordHasherBusy
+
+
+def test_hash_and_verify_in_pool():
+    hasher = PasswordHasher(workers=2, queue_size=2)
+
+    async def run():
+        hashed = await hasher.hash("s3cret!")
+        return await hasher.verify("s3cret!", hashed), await hasher.verify("wrong", hashed)
+
+    try:
+        assert asyncio.run(run()) == (True, False)
+    finally:
+        hasher.shutdown()
+
+
+def test_full_queue_is_rejected():
+    hasher = PasswordHasher(workers=1, queue_size=1)
+
+    async def run():
+        return await asyncio.gather(*(hasher.hash("pw") for _ in range(3)), return_exceptions=True)
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        hasher.shutdown()
+
+    busy = [r for r in results if isinstance(r, PasswordHasherBusy)]
+    assert len(busy) == 1
+    assert hasher.pending == 0
+
+
+def test_invalid_executor_kind():
+    with pytest.raises(ValueError):
+        PasswordHasher(executor="fiber")
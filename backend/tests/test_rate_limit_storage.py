@@ -0,0 +1,103 @@
+# backend/tests/test_rate_limit_storage.py
+import multiprocessing
+import time
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter, MovingWindowRateLimiter
+
+from app.core.rate_limit_storage import RedisCompatStorage, SQLiteStorage
+from testsupport.fake_redis import FakeRedis
+
+
+def _hit_from_other_process(uri, queue):
+    storage = storage_from_string(uri)
+    limiter = MovingWindowRateLimiter(storage)
+    queue.put([limiter.hit(parse("5/minute"), "login", "1.2.3.4") for _ in range(3)])
+
+
+def test_sqlite_scheme_is_registered(tmp_path):
+    storage = storage_from_string(f"sqlite:///{tmp_path}/rl.db")
+    assert isinstance(storage, SQLiteStorage)
+    assert storage.check()
+
+
+def test_sqlite_fixed_window_counts(tmp_path):
+    storage = storage_from_string(f"sqlite:///{tmp_path}/rl.db")
+    limiter = FixedWindowRateLimiter(storage)
+    item = parse("3/minute")
+    assert [limiter.hit(item, "k") for _ in range(4)] == [True, True, True, False]
+    assert limiter.get_window_stats(item, "k").remaining == 0
+    limiter.clear(item, "k")
+    assert limiter.hit(item, "k")
+
+
+def test_sqlite_moving_window_is_shared_between_processes(tmp_path):
+    uri = f"sqlite:///{tmp_path}/shared.db"
+    limiter = MovingWindowRateLimiter(storage_from_string(uri))
+    item = parse("5/minute")
+    assert [limiter.hit(item, "login", "1.2.3.4") for _ in range(3)] == [True] * 3
+
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_hit_from_other_process, args=(uri, queue))
+    proc.start()
+    other = queue.get(timeout=30)
+    proc.join(timeout=30)
+
+    # 5/minute across both processes, not 5 per process
+    assert other == [True, True, False]
+    assert not limiter.hit(item, "login", "1.2.3.4")
+
+
+def test_redis_compat_storage_with_stand_in_client():
+    storage = storage_from_string("redis-compat://localhost:6379/0", client=FakeRedis())
+    assert isinstance(storage, RedisCompatStorage)
+    limiter = FixedWindowRateLimiter(storage)
+    item = parse("2/minute")
+    assert [limiter.hit(item, "ip") for _ in range(3)] == [True, True, False]
+    assert storage.check()
+
+
+def test_sqlite_prunes_expired_rows(tmp_path, monkeypatch):
+    from app.core import rate_limit_storage
+
+    storage = storage_from_string(f"sqlite:///{tmp_path}/rl.db")
+    now = time.time()
+    monkeypatch.setattr(rate_limit_storage.time, "time", lambda: now)
+    storage.incr("old", 1)
+    storage.acquire_entry("old", 5, 1)
+    assert storage._conn.execute("SELECT COUNT(*) FROM counters").fetchone()[0] == 1
+
+    # a minute later other keys are hit; the expired window of "old" is removed
+    monkeypatch.setattr(rate_limit_storage.time, "time", lambda: now + 61)
+    storage.incr("new", 60)
+    storage.acquire_entry("new", 5, 60)
+    assert [r[0] for r in storage._conn.execute("SELECT key FROM counters")] == ["new"]
+    assert [r[0] for r in storage._conn.execute("SELECT key FROM events")] == ["new"]
+
+
+def test_redis_compat_counter_is_created_with_its_ttl():
+    client = FakeRedis()
+    storage = RedisCompatStorage("redis-compat://localhost:6379/0", client=client)
+    assert storage.incr("ip", 60) == 1
+    assert client.pttl("ratelimit:ip") > 0
+    assert storage.incr("ip", 60, amount=2) == 3
+    assert storage.get_expiry("ip") > time.time()
+
+
+def test_tripped_limit_answers_429(client, monkeypatch):
+    from app.core.limiter import limiter
+
+    monkeypatch.setattr(limiter, "enabled", True)
+    limiter.reset()
+    try:
+        codes = [
+            client.post("/admin/login", json={"email": "nobody@limit.io", "password": "x"}).status_code
+            for _ in range(6)
+        ]
+        resp = client.post("/admin/login", json={"email": "nobody@limit.io", "password": "x"})
+    finally:
+        limiter.reset()
+    assert codes == [401] * 5 + [429]
+    assert resp.status_code == 429 and "Rate limit exceeded" in resp.json()["error"]
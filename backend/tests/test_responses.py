@@ -0,0 +1,30 @@
+# backend/tests/test_responses.py
+import datetime
+import json
+
+from bson import Decimal128, ObjectId
+
+from app.core.responses import BSONJSONResponse, dumps
+from testsupport.auth import superadmin_headers
+
+
+def test_bson_types_are_encoded_natively():
+    oid = ObjectId()
+    when = datetime.datetime(2024, 5, 1, 12, 30, 15, 123456)
+    body = json.loads(dumps({"_id": oid, "at": when, "price": Decimal128("1.50"), "tags": ["a"]}))
+    assert body == {"_id": str(oid), "at": "2024-05-01T12:30:15.123456", "price": "1.50", "tags": ["a"]}
+    assert BSONJSONResponse({"_id": oid}).body == dumps({"_id": oid})
+
+
+def test_master_list_ids_are_strings(client):
+    client.post("/org/create", json={
+        "organization_name": "serialOrg", "admin_email": "serial@example.com", "admin_password": "StrongPass123!",
+    })
+    resp = client.get("/admin/master-list", params={"limit": 1000}, headers=superadmin_headers())
+    assert resp.headers["content-type"] == "application/json"
+    org = next(o for o in resp.json()["data"] if o["organization_name"] == "serialorg")
+    assert ObjectId.is_valid(org["_id"]) and ObjectId.is_valid(org["admin_id"])
+    assert isinstance(org["created_at"], str)
+
+    lines = client.get("/admin/master-list", params={"format": "ndjson"}, headers=superadmin_headers()).text.splitlines()
+    assert any(json.loads(line)["admin_id"] == org["admin_id"] for line in lines)
@@ -0,0 +1,144 @@
+# backend/tests/test_restore.py
+import asyncio
+import datetime
+import json
+
+import mongomock
+import pytest
+from bson import ObjectId
+
+from app.services import backup, restore
+from testsupport.mongo_async_mock import AsyncMockDB
+
+
+def _db(name):
+    return AsyncMockDB(mongomock.MongoClient()[name])
+
+
+def test_restore_round_trips_ndjson_backup(tmp_path):
+    db = _db("restoredb")
+    created = datetime.datetime(2025, 1, 2, 3, 4, 5)
+    ids = db._db["org_src"].insert_many(
+        [{"email": f"u{i}@x.io", "created_at": created} for i in range(1234)]
+    ).inserted_ids
+    path = asyncio.run(backup.backup_collection_async("org_src", str(tmp_path), db=db, incremental=False))
+
+    result = asyncio.run(restore.restore_collection_async(path, "org_dst", batch_size=100, max_in_flight=3, db=db))
+
+    assert result["read"] == result["written"] == 1234
+    assert result["verified"] is True
+    assert result["docs_per_s"] > 0
+    restored = db._db["org_dst"].find_one({"_id": ids[7]})
+    assert isinstance(restored["_id"], ObjectId)
+    assert restored["created_at"] == created
+    assert not list(tmp_path.glob("*.restore.json"))
+
+
+def test_restore_streams_legacy_json_array(tmp_path):
+    db = _db("legacydb")
+    ids = [str(ObjectId()) for _ in range(300)]
+    path = tmp_path / "org_old_backup.json"
+    path.write_text(json.dumps([{"_id": i, "email": f"{n}@x.io"} for n, i in enumerate(ids)], indent=2))
+
+    # small read chunks force documents to straddle chunk boundaries
+    restore.READ_CHUNK_CHARS, old = 50, restore.READ_CHUNK_CHARS
+    try:
+        result = asyncio.run(restore.restore_collection_async(str(path), "org_old", db=db))
+    finally:
+        restore.READ_CHUNK_CHARS = old
+
+    assert result["written"] == 300
+    assert result["verified"] is False
+    assert db._db["org_old"].find_one({"_id": ObjectId(ids[-1])})["email"] == "299@x.io"
+
+
+def test_restore_resumes_from_checkpoint_and_skips_duplicates(tmp_path):
+    db = _db("resumedb")
+    db._db["org_src"].insert_many([{"n": i} for i in range(50)])
+    path = asyncio.run(backup.backup_collection_async("org_src", str(tmp_path), db=db, incremental=False))
+
+    # pretend a previous run applied the first 20 docs and crashed after writing 25
+    docs = list(db._db["org_src"].find({}).sort("_id", 1))
+    db._db["org_dst"].insert_many(docs[:25])
+    restore._write_checkpoint(restore._checkpoint_path(path, "org_dst"), 20)
+
+    result = asyncio.run(restore.restore_collection_async(path, "org_dst", batch_size=10, db=db))
+    assert result["resumed_from"] == 20
+    assert result["skipped"] == 5
+    assert result["written"] == 25
+    assert db._db["org_dst"].count_documents({}) == 50
+
+
+def test_restore_detects_corrupt_backup(tmp_path):
+    import gzip
+
+    db = _db("corruptdb")
+    db._db["org_src"].insert_many([{"n": i} for i in range(5)])
+    path = asyncio.run(backup.backup_collection_async("org_src", str(tmp_path), db=db, incremental=False))
+
+    with gzip.open(path, "rb") as f:
+        lines = f.read().splitlines(keepends=True)
+    lines[2] = lines[2].replace(b'"n":1', b'"n":9')
+    with gzip.open(path, "wb") as f:
+        f.write(b"".join(lines))
+
+    with pytest.raises(restore.BackupFileError, match="checksum"):
+        asyncio.run(restore.restore_collection_async(path, "org_dst", db=db))
+    # verified before the first batch is written
+    assert db._db["org_dst"].count_documents({}) == 0
+
+    # cut off before the trailer
+    with gzip.open(path, "wb") as f:
+        f.write(b"".join(lines[:-2]))
+    with pytest.raises(restore.BackupFileError, match="truncated"):
+        asyncio.run(restore.restore_collection_async(path, "org_dst", db=db))
+    assert db._db["org_dst"].count_documents({}) == 0
+
+
+def test_restore_chain_applies_incrementals_as_upserts(tmp_path):
+    db = _db("chaindb")
+    coll = db._db["org_c"]
+    coll.insert_many([{"n": i} for i in range(3)])
+    out = str(tmp_path)
+    asyncio.run(backup.backup_collection_async("org_c", out, db=db, incremental=True))
+    coll.update_one({"n": 1}, {"$set": {"n": 11, "updated_at": datetime.datetime.utcnow()}})
+    coll.insert_one({"n": 3})
+    asyncio.run(backup.backup_collection_async("org_c", out, db=db, incremental=True))
+
+    results = asyncio.run(restore.restore_chain_async("org_c", out, target="org_c_restored", db=db))
+    assert [r["read"] for r in results] == [3, 2]
+    assert sorted(d["n"] for d in db._db["org_c_restored"].find({})) == [0, 2, 3, 11]
+
+
+def test_shared_tenant_round_trips_with_typed_tenant_id(tmp_path):
+    from app.core.tenancy import TenantCollection
+
+    db = _db("sharedrestoredb")
+    tenant_id, other = ObjectId(), ObjectId()
+    db._db["tenant_data"].insert_many(
+        [{"tenant_id": tenant_id, "n": i} for i in range(5)] + [{"tenant_id": other, "n": 99}]
+    )
+    path = asyncio.run(backup.backup_collection_async(
+        "tenant_data", str(tmp_path), db=db, final=True, query={"tenant_id": tenant_id}, name="org_shared",
+    ))
+    db._db["tenant_data"].delete_many({"tenant_id": tenant_id})
+
+    result = asyncio.run(restore.restore_collection_async(path, "tenant_data", db=db))
+    assert result["written"] == 5
+    # the tenant filter matches on the ObjectId, so a str tenant_id would hide the data
+    assert asyncio.run(TenantCollection(db["tenant_data"], tenant_id).count_documents({})) == 5
+    assert isinstance(db._db["tenant_data"].find_one({"n": 0})["tenant_id"], ObjectId)
+
+
+def test_version_1_backup_revives_ids(tmp_path):
+    import gzip
+
+    tenant_id = ObjectId()
+    line = json.dumps({"_id": str(ObjectId()), "tenant_id": str(tenant_id), "created_at": "2025-01-02T03:04:05"})
+    path = tmp_path / "org_v1.ndjson.gz"
+    with gzip.open(path, "wt") as f:
+        f.write(json.dumps({"__backup__": "header", "version": 1}) + "\n" + line + "\n")
+
+    doc = next(iter(restore.BackupReader(str(path))))
+    assert doc["tenant_id"] == tenant_id
+    assert doc["created_at"] == datetime.datetime(2025, 1, 2, 3, 4, 5)
@@ -0,0 +1,83 @@
+# backend/tests/test_round_trips.py
+"""
+MongoDB round trips per request, counted by the in-memory stand-in. A route
+that goes over its budget fails here with the commands it issued.
+"""
+import asyncio
+
+from testsupport.auth import superadmin_headers
+
+BUDGETS = {
+    "POST /org/create": 3,  # master insert, admin insert, email index
+    "POST /org/create (taken)": 2,
+    "POST /admin/login": 3,  # master, admin, refresh token insert
+    "GET /org/get (cold)": 2,  # one $or on master, one on the tenant collection
+    "GET /org/get (cached)": 0,
+    "POST /auth/refresh": 2,
+    "GET /admin/master-list": 1,
+    "PUT /org/update": 2,  # one $or for name + email, job insert
+    "PUT /admin/update-org": 2,
+    "DELETE /admin/delete-org": 2,
+    "org.update job": 11,  # rename + email change, including claim, progress and finish
+}
+
+
+def _within_budget(name, call):
+    from app.core import db as core_db
+
+    core_db.db.reset_commands()
+    result = call()
+    used = core_db.db.command_count
+    assert used <= BUDGETS[name], f"{name}: {used} round trips (budget {BUDGETS[name]}): {dict(core_db.db.commands)}"
+    return result
+
+
+def test_routes_stay_within_round_trip_budget(client, monkeypatch, tmp_path):
+    from app.routes.auth import principal_cache
+    from app.services import tenants
+    from app.services.jobs import job_queue
+
+    async def backup_to_tmp(coll_name, **kwargs):
+        return str(tmp_path / f"{coll_name}.ndjson.gz")
+
+    monkeypatch.setattr(tenants, "backup_collection_async", backup_to_tmp)
+
+    org = {"organization_name": "budgetOrg", "admin_email": "admin@budget.io", "admin_password": "BudgetPass123!"}
+    resp = _within_budget("POST /org/create", lambda: client.post("/org/create", json=org))
+    assert resp.status_code == 200, resp.text
+    resp = _within_budget("POST /org/create (taken)", lambda: client.post("/org/create", json={**org, "admin_email": "x@budget.io"}))
+    assert resp.status_code == 400
+
+    login = _within_budget("POST /admin/login", lambda: client.post(
+        "/admin/login", json={"email": "admin@budget.io", "password": "BudgetPass123!"},
+    )).json()
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+
+    principal_cache.clear()
+    assert _within_budget("GET /org/get (cold)", lambda: client.get("/org/get", headers=headers)).status_code == 200
+    assert _within_budget("GET /org/get (cached)", lambda: client.get("/org/get", headers=headers)).status_code == 200
+    assert _within_budget("POST /auth/refresh", lambda: client.post(
+        "/auth/refresh", json={"refresh_token": login["refresh_token"]},
+    )).status_code == 200
+    assert _within_budget("GET /admin/master-list", lambda: client.get(
+        "/admin/master-list", headers=superadmin_headers(),
+    )).status_code == 200
+
+    resp = _within_budget("PUT /org/update", lambda: client.put(
+        "/org/update", json={"new_organization_name": "budgetMoved", "new_admin_email": "new@budget.io"}, headers=headers,
+    ))
+    assert resp.status_code == 202, resp.text
+    _within_budget("org.update job", lambda: asyncio.run(job_queue.run_pending("org.update")))
+    job = client.get(resp.json()["status_url"], headers=headers).json()
+    assert job["status"] == "succeeded" and job["result"]["organization"]["admin_email"] == "new@budget.io"
+
+    resp = _within_budget("PUT /admin/update-org", lambda: client.put(
+        "/admin/update-org/budgetmoved", json={"new_admin_email": "other@budget.io"}, headers=superadmin_headers(),
+    ))
+    assert resp.status_code == 202, resp.text
+    asyncio.run(job_queue.run_pending())
+    resp = _within_budget("DELETE /admin/delete-org", lambda: client.delete(
+        "/admin/delete-org/budgetmoved", headers=superadmin_headers(),
+    ))
+    assert resp.status_code == 202, resp.text
+    asyncio.run(job_queue.run_pending())
@@ -0,0 +1,58 @@
+# backend/tests/test_startup.py
+import os
+import re
+import subprocess
+import sys
+
+BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# deferred until first login / token / rate-limited call / connect
+LAZY_MODULES = {"passlib", "jose", "slowapi", "limits", "motor"}
+# total import time of `create_app()`, generous enough for slow CI machines;
+# override with IMPORT_BUDGET_MS
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+
+_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)")
+
+
+def _run(code: str, *flags: str, env: dict | None = None) -> subprocess.CompletedProcess:
+    if env is None:
+        env = {**os.environ, "TESTING": "1", "MONGODB_URI": "mongodb://localhost:27017", "MONGODB_NAME": "testdb", "JWT_SECRET": "testsecret123"}
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code], cwd=BACKEND_ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+
+
+def test_create_app_import_budget():
+    stderr = _run("from app.main import create_app; create_app()", "-X", "importtime").stderr
+    imported, total_us = set(), 0
+    for match in _LINE.finditer(stderr):
+        cumulative, indent, module = match.groups()
+        imported.add(module.split(".")[0])
+        if not indent:
+            total_us += int(cumulative)
+
+    assert not LAZY_MODULES & imported, f"imported on the cold-start path: {sorted(LAZY_MODULES & imported)}"
+    assert total_us / 1000 < IMPORT_BUDGET_MS, f"create_app() imports took {total_us / 1000:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)"
+
+
+def test_settings_are_read_once_on_first_use():
+    out = _run(
+        "import app.main\n"
+        "from app.core.config import get_settings, settings\n"
+        "print(get_settings.cache_info().currsize)\n"
+        "settings.jwt_secret; get_settings(); print(get_settings.cache_info().misses)\n"
+    ).stdout.split()
+    assert out == ["0", "1"]
+
+
+def test_route_modules_import_without_env():
+    # required settings are missing: nothing may read them at import time
+    env = {k: v for k, v in os.environ.items() if k not in ("MONGODB_URI", "MONGODB_NAME", "JWT_SECRET")}
+    out = _run(
+        "import app.routes.auth, app.routes.orgs, app.routes.jobs, app.services.tenants\n"
+        "from app.core.config import get_settings\n"
+        "print(get_settings.cache_info().currsize)\n",
+        env=env,
+    ).stdout.split()
+    assert out == ["0"]
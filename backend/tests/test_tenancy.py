@@ -0,0 +1,70 @@
+# backend/tests/test_tenancy.py
+import asyncio
+
+from tests.test_orgs import _login
+
+
+def test_shared_storage_create_rename_delete(client, monkeypatch, tmp_path):
+    from app.core import db as core_db
+    from app.core.config import settings
+    from app.services import tenants
+    from app.services.jobs import job_queue
+
+    async def backup_to_tmp(coll_name, **kwargs):
+        return str(tmp_path / f"{kwargs.get('name') or coll_name}.ndjson.gz")
+
+    monkeypatch.setattr(tenants, "backup_collection_async", backup_to_tmp)
+    monkeypatch.setattr(settings, "tenant_storage", "shared")
+    raw = core_db.db._db
+    shared = raw["tenant_data"]
+
+    headers = _login(client, "sharedOne", "one@shared.io")
+    _login(client, "sharedTwo", "two@shared.io")
+    master = raw["master_organizations"].find_one({"organization_name": "sharedone"})
+    assert master["collection_name"] == "tenant_data" and master["tenant_id"] == master["_id"]
+    assert "org_sharedone" not in raw.list_collection_names()
+    assert client.get("/org/get", headers=headers).json()["admin_email"] == "one@shared.io"
+
+    resp = client.put("/org/update", json={"new_organization_name": "sharedRenamed", "new_admin_email": "new@shared.io"}, headers=headers)
+    assert resp.status_code == 202, resp.text
+    asyncio.run(job_queue.run_pending())
+    job = client.get(resp.json()["status_url"], headers=headers).json()
+    assert job["result"]["rename"]["strategy"] == "shared"
+    renamed = raw["master_organizations"].find_one({"_id": master["_id"]})
+    assert renamed["organization_name"] == "sharedrenamed" and renamed["collection_name"] == "tenant_data"
+    assert shared.find_one({"tenant_id": master["_id"]})["email"] == "new@shared.io"
+
+    headers = {"Authorization": "Bearer " + client.post(
+        "/admin/login", json={"email": "new@shared.io", "password": "RenamePass123!"},
+    ).json()["access_token"]}
+    assert client.delete("/org/delete", headers=headers).status_code == 202
+    asyncio.run(job_queue.run_pending())
+    assert shared.count_documents({"tenant_id": master["_id"]}) == 0
+    # the other tenant in the same collection is untouched
+    assert client.post("/admin/login", json={"email": "two@shared.io", "password": "RenamePass123!"}).status_code == 200
+
+
+def test_migrate_tenants_both_ways(client):
+    from app.core import db as core_db
+    from scripts.migrate_tenant_storage import migrate
+
+    raw = core_db.db._db
+    _login(client, "moveMe", "admin@moveme.io")
+    raw["org_moveme"].insert_many([{"n": i} for i in range(3)])
+    master_id = raw["master_organizations"].find_one({"organization_name": "moveme"})["_id"]
+
+    jobs = asyncio.run(migrate("shared", ["moveme"]))
+    assert [j["status"] for j in jobs] == ["succeeded"] and jobs[0]["result"]["copied"] == 4
+    assert "org_moveme" not in raw.list_collection_names()
+    assert raw["tenant_data"].count_documents({"tenant_id": master_id}) == 4
+    assert client.post("/admin/login", json={"email": "admin@moveme.io", "password": "RenamePass123!"}).status_code == 200
+    # nothing left to move
+    assert asyncio.run(migrate("shared", ["moveme"])) == []
+
+    jobs = asyncio.run(migrate("collection", ["moveme"]))
+    assert jobs[0]["status"] == "succeeded", jobs
+    master = raw["master_organizations"].find_one({"_id": master_id})
+    assert master["collection_name"] == "org_moveme" and "tenant_id" not in master
+    assert raw["org_moveme"].count_documents({}) == 4 and raw["org_moveme"].count_documents({"tenant_id": {"$exists": True}}) == 0
+    assert raw["tenant_data"].count_documents({"tenant_id": master_id}) == 0
+    assert client.post("/admin/login", json={"email": "admin@moveme.io", "password": "RenamePass123!"}).status_code == 200
@@ -0,0 +1,69 @@
+# backend/tests/test_tenant_stats.py
+import asyncio
+
+from testsupport.auth import superadmin_headers
+from tests.test_orgs import _login
+
+
+def test_admin_stats_lists_tenants_largest_first(client):
+    from app.core import db as core_db
+
+    headers = _login(client, "statsBig", "big@stats.io")
+    _login(client, "statsSmall", "small@stats.io")
+    core_db.db._db["org_statsbig"].insert_many([{"n": i, "pad": "x" * 200} for i in range(20)])
+
+    assert client.get("/admin/stats", headers=headers).status_code == 403
+    resp = client.get("/admin/stats", params={"refresh": "true"}, headers=superadmin_headers())
+    assert resp.status_code == 200, resp.text
+    report = resp.json()
+    by_name = {t["organization_name"]: t for t in report["tenants"]}
+    assert by_name["statsbig"]["count"] == 21 and by_name["statsbig"]["storage"] == "collection"
+    assert by_name["statsbig"]["size"] > by_name["statssmall"]["size"] > 0
+    sizes = [t["size"] for t in report["tenants"]]
+    assert sizes == sorted(sizes, reverse=True)
+    assert report["totals"]["tenants"] == len(report["tenants"]) and not report["stale"]
+    assert report["errors"] == []
+
+    top = client.get("/admin/stats", params={"limit": 1}, headers=superadmin_headers()).json()
+    assert len(top["tenants"]) == 1 and top["totals"] == report["totals"]
+
+
+def test_stats_are_bounded_cached_and_refreshed_in_background(monkeypatch):
+    from app.core import db as core_db
+    from app.services.tenant_stats import TenantStats
+
+    db = core_db.db
+    for i in range(6):
+        db._db["master_organizations"].insert_one({
+            "organization_name": f"boundstat{i}", "collection_name": f"org_boundstat{i}", "admin_email": f"a{i}@boundstat.io",
+        })
+    in_flight = peak = 0
+    real_command = db.command
+
+    async def command(*args, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        try:
+            return await real_command(*args, **kwargs)
+        finally:
+            in_flight -= 1
+
+    monkeypatch.setattr(db, "command", command)
+    stats = TenantStats(ttl_seconds=60, concurrency=2)
+
+    async def scenario():
+        first = await stats.get()
+        assert await stats.get() is not None and stats.refreshes == 1  # served from cache
+        stats.ttl_seconds = 0
+        stale = await stats.get()
+        assert stale["stale"] and stale["generated_at"] == first["generated_at"]
+        await stats._refresh  # the single background refresh
+        assert stats.refreshes == 2
+        return first
+
+    first = asyncio.run(scenario())
+    assert peak == 2
+    assert {f"boundstat{i}" for i in range(6)} <= {t["organization_name"] for t in first["tenants"]}
+    db._db["master_organizations"].delete_many({"organization_name": {"$regex": "^boundstat"}})
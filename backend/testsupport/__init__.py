@@ -0,0 +1,6 @@
+# backend/testsupport/__init__.py
+"""
+In-process fakes shared by the tests and the offline benchmarks: an async
+mongomock-backed Motor stand-in, a Redis stand-in for the rate limiter, and
+superadmin credentials.
+"""
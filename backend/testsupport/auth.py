@@ -0,0 +1,7 @@
+# backend/testsupport/auth.py
+def superadmin_headers() -> dict:
+    """Authorization header carrying a freshly signed superadmin token."""
+    from app.core.auth import create_access_token
+
+    token = create_access_token(subject="root", data={"role": "superadmin", "username": "root"})
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,65 @@
+# backend/testsupport/fake_redis.py
+import time
+
+
+class FakeRedis:
+    """Minimal in-process stand-in for the commands RedisCompatStorage uses."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    def _live(self, key):
+        if key in self.expiry and self.expiry[key] <= time.time():
+            self.data.pop(key, None)
+            self.expiry.pop(key, None)
+
+    def incrby(self, key, amount):
+        self._live(key)
+        self.data[key] = int(self.data.get(key, 0)) + amount
+        return self.data[key]
+
+    def set(self, key, value, ex=None, nx=False):
+        self._live(key)
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        if ex is not None:
+            self.expiry[key] = time.time() + ex
+        return True
+
+    def get(self, key):
+        self._live(key)
+        return self.data.get(key)
+
+    def pttl(self, key):
+        self._live(key)
+        return int((self.expiry[key] - time.time()) * 1000) if key in self.expiry else -2
+
+    def delete(self, key):
+        self.data.pop(key, None)
+        self.expiry.pop(key, None)
+
+    def ping(self):
+        return True
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues commands and runs them back to back on execute(), like MULTI/EXEC."""
+
+    def __init__(self, client):
+        self.client = client
+        self.queued = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.queued.append((getattr(self.client, name), args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        return [fn(*args, **kwargs) for fn, args, kwargs in self.queued]
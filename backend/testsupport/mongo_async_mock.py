@@ -0,0 +1,307 @@
+# backend/testsupport/mongo_async_mock.py
+"""
+In-memory stand-in for the parts of Motor the app uses, backed by mongomock.
+
+Every method that would be a server round trip is a coroutine and is counted
+in AsyncMockDB.commands (by command name), so tests can assert round-trip
+budgets. An optional per-command latency makes benchmarks behave more like
+a networked server.
+"""
+import asyncio
+from collections import Counter
+
+import bson
+import mongomock
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from pymongo.results import BulkWriteResult
+
+DUPLICATE_KEY = 11000
+COMMAND_NOT_FOUND = 59
+
+
+class AsyncMockCursor:
+    """Async iterator over a mongomock cursor, like Motor's AsyncIOMotorCursor."""
+    def __init__(self, cursor, round_trip=None):
+        self._cursor = cursor
+        self._round_trip = round_trip
+
+    async def _fetch(self):
+        # the first batch costs one round trip; later batches are not counted
+        if self._round_trip is not None:
+            round_trip, self._round_trip = self._round_trip, None
+            await round_trip()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await self._fetch()
+        try:
+            return next(self._cursor)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    def sort(self, *args, **kwargs):
+        self._cursor.sort(*args, **kwargs)
+        return self
+
+    def skip(self, n):
+        self._cursor.skip(n)
+        return self
+
+    def limit(self, n):
+        self._cursor.limit(n)
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    async def to_list(self, length=None):
+        await self._fetch()
+        if length is None:
+            return list(self._cursor)
+        docs = []
+        for doc in self._cursor:
+            docs.append(doc)
+            if len(docs) >= length:
+                break
+        return docs
+
+
+class AsyncMockCollection:
+    """Wraps a mongomock collection to behave async like Motor."""
+    def __init__(self, coll, database=None):
+        self._coll = coll
+        self.database = database
+        self.name = coll.name
+
+    async def _round_trip(self, command: str):
+        if self.database is not None:
+            await self.database._round_trip(command)
+
+    def _counted(self, command: str):
+        return lambda: self._round_trip(command)
+
+    def with_options(self, **kwargs):
+        # mongomock cannot produce RawBSONDocument; plain dicts are close enough
+        return self
+
+    def __getitem__(self, item):
+        return AsyncMockCollection(self._coll[item], self.database)
+
+    # reads
+
+    def find(self, *args, **kwargs):
+        return AsyncMockCursor(self._coll.find(*args, **kwargs), self._counted("find"))
+
+    async def find_one(self, *args, **kwargs):
+        await self._round_trip("find")
+        return self._coll.find_one(*args, **kwargs)
+
+    async def count_documents(self, *args, **kwargs):
+        await self._round_trip("aggregate")
+        return self._coll.count_documents(*args, **kwargs)
+
+    async def estimated_document_count(self, **kwargs):
+        await self._round_trip("count")
+        return self._coll.estimated_document_count(**kwargs)
+
+    async def distinct(self, key, filter=None, **kwargs):
+        await self._round_trip("distinct")
+        return self._coll.distinct(key, filter, **kwargs)
+
+    def aggregate(self, pipeline, **kwargs):
+        return AsyncMockCursor(iter(self._coll.aggregate(pipeline, **kwargs)), self._counted("aggregate"))
+
+    # writes
+
+    async def insert_one(self, doc, **kwargs):
+        await self._round_trip("insert")
+        return self._coll.insert_one(doc, **kwargs)
+
+    async def insert_many(self, docs, **kwargs):
+        await self._round_trip("insert")
+        return self._coll.insert_many(docs, **kwargs)
+
+    async def update_one(self, *args, **kwargs):
+        await self._round_trip("update")
+        return self._coll.update_one(*args, **kwargs)
+
+    async def update_many(self, *args, **kwargs):
+        await self._round_trip("update")
+        return self._coll.update_many(*args, **kwargs)
+
+    async def replace_one(self, *args, **kwargs):
+        await self._round_trip("update")
+        return self._coll.replace_one(*args, **kwargs)
+
+    async def delete_one(self, *args, **kwargs):
+        await self._round_trip("delete")
+        return self._coll.delete_one(*args, **kwargs)
+
+    async def delete_many(self, *args, **kwargs):
+        await self._round_trip("delete")
+        return self._coll.delete_many(*args, **kwargs)
+
+    async def find_one_and_update(self, *args, **kwargs):
+        await self._round_trip("findAndModify")
+        return self._coll.find_one_and_update(*args, **kwargs)
+
+    async def find_one_and_replace(self, *args, **kwargs):
+        await self._round_trip("findAndModify")
+        return self._coll.find_one_and_replace(*args, **kwargs)
+
+    async def find_one_and_delete(self, *args, **kwargs):
+        await self._round_trip("findAndModify")
+        return self._coll.find_one_and_delete(*args, **kwargs)
+
+    def _apply(self, op):
+        # mongomock's bulk API lags behind pymongo's operation classes, so
+        # apply each request with the matching single-document method
+        if isinstance(op, InsertOne):
+            self._coll.insert_one(op._doc)
+            return {"nInserted": 1}
+        if isinstance(op, ReplaceOne):
+            res = self._coll.replace_one(op._filter, op._doc, upsert=op._upsert)
+        elif isinstance(op, UpdateOne):
+            res = self._coll.update_one(op._filter, op._doc, upsert=op._upsert)
+        elif isinstance(op, UpdateMany):
+            res = self._coll.update_many(op._filter, op._doc, upsert=op._upsert)
+        elif isinstance(op, DeleteOne):
+            return {"nRemoved": self._coll.delete_one(op._filter).deleted_count}
+        elif isinstance(op, DeleteMany):
+            return {"nRemoved": self._coll.delete_many(op._filter).deleted_count}
+        else:
+            raise TypeError(f"Unsupported bulk operation: {op!r}")
+        upserted = res.upserted_id is not None
+        return {
+            "nMatched": 0 if upserted else res.matched_count,
+            "nModified": res.modified_count,
+            "nUpserted": 1 if upserted else 0,
+            "upserted_id": res.upserted_id,
+        }
+
+    async def bulk_write(self, requests, ordered=True, **kwargs):
+        await self._round_trip("bulkWrite")
+        details = {
+            "writeErrors": [], "writeConcernErrors": [], "upserted": [],
+            "nInserted": 0, "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0,
+        }
+        for index, op in enumerate(requests):
+            try:
+                counts = self._apply(op)
+            except DuplicateKeyError as e:
+                details["writeErrors"].append({"index": index, "code": DUPLICATE_KEY, "errmsg": str(e), "op": op})
+                if ordered:
+                    break
+                continue
+            upserted_id = counts.pop("upserted_id", None)
+            if upserted_id is not None:
+                details["upserted"].append({"index": index, "_id": upserted_id})
+            for key, n in counts.items():
+                details[key] += n
+        if details["writeErrors"]:
+            raise BulkWriteError(details)
+        return BulkWriteResult(details, True)
+
+    # collection management
+
+    async def create_index(self, keys, **kwargs):
+        await self._round_trip("createIndexes")
+        return self._coll.create_index(keys, **kwargs)
+
+    async def index_information(self):
+        await self._round_trip("listIndexes")
+        return self._coll.index_information()
+
+    async def drop(self):
+        await self._round_trip("drop")
+        return self._coll.drop()
+
+    async def rename(self, new_name, **kwargs):
+        await self._round_trip("renameCollection")
+        return self._coll.rename(new_name, **kwargs)
+
+
+class AsyncMockDB:
+    """
+    Wraps a mongomock database so `db[name]` returns async collections.
+
+    latency: seconds slept per round trip (0 keeps everything in-process).
+    commands: Counter of round trips by command name; reset_commands() clears it.
+    """
+    def __init__(self, db, latency: float = 0.0):
+        self._db = db
+        self.name = db.name
+        self.latency = latency
+        self.commands = Counter()
+
+    @classmethod
+    def create(cls, name: str = "testdb", latency: float = 0.0):
+        """A fresh, empty in-memory database."""
+        return cls(mongomock.MongoClient()[name], latency=latency)
+
+    async def _round_trip(self, command: str):
+        self.commands[command] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        else:
+            # still yield, like a real network call would
+            await asyncio.sleep(0)
+
+    @property
+    def command_count(self) -> int:
+        return sum(self.commands.values())
+
+    def reset_commands(self):
+        self.commands.clear()
+
+    def __getitem__(self, name):
+        return AsyncMockCollection(self._db[name], self)
+
+    def get_collection(self, name, **kwargs):
+        return self[name]
+
+    async def list_collection_names(self, **kwargs):
+        await self._round_trip("listCollections")
+        return self._db.list_collection_names(**kwargs)
+
+    async def drop_collection(self, name):
+        await self._round_trip("drop")
+        return self._db.drop_collection(name)
+
+    async def command(self, command, value=1, **kwargs):
+        if isinstance(command, dict):
+            command, value = next(iter(command.items()))
+        await self._round_trip(command)
+        if command == "ping":
+            return {"ok": 1.0}
+        if command.lower() == "collstats":
+            return self._coll_stats(value)
+        if command == "dbStats":
+            names = self._db.list_collection_names()
+            stats = [self._coll_stats(n) for n in names]
+            return {
+                "db": self.name,
+                "collections": len(names),
+                "objects": sum(s["count"] for s in stats),
+                "dataSize": sum(s["size"] for s in stats),
+                "ok": 1.0,
+            }
+        raise OperationFailure(f"no such command: '{command}'", code=COMMAND_NOT_FOUND)
+
+    def _coll_stats(self, name: str) -> dict:
+        coll = self._db[name]
+        sizes = [len(bson.encode(doc)) for doc in coll.find({})]
+        size = sum(sizes)
+        return {
+            "ns": f"{self.name}.{name}",
+            "count": len(sizes),
+            "size": size,
+            "avgObjSize": size // len(sizes) if sizes else 0,
+            "storageSize": size,
+            "nindexes": len(coll.index_information()),
+            "totalIndexSize": 0,
+            "ok": 1.0,
+        }
@@ -6,6 +6,7 @@ import { Link, useNavigate } from "react-router-dom";
 export default function Dashboard() {
   const [org, setOrg] = useState(null);
   const [error, setError] = useState(null);
+  const [deleting, setDeleting] = useState(null);
   const { auth, logout } = useAuth();
   const nav = useNavigate();
 
@@ -29,11 +30,18 @@ export default function Dashboard() {
     if (!confirm("Are you sure you want to delete this organization? This action cannot be undone.")) return;
 
     try {
-      await api.instance.delete("/org/delete");
+      setDeleting("queued");
+      const res = await api.deleteOrg();
+      // the delete runs in the background; only log out once it has succeeded
+      await api.waitForJob(res, {
+        onProgress: job => setDeleting(job.progress?.stage || job.status)
+      });
       logout();
       nav("/login");
     } catch (e) {
       setError(e?.response?.data?.detail || e.message);
+    } finally {
+      setDeleting(null);
     }
   }
 
@@ -109,7 +117,9 @@ export default function Dashboard() {
           {isAdmin ? (
             <>
               <Link to="/update-org"><button className="btn">Update Organization</button></Link>
-              <button className="btn danger" onClick={handleDelete} style={{ marginLeft: 10 }}>Delete Organization</button>
+              <button className="btn danger" onClick={handleDelete} disabled={!!deleting} style={{ marginLeft: 10 }}>
+                {deleting ? `Deleting… (${deleting})` : "Delete Organization"}
+              </button>
             </>
           ) : (
             <>
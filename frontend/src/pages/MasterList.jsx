@@ -3,6 +3,7 @@ import api from "../utils/api";
 
 export default function MasterList() {
   const [data, setData] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [err, setErr] = useState(null);
   const [editingId, setEditingId] = useState(null);
   const [editForm, setEditForm] = useState({ organization_name: "", admin_email: "" });
@@ -20,10 +21,13 @@ export default function MasterList() {
     return e?.message || "Unknown error";
   }
 
-  async function loadData() {
+  // Fetches one page; pass the previous next_cursor to append the following page
+  async function loadData(cursor = null) {
     try {
-      const res = await api.instance.get("/admin/master-list");
-      setData(res.data.data || []);
+      const res = await api.masterList(cursor ? { cursor } : {});
+      const page = res.data.data || [];
+      setData(prev => (cursor ? [...prev, ...page] : page));
+      setNextCursor(res.data.next_cursor || null);
       setErr(null);
     } catch (e) {
       setErr(extractError(e));
@@ -38,7 +42,8 @@ export default function MasterList() {
     if (!confirm(`Delete organization "${org.organization_name}"?`)) return;
 
     try {
-      await api.instance.delete(`/admin/delete-org/${org.organization_name}`);
+      const res = await api.instance.delete(`/admin/delete-org/${org.organization_name}`);
+      await api.waitForJob(res);
       alert("Organization deleted successfully!");
       await loadData();
     } catch (e) {
@@ -74,7 +79,8 @@ export default function MasterList() {
         return;
       }
 
-      await api.instance.put(`/admin/update-org/${oldOrgName}`, updates);
+      const res = await api.instance.put(`/admin/update-org/${oldOrgName}`, updates);
+      await api.waitForJob(res);
       alert("Organization updated!");
       await loadData();
       setEditingId(null);
@@ -108,7 +114,7 @@ export default function MasterList() {
       <div style={{ marginBottom: "24px" }}>
         <h2 style={{ margin: "0 0 8px 0" }}>Master Organizations</h2>
         <p style={{ color: "#6b7280", margin: 0 }}>
-          Manage all organizations ({data.length} total)
+          Manage all organizations ({data.length} loaded{nextCursor ? ", more available" : ""})
         </p>
       </div>
 
@@ -191,6 +197,12 @@ export default function MasterList() {
           )}
         </div>
       )}
+
+      {nextCursor && (
+        <div style={{ marginTop: "16px", textAlign: "center" }}>
+          <button onClick={() => loadData(nextCursor)}>Load more</button>
+        </div>
+      )}
     </div>
   );
 }
@@ -54,7 +54,12 @@ export default function UpdateOrg() {
         return;
       }
 
-      await api.updateOrg(form);
+      const res = await api.updateOrg(form);
+      // renames run in the background; show the job's stage until it finishes
+      await api.waitForJob(res, {
+        onProgress: job =>
+          setMsg({ type: "success", text: `Updating… (${job.progress?.stage || job.status})` })
+      });
 
       setMsg({
         type: "success",
@@ -20,12 +20,27 @@ const api = {
   },
 
   superLogin: (payload) => instance.post("/super/login", payload),
-  masterList: () => instance.get("/admin/master-list"),
+  masterList: (params = {}) => instance.get("/admin/master-list", { params }),
   createOrg: (payload) => instance.post("/org/create", payload),
   loginAdmin: (payload) => instance.post("/admin/login", payload),
   getOrg: () => instance.get("/org/get"),
   updateOrg: (payload) => instance.put("/org/update", payload),
   deleteOrg: () => instance.delete("/org/delete"),
+  getJob: (jobId) => instance.get(`/jobs/${jobId}`),
+
+  // Rename/delete answer 202 with a job id; poll until the job ends.
+  // Resolves with the finished job, rejects if it failed.
+  waitForJob: async (res, { intervalMs = 1000, onProgress } = {}) => {
+    if (res.status !== 202) return res.data;
+    const jobId = res.data.job_id;
+    for (;;) {
+      const { data: job } = await instance.get(`/jobs/${jobId}`);
+      if (job.status === "succeeded") return job;
+      if (job.status === "failed") throw new Error(job.error || "Job failed");
+      if (onProgress) onProgress(job);
+      await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+  },
 };
 
 export default api;